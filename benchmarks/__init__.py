@@ -0,0 +1,6 @@
+"""
+Performance benchmarks.
+
+Every module is a standalone script, run it with `python -m benchmarks.<module>` or run all of them with
+`invoke benchmarks`.
+"""
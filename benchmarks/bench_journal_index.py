@@ -0,0 +1,56 @@
+"""
+Benchmark latest journal file lookup in a directory with long journal history.
+
+Compares plain glob + getmtime sort, which was done on every journal reader tick,
+with cached JournalDirectoryIndex lookup.
+"""
+import argparse
+import datetime
+import os
+import pathlib
+import tempfile
+import timeit
+
+from edp.journal import JournalDirectoryIndex
+
+
+def make_journal_dir(path: pathlib.Path, num_files: int):
+    """Create `num_files` empty journal files with sequential timestamps"""
+    start = datetime.datetime(2015, 1, 1)
+    for i in range(num_files):
+        dt = start + datetime.timedelta(hours=i * 4)
+        (path / f'Journal.{dt:%y%m%d%H%M%S}.01.log').touch()
+    # pretend directory was not modified recently
+    old = (datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
+    os.utime(path, (old, old))
+
+
+def glob_latest_file(path: pathlib.Path):
+    """Old lookup implementation"""
+    files_list = sorted(path.glob('Journal.*.log'), key=os.path.getmtime)
+    return files_list[-1] if files_list else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=10000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = pathlib.Path(tempdir)
+        make_journal_dir(path, args.files)
+
+        index = JournalDirectoryIndex(path)
+        first_scan = timeit.timeit(index.get_latest_file, number=1)
+        glob_time = timeit.timeit(lambda: glob_latest_file(path), number=args.number) / args.number
+        index_time = timeit.timeit(index.get_latest_file, number=args.number) / args.number
+
+    print(f'{args.files} journal files')
+    print(f'glob + getmtime sort, per tick: {glob_time * 1000:.3f} ms')
+    print(f'JournalDirectoryIndex first scan: {first_scan * 1000:.3f} ms')
+    print(f'JournalDirectoryIndex cached, per tick: {index_time * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
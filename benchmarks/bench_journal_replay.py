@@ -0,0 +1,49 @@
+"""
+Replay recorded journal through journal_event_signal and report how subscribers keep up.
+
+Gamestate plugin is subscribed by default. Use --slow-subscriber to add subscriber that takes given
+time per event, like a slow uploader or gui handler. For full application with gui and uploaders, run it
+with EDP_JOURNAL_REPLAY and EDP_JOURNAL_REPLAY_SPEED environment variables set instead.
+"""
+import argparse
+import logging
+import pathlib
+import time
+
+from edp import journal, journal_replay, signalslib
+from edp.contrib import gamestate
+
+FIXTURE_RANDOM_JOURNAL_DIR = pathlib.Path(__file__).parents[1] / 'tests' / 'fixtures' / 'random_journal'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path', nargs='?', type=pathlib.Path, default=FIXTURE_RANDOM_JOURNAL_DIR,
+                        help='Journal file or directory')
+    parser.add_argument('--speed', type=float, default=None, help='Speed multiplier, max speed if not set')
+    parser.add_argument('--max-delay', type=float, default=10, help='Max delay between events, in seconds')
+    parser.add_argument('--slow-subscriber', type=float, default=0, help='Slow subscriber time per event, ms')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    gamestate.GameStatePlugin()
+
+    if args.slow_subscriber:
+        def slow_subscriber(event: journal.Event):
+            time.sleep(args.slow_subscriber / 1000)
+
+        journal.journal_event_signal.bind(slow_subscriber)
+
+    replay_thread = journal_replay.JournalReplayThread(
+        journal_replay.get_replay_files(args.path), speed=args.speed, max_delay=args.max_delay)
+
+    with signalslib.signal_manager.get_signal_executor_thread():
+        replay_thread.start()
+        replay_thread.join()
+
+    print(replay_thread.report.format())
+
+
+if __name__ == '__main__':
+    main()
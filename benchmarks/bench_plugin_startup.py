@@ -0,0 +1,91 @@
+"""
+Benchmark plugin registration at startup with hundreds of synthetic plugins.
+
+Compares lookup of marked plugin methods in precomputed class mark tables with previous lookup, which
+classified all class attributes with inspect.classify_class_attrs for every plugin and every mark name.
+Also measures class definition, which builds mark table, and full registration: binding signals and
+scheduling methods. Scheduler is not started, so scheduled methods are not executed.
+"""
+import argparse
+import inspect
+import time
+from typing import List, Type, Callable, Iterator, Tuple
+
+from PyQt5 import QtCore
+
+from edp import plugins, signalslib, thread
+
+SIGNALS = [signalslib.Signal(f'plugin startup benchmark {i}') for i in range(5)]
+
+
+def legacy_get_marked_methods(mark: str, obj) -> Iterator[Tuple[Callable, plugins.FunctionMark]]:
+    """Previous marked methods lookup, as it was called by PluginManager for every plugin and mark name"""
+    for name, t, _, _ in inspect.classify_class_attrs(type(obj)):
+        if not name.startswith('__') and t == 'method':
+            method: Callable = getattr(obj, name)
+            for func_mark in plugins.get_function_marks(method):
+                if func_mark.name == mark:
+                    yield method, func_mark
+
+
+def create_plugin_classes(count: int, methods: int, qobject: bool) -> List[Type[plugins.BasePlugin]]:
+    """Create plugin classes with one scheduled method, two signal callbacks and unmarked methods"""
+    bases: Tuple[type, ...] = (QtCore.QObject, plugins.BasePlugin) if qobject else (plugins.BasePlugin,)
+    classes: List[Type[plugins.BasePlugin]] = []
+    for i in range(count):
+        namespace = {f'method_{j}': lambda self: None for j in range(methods)}
+        namespace['refresh'] = plugins.scheduled(60)(lambda self: None)
+        namespace['on_first_signal'] = plugins.bind_signal(SIGNALS[i % len(SIGNALS)])(lambda self: None)
+        namespace['on_second_signal'] = plugins.bind_signal(SIGNALS[(i + 1) % len(SIGNALS)])(lambda self: None)
+        classes.append(type(f'SyntheticPlugin{i}', bases, namespace))
+    return classes
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Return best time of function call, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def register(plugin_list: List[plugins.BasePlugin]):
+    """Bind plugin signals and schedule plugin methods, like application does on startup"""
+    for signal in SIGNALS:
+        signal.callbacks.clear()
+    plugin_manager = plugins.PluginManager(plugin_list)
+    plugin_manager.register_plugin_signals()
+    plugin_manager.schedule_methods(thread.Scheduler())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--plugins', type=int, default=300, help='Number of synthetic plugins')
+    parser.add_argument('--methods', type=int, default=20, help='Number of not marked methods of every plugin')
+    parser.add_argument('--qobject', action='store_true', help='Derive plugins from QObject too')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    classes = create_plugin_classes(args.plugins, args.methods, args.qobject)
+    define_time = time.perf_counter() - start
+    plugin_list = [cls() for cls in classes]
+    marks = (plugins.MARKS.SCHEDULED, plugins.MARKS.SIGNAL)
+
+    legacy_time = measure(lambda: [list(legacy_get_marked_methods(mark, plugin))
+                                   for mark in marks for plugin in plugin_list], args.repeat)
+    registry_time = measure(lambda: [list(plugins.get_marked_methods(mark, plugin))
+                                     for mark in marks for plugin in plugin_list], args.repeat)
+    register_time = measure(lambda: register(plugin_list), args.repeat)
+
+    print(f'{args.plugins} plugins, {args.methods + 3} methods each' + (', QObject based' if args.qobject else ''))
+    print(f'class definition, with mark table: {define_time * 1000:.3f} ms')
+    print(f'legacy marked methods lookup: {legacy_time * 1000:.3f} ms')
+    print(f'mark table lookup: {registry_time * 1000:.3f} ms')
+    print(f'signal binding and scheduling: {register_time * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
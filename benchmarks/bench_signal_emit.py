@@ -0,0 +1,60 @@
+"""
+Benchmark Signal.emit cost.
+
+Also compares compiled data validator with previous validation, which built type dict of data on every emit.
+Emitted items are only queued, signal executor is not running, so callbacks cost is not included.
+Last measurement emits event that is not routed to any callback.
+"""
+import argparse
+import datetime
+import queue
+import timeit
+from types import FunctionType
+from typing import Dict
+
+from edp import journal, signalslib
+from edp.journal import Event, journal_event_signal
+
+EVENT = Event(datetime.datetime(2019, 1, 6, 18, 0, 0), 'Music', {'MusicTrack': 'NoTrack'},
+              '{"timestamp": "2019-01-06T18:00:00Z", "event": "Music", "MusicTrack": "NoTrack"}')
+
+
+def legacy_check_data(signal: signalslib.Signal, data: dict):
+    """Previous data validation implementation, as it was called from Signal.emit"""
+    if isinstance(data, FunctionType):
+        raise TypeError('Unexpected function')
+    elif isinstance(data, Dict):
+        data_signature = signalslib.get_data_signature(data)
+        if data_signature != signal.signature:
+            raise TypeError(f'Signature mismatch: {signal.signature} != {data_signature}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    journal_event_signal.bind_nonstrict(lambda event: None)
+    data = {'event': EVENT}
+
+    legacy_time = timeit.timeit(lambda: legacy_check_data(journal_event_signal, data), number=args.number)
+    # pylint: disable=protected-access
+    compiled_time = timeit.timeit(lambda: journal_event_signal._validate_data(data), number=args.number)
+    print(f'legacy validation: {legacy_time / args.number * 1e6:.3f} us')
+    print(f'compiled validation: {compiled_time / args.number * 1e6:.3f} us')
+
+    signalslib.signal_manager.signal_queue = queue.Queue()
+    emit_time = timeit.timeit(lambda: journal_event_signal.emit(event=EVENT), number=args.number)
+    print(f'emit: {emit_time / args.number * 1e6:.3f} us')
+
+    # callback that handles only other events: emitted event is routed to nobody and not queued at all
+    journal_event_signal.callbacks[:] = [journal.handles_events({'Docked'})(lambda event: None)]
+    signalslib.signal_manager.signal_queue = queue.Queue()
+    emit_time = timeit.timeit(lambda: journal_event_signal.emit(event=EVENT), number=args.number)
+    print(f'emit, not routed to callbacks: {emit_time / args.number * 1e6:.3f} us')
+
+    signalslib.signal_manager.signal_queue = queue.Queue()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Play signal recording back into real plugins and compare callback timings with recorded ones.
+
+Record signals by running application with EDP_SIGNAL_RECORD environment variable set to recording file path.
+Without recording path, synthetic session is recorded first by replaying test journal fixture into plugins.
+Data plugins are loaded and bound like in application, gui is not created. Network is offline by default:
+every http request gets empty json response after --network-latency, so playback is deterministic and
+nothing is sent to EDDN, EDSM or Inara. Plugins that can not be imported are skipped.
+"""
+import argparse
+import contextlib
+import importlib
+import logging
+import pathlib
+import tempfile
+import time
+from unittest import mock
+
+import inject
+import requests
+
+from edp import signalslib, plugins, thread, journal, asyncloop, signal_recording, journal_replay
+from edp.settings import EDPSettings
+
+PLUGINS = (
+    ('edp.contrib.edsm', 'EDSMPlugin'),
+    ('edp.contrib.gamestate', 'GameStatePlugin'),
+    ('edp.contrib.eddn', 'EDDNPlugin'),
+    ('edp.contrib.inara', 'InaraPlugin'),
+    ('edp.contrib.capi', 'CapiPlugin'),
+)
+
+FIXTURE_RANDOM_JOURNAL_DIR = pathlib.Path(__file__).parents[1] / 'tests' / 'fixtures' / 'random_journal'
+
+# Gui signals and signals that plugins emit themselves from played journal events
+SKIP_SIGNALS = ('app created', 'main window created', 'game state changed', 'game state set')
+
+
+def load_plugin_manager() -> plugins.PluginManager:
+    """Load data plugins and configure injection like application does"""
+    settings = EDPSettings.get_insance()
+    plugin_loader = plugins.PluginLoader(settings.plugin_dir)  # only built-in plugins are added, not loaded
+    for module_name, class_name in PLUGINS:
+        try:
+            plugin_loader.add_plugin(getattr(importlib.import_module(module_name), class_name))
+        except:
+            logging.exception(f'Failed to import plugin {module_name}.{class_name}, it is skipped')
+
+    plugin_manager = plugins.PluginManager(plugin_loader.get_plugins())
+    journal_reader = journal.JournalReader(settings.journal_dir)
+
+    def injection_config(binder: inject.Binder):
+        binder.bind(plugins.PluginProxy, plugins.PluginProxy(plugin_manager))
+        binder.bind(journal.JournalReader, journal_reader)
+        # pylint: disable=protected-access
+        for cls, obj in plugin_manager._plugins_cls_map.items():
+            binder.bind(cls, obj)
+
+    inject.clear_and_configure(injection_config)
+    plugin_manager.set_plugin_annotation_references()
+    plugin_manager.register_plugin_signals()
+    return plugin_manager
+
+
+def get_offline_send(latency: float):
+    """Return replacement of requests.Session.send that responds with empty json after latency"""
+
+    def send(session: requests.Session, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        time.sleep(latency)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response._content = b'{}'  # pylint: disable=protected-access
+        return response
+
+    return send
+
+
+def record_session(path: pathlib.Path, journal_dir: pathlib.Path):
+    """Record signals of loaded plugins while journal files of given directory are replayed into them"""
+    replay_thread = journal_replay.JournalReplayThread(journal_replay.get_replay_files(journal_dir))
+    with signal_recording.SignalRecorder(path):
+        replay_thread.start()
+        replay_thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path', nargs='?', type=pathlib.Path, default=None,
+                        help='Signal recording file, synthetic session is recorded if not set')
+    parser.add_argument('--speed', type=float, default=None, help='Speed multiplier, max speed if not set')
+    parser.add_argument('--max-delay', type=float, default=10, help='Max delay between signals, in seconds')
+    parser.add_argument('--skip', action='append', default=list(SKIP_SIGNALS), help='Signal name to not play')
+    parser.add_argument('--network-latency', type=float, default=100, help='Offline response latency, ms')
+    parser.add_argument('--allow-network', action='store_true', help='Send real http requests')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    plugin_manager = load_plugin_manager()
+
+    thread_manager = thread.ThreadManager()
+    thread_manager.add_threads(
+        signalslib.signal_manager.get_signal_executor_thread(),
+        asyncloop.loop_thread,
+        thread.scheduler,
+    )
+    plugin_manager.schedule_methods()
+
+    with contextlib.ExitStack() as stack:
+        if not args.allow_network:
+            stack.enter_context(mock.patch.object(requests.Session, 'send',
+                                                  get_offline_send(args.network_latency / 1000)))
+        with thread_manager:
+            path = args.path
+            if path is None:
+                path = pathlib.Path(stack.enter_context(tempfile.TemporaryDirectory())) / 'signals.rec'
+                record_session(path, FIXTURE_RANDOM_JOURNAL_DIR)
+            playback_thread = signal_recording.SignalPlaybackThread(
+                path, speed=args.speed, max_delay=args.max_delay, skip=set(args.skip))
+            playback_thread.start()
+            playback_thread.join()
+
+    print(playback_thread.report.format())
+
+
+if __name__ == '__main__':
+    main()
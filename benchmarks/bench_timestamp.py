@@ -0,0 +1,71 @@
+"""
+Benchmark journal timestamp parsing.
+
+Compares plain strptime with `edp.utils.from_ed_timestamp` on timestamps from fixture journal
+and from a large synthetic journal, and measures whole line parsing with `edp.journal.process_event`.
+"""
+import argparse
+import datetime
+import json
+import pathlib
+import time
+from typing import List
+
+from edp import journal, utils
+
+FIXTURE_JOURNAL = pathlib.Path(__file__).parents[1] / 'tests' / 'fixtures' / 'random_journal' / \
+    'Journal.190106175956.01.log'
+
+
+def make_synthetic_lines(num_lines: int) -> List[str]:
+    """Return journal lines with timestamps advancing 0-3 seconds, like in busy session"""
+    dt = datetime.datetime(2019, 1, 6, 17, 59, 56)
+    lines = []
+    for i in range(num_lines):
+        dt += datetime.timedelta(seconds=i % 4 // 2)
+        lines.append(json.dumps({'timestamp': utils.to_ed_timestamp(dt), 'event': 'FSSSignalDiscovered',
+                                 'SystemAddress': 1, 'SignalName': f'Signal {i}'}))
+    return lines
+
+
+def measure(func, items) -> float:
+    """Return seconds spent calling func on every item"""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def strptime_timestamp(timestamp: str) -> datetime.datetime:
+    """Old timestamp parsing implementation"""
+    return datetime.datetime.strptime(timestamp, utils.ED_TIMESTAMP_FORMAT)
+
+
+def report(title: str, lines: List[str]):
+    """Print timings for given journal lines"""
+    timestamps = [json.loads(line)['timestamp'] for line in lines]
+
+    utils.from_ed_timestamp.cache_clear()
+    old = measure(strptime_timestamp, timestamps)
+    new = measure(utils.from_ed_timestamp, timestamps)
+    utils.from_ed_timestamp.cache_clear()
+    events = measure(journal.process_event, lines)
+
+    print(f'{title}: {len(lines)} lines')
+    print(f'  strptime:          {old / len(lines) * 1e6:.3f} us/timestamp')
+    print(f'  from_ed_timestamp: {new / len(lines) * 1e6:.3f} us/timestamp ({old / new:.1f}x)')
+    print(f'  process_event:     {events / len(lines) * 1e6:.3f} us/line')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=200000, help='Synthetic journal size')
+    args = parser.parse_args()
+
+    fixture_lines = [line for line in FIXTURE_JOURNAL.read_text(encoding='utf-8').splitlines() if line.strip()]
+    report(FIXTURE_JOURNAL.name, fixture_lines)
+    report('synthetic journal', make_synthetic_lines(args.lines))
+
+
+if __name__ == '__main__':
+    main()
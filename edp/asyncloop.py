@@ -0,0 +1,101 @@
+"""
+Asyncio event loop running in background thread.
+
+Coroutine signal callbacks and scheduled plugin coroutines are executed here, so many network calls
+can be in flight concurrently without a thread per plugin. Blocking code, like `requests` calls,
+should be awaited with `run_blocking` to not block the loop.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import sys
+from typing import Callable, Any, Coroutine, Optional, Set
+
+from edp.thread import StoppableThread
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLoopThread(StoppableThread):
+    """
+    Thread that runs asyncio event loop.
+
+    Coroutines can be submitted before thread is started, they are executed once loop runs.
+    Pending tasks are cancelled when thread is stopped.
+    Loop reports heartbeat every `heartbeat_interval` seconds, so loop blocked by some coroutine is reported stuck.
+    """
+    heartbeat_interval: float = 5
+
+    def __init__(self):
+        super(AsyncLoopThread, self).__init__(name='asyncio loop')
+        self.loop = asyncio.new_event_loop()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._heartbeat)
+        try:
+            self.loop.run_forever()
+        finally:
+            self._cancel_tasks()
+
+    def _heartbeat(self):
+        self.heartbeat('event loop')
+        self.loop.call_later(self.heartbeat_interval, self._heartbeat)
+
+    def _get_pending_tasks(self) -> Set[asyncio.Task]:
+        if sys.version_info >= (3, 7):
+            return asyncio.all_tasks(self.loop)  # pylint: disable=no-member
+        return {task for task in asyncio.Task.all_tasks(self.loop) if not task.done()}
+
+    def _cancel_tasks(self):
+        tasks = self._get_pending_tasks()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    def stop(self):
+        super(AsyncLoopThread, self).stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def submit(self, coro: Coroutine, name: Optional[str] = None) -> concurrent.futures.Future:
+        """
+        Schedule coroutine execution on loop, thread safe.
+
+        Errors are logged, returned future can be used to wait for result.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(functools.partial(_log_error, name or repr(coro)))
+        return future
+
+    def run_coroutine(self, coro: Coroutine) -> Any:
+        """
+        Execute coroutine on loop and wait for its result, from other thread.
+
+        Errors are raised to caller, not logged. Returns None if coroutine is cancelled or thread is stopped.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        while True:
+            try:
+                return future.result(timeout=1)
+            except concurrent.futures.TimeoutError:
+                if self.is_stopped:
+                    future.cancel()
+                    return None
+            except concurrent.futures.CancelledError:
+                return None
+
+
+def _log_error(name: str, future: concurrent.futures.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f'Error executing coroutine {name}', exc_info=future.exception())
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking function in default executor of running loop and return its result"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+loop_thread = AsyncLoopThread()
@@ -23,8 +23,19 @@ APP_DATA_DIR: Path = LOCALAPPDATA_DIR / 'Elite Dangerous Platform'
 PERSONAL_DATA_DIR = LOCALAPPDATA_DIR / 'Elite Dangerous Platform - User Data'
 SETTINGS_DIR: Path = PERSONAL_DATA_DIR / 'Settings'
 LOGS_DIR: Path = PERSONAL_DATA_DIR / 'Logs'
+JOURNAL_ARCHIVE_PATH: Path = PERSONAL_DATA_DIR / 'journal_archive.sqlite3'
 DIST_FILE: Path = BASE_DIR / 'dist.json'
 
+# Replay recorded journal file or directory instead of reading live journal, for load testing
+JOURNAL_REPLAY_PATH: Optional[Path] = Path(os.environ['EDP_JOURNAL_REPLAY']) \
+    if os.environ.get('EDP_JOURNAL_REPLAY') else None
+# Replay speed multiplier, replay as fast as possible if not set
+JOURNAL_REPLAY_SPEED: Optional[float] = float(os.environ['EDP_JOURNAL_REPLAY_SPEED']) \
+    if os.environ.get('EDP_JOURNAL_REPLAY_SPEED') else None
+# Record emitted signals to given file, for playback with benchmarks/bench_signal_playback.py
+SIGNAL_RECORD_PATH: Optional[Path] = Path(os.environ['EDP_SIGNAL_RECORD']) \
+    if os.environ.get('EDP_SIGNAL_RECORD') else None
+
 VERSION_PATH: Path = BASE_DIR / 'VERSION'
 VERSION: str = VERSION_PATH.read_text().strip() if VERSION_PATH.exists() else '0.0.0'
 APPNAME_SHORT: str = 'EDP'
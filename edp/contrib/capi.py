@@ -46,9 +46,10 @@ logger = logging.getLogger(__name__)
 access_token_set_signal = signalslib.Signal('capi access token set', access_token=str)
 login_required_signal = signalslib.Signal('capi login required')
 refresh_required_signal = signalslib.Signal('capi token refresh required')
-market_info_signal = signalslib.Signal('capi market info signal', data=dict)
-profile_info_signal = signalslib.Signal('capi profile info signal', data=dict)
-shipyard_info_signal = signalslib.Signal('capi shipyard info signal', data=dict)
+market_info_signal = signalslib.Signal('capi market info signal', data=dict).set_priority(signalslib.Priority.BULK)
+profile_info_signal = signalslib.Signal('capi profile info signal', data=dict).set_priority(signalslib.Priority.BULK)
+shipyard_info_signal = signalslib.Signal('capi shipyard info signal', data=dict).set_priority(
+    signalslib.Priority.BULK)
 
 
 class CapiException(Exception):
@@ -473,13 +474,14 @@ class CapiPlugin(plugins.BasePlugin):
     def get_settings_widget(self):
         return CapiSettingsTabWidget(self._manager)
 
-    @plugins.scheduled(120, skipfirst=True)
+    @plugins.scheduled(120, skipfirst=True, max_interval=30 * 60, wake_signals=[refresh_required_signal])
     def do_refresh_token(self):
-        """Periodically try to refresh token if required """
+        """Try to refresh token when it is required, and periodically if refresh failed"""
         if self._manager.state.is_refresh_required:
             self._manager.do_refresh()
 
-    @plugins.bind_signal(journal.journal_event_signal)
+    @plugins.bind_signal(journal.journal_event_signal, priority=signalslib.Priority.BULK)
+    @journal.handles_events({'Docked'})
     def on_journal_event(self, event: journal.Event):
         """Handle journal events"""
         if not self._manager.state.is_has_access_token:
@@ -82,7 +82,7 @@ class DiscordRichPresencePlugin(plugins.BasePlugin):
             drp_state.assets_large_image = 'logo'
             self.set_state(drp_state)
 
-    @plugins.scheduled(15)
+    @plugins.scheduled(15, misfire_grace=15)
     def update_discord_state(self):
         """Update discord rich presence state periodically in a minimum allowed interval"""
         state, self._current_state = self._current_state, None
@@ -15,7 +15,7 @@ import datetime
 import itertools
 import logging
 import re
-from typing import List, Dict, Tuple, Any, Union
+from typing import List, Dict, Tuple, Any, Union, Mapping
 
 import dataclasses
 import requests
@@ -26,6 +26,7 @@ from edp.contrib.gamestate import get_gamestate, GameStateData, game_state_set_s
 from edp.gui.forms.settings_window import VLayoutTab
 from edp.plugins import BasePlugin
 from edp.settings import BaseSettings
+from edp.utils.immutable import OverlayDict
 from edp.utils.plugins_helpers import BufferedEventsMixin
 
 logger = logging.getLogger(__name__)
@@ -56,7 +57,7 @@ class EDDNSchema:
         payload_dict['$schemaRef'] = payload_dict.pop('schemaRef')
         message_dict = payload_dict.pop('message')
         optional = message_dict.pop('optional', {})
-        payload_dict['message'] = optional
+        payload_dict['message'] = dict(optional)
         payload_dict['message'].update(message_dict)
         return payload_dict
 
@@ -125,7 +126,7 @@ class JournalMessageSchema(_SchemaMessage):
     StarPos: Tuple[float, float, float]
     SystemAddress: int
     Factions: List[Dict]
-    optional: Dict
+    optional: Mapping
     horizons: bool
     odyssey: bool
 
@@ -147,6 +148,7 @@ class EDDNSettingsTabWidget(VLayoutTab):  # pragma: no cover
 
 class EDDNPlugin(BufferedEventsMixin, BasePlugin):
     """EDDN plugin"""
+    buffered_events = frozenset({'Docked', 'FSDJump', 'Scan', 'Location'})
 
     def __init__(self):
         super(EDDNPlugin, self).__init__()
@@ -160,7 +162,7 @@ class EDDNPlugin(BufferedEventsMixin, BasePlugin):
         return self.settings.enabled
 
     def filter_event(self, event: journal.Event) -> bool:
-        return event.name in {'Docked', 'FSDJump', 'Scan', 'Location'}
+        return event.name in self.buffered_events
 
     @plugins.bind_signal(game_state_set_signal)
     def bootstrap_starpos_db(self, state: GameStateData):
@@ -188,9 +190,11 @@ class EDDNPlugin(BufferedEventsMixin, BasePlugin):
             d, 'HappiestSystem', 'HomeSystem', 'MyReputation', 'SquadronFaction'
         ))
 
-        optional = utils.drop_keys(event.data, "ActiveFine", "CockpitBreach", "BoostUsed",
-                                   "FuelLevel", "FuelUsed", "JumpDist", "Latitude", "Longitude", "Wanted")
-        optional = strip_localized(optional)
+        # copy-on-write view, event data is not copied
+        optional = OverlayDict(event.data).drop(
+            "ActiveFine", "CockpitBreach", "BoostUsed", "FuelLevel", "FuelUsed", "JumpDist", "Latitude", "Longitude",
+            "Wanted", *(key for key in event.data if key.endswith('_Localised'))
+        )
         if 'StationEconomies' in optional:
             optional['StationEconomies'] = [strip_localized(d) for d in optional['StationEconomies']]
 
@@ -230,7 +234,7 @@ class EDDNPlugin(BufferedEventsMixin, BasePlugin):
     def send_payload(self, payload: Dict):
         """Send data to eddn"""
         logger.debug(f'Sending message to EDDN: {payload["$schemaRef"]}')
-        response = self._session.post('https://eddn.edcd.io:4430/upload/', json=payload)
+        response = self._session.post('https://eddn.edcd.io:4430/upload/', json=payload, timeout=15)
         if response.status_code >= 400:
             logger.error(f'Error sending message to EDDN, status code is {response.status_code}: '
                          f'{response.text} :: {payload}')
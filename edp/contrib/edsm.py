@@ -4,7 +4,6 @@ EDSM integration plugin
 Sends commander journal events to EDSM
 """
 import functools
-import json
 import logging
 from typing import List, Optional, Callable, TypeVar
 
@@ -16,7 +15,8 @@ from edp.contrib.gamestate import GameStatePlugin, GameStateData, game_state_set
 from edp.gui.forms.settings_window import VLayoutTab
 from edp.plugins import BasePlugin
 from edp.settings import BaseSettings
-from edp.utils.plugins_helpers import BufferedEventsMixin
+from edp.utils.immutable import OverlayDict
+from edp.utils.plugins_helpers import BufferedEventsMixin, RetryLater
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +110,7 @@ def cache(func: Callable[..., T]) -> T:  # noqa
 
 class EDSMPlugin(BufferedEventsMixin, BasePlugin):
     """EDSM plugin"""
+    buffered_events = journal.JOURNAL_FILE_EVENTS
     gamestate: GameStatePlugin = inject.attr(GameStatePlugin)
 
     def __init__(self, *args, **kwargs):
@@ -146,12 +147,19 @@ class EDSMPlugin(BufferedEventsMixin, BasePlugin):
         """
         Process buffered events
 
-        Patches every event with recorded transient state and sends events in chunks
+        Patches every event with recorded transient state and sends events in chunks.
+        If EDSM is not available, not sent events are retried later.
         """
-        patched_events = [self.patch_event(event.raw, self.gamestate.state) for event in events]
+        if not events:
+            return
+
+        state = self.gamestate.state
+        patched_events = [self.patch_event(event, state).to_dict() for event in events]
 
         # Sometimes EDSM has ConnectionError so need to send events in chunks and try to retry.
-        for chunk in utils.chunked(patched_events, size=10):
+        chunk_size = 10
+        for start, chunk in zip(range(0, len(patched_events), chunk_size),
+                                utils.chunked(patched_events, size=chunk_size)):
             try:
                 self.api.journal_event(*chunk)
             except requests.exceptions.ConnectionError:
@@ -160,28 +168,24 @@ class EDSMPlugin(BufferedEventsMixin, BasePlugin):
 
                 try:
                     self.api.journal_event(*chunk)
-                except requests.exceptions.ConnectionError:
-                    logger.error('ConnectionError second time, give up')
-                    logger.error(chunk)
+                except requests.exceptions.ConnectionError as e:
+                    raise RetryLater(events[start:], 'ConnectionError second time') from e
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code >= 500:
-                    logger.warning('EDSM returned ServerError')
-                    return
+                    raise RetryLater(events[start:], f'EDSM returned ServerError {e.response.status_code}') from e
                 logger.exception(f'HTTPError from edsm while sending: {chunk}')
 
     # pylint: disable=no-self-use
-    def patch_event(self, event_line: str, state: GameStateData) -> dict:
-        """Patch event with transient state"""
-        event: dict = json.loads(event_line)
-
-        event['_systemAddress'] = state.location.address
-        event['_systemName'] = state.location.system
-        event['_systemCoordinates'] = state.location.pos
-        event['_marketId'] = state.location.station.market
-        event['_stationName'] = state.location.station.name
-        event['_shipId'] = state.ship.id
-
-        return event
+    def patch_event(self, event: journal.Event, state: GameStateData) -> OverlayDict:
+        """Patch event with transient state. Event data is not copied."""
+        return OverlayDict(event.data, {
+            '_systemAddress': state.location.address,
+            '_systemName': state.location.system,
+            '_systemCoordinates': state.location.pos,
+            '_marketId': state.location.station.market,
+            '_stationName': state.location.station.name,
+            '_shipId': state.ship.id,
+        })
 
     def get_settings_widget(self):
         return EDSMSettingsTabWidget()
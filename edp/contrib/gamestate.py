@@ -6,18 +6,17 @@ Defines GameStateData which holds actual state.
 http://hosting.zaonce.net/community/journal/v18/Journal_Manual_v18.pdf
 """
 import collections
-import copy
 import logging
 import threading
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 
 import dataclasses
 import inject
 
 from edp import entities, signals
-from edp.journal import JournalReader, Event, journal_event_signal, VersionInfo
+from edp.journal import JournalReader, Event, journal_event_signal, VersionInfo, handles_events
 from edp.plugins import BasePlugin
-from edp.signalslib import Signal
+from edp.signalslib import Signal, Backpressure, Priority
 from edp.utils import plugins_helpers, has_keys
 
 logger = logging.getLogger(__name__)
@@ -52,7 +51,9 @@ class GameStateData(entities.BaseEntity):
         return cls()
 
 
-game_state_changed_signal = Signal('game state changed', state=GameStateData)
+# only latest state matters for slow subscribers
+game_state_changed_signal = Signal('game state changed', state=GameStateData).set_queue_policy(
+    Backpressure.COALESCE).set_priority(Priority.INTERACTIVE)
 game_state_set_signal = Signal('game state set', state=GameStateData)
 
 mutation_registry: plugins_helpers.RoutingSwitchRegistry[
@@ -68,8 +69,10 @@ class GameStatePlugin(BasePlugin):
     def __init__(self):
         self._state = GameStateData.get_clear_data()
         self._state_lock = threading.Lock()
+        self._state_snapshot: Optional[GameStateData] = None
 
-        journal_event_signal.bind(self.on_journal_event)
+        # state changes are shown by gui and overlay, so gamestate goes before bulk journal subscribers
+        journal_event_signal.bind(self.on_journal_event, priority=Priority.INTERACTIVE)
         signals.init_complete.bind(self.set_initial_state)
 
     def get_settings_widget(self):
@@ -77,9 +80,17 @@ class GameStatePlugin(BasePlugin):
 
     @property
     def state(self) -> GameStateData:
-        """Return puglic GameStateData instance"""
-        return copy.deepcopy(self._state)
+        """
+        Return puglic GameStateData instance
+
+        It is frozen snapshot of current state, shared by all readers until state changes.
+        """
+        with self._state_lock:
+            if self._state_snapshot is None:
+                self._state_snapshot = self._state.frozen_copy()
+            return self._state_snapshot
 
+    @handles_events(mutation_registry)
     def on_journal_event(self, event: Event):
         """
         Update state with journal event
@@ -107,7 +118,10 @@ class GameStatePlugin(BasePlugin):
     def update_state(self, event: Event) -> bool:
         """Update current state with journal event"""
         with self._state_lock:
-            list(mutation_registry.execute_silently(event.name, event=event, state=self._state))
+            if event.name in mutation_registry:
+                list(mutation_registry.execute_silently(event.name, event=event, state=self._state))
+                # not every change is tracked, like materials or engineers, so snapshot is dropped anyway
+                self._state_snapshot = None
             changed = self._state.is_changed
             self._state.reset_changed()
 
@@ -90,6 +90,7 @@ class InaraWebLoginWindow(QtWebEngineWidgets.QWebEngineView):
 class InaraSettingsTabWidget(VLayoutTab):
     """Inara plugin settings widget"""
     friendly_name = 'Inara'
+    buffered_events = processor_registry
 
     def __init__(self):
         self.settings = InaraSettings.get_insance()
@@ -149,6 +150,7 @@ class InaraWebApi:
 class InaraPlugin(BufferedEventsMixin, plugins.BasePlugin):
     """Inara plugin"""
     friendly_name = 'Inara'
+    buffered_events = processor_registry
     journal_reader: journal.JournalReader = inject.attr(journal.JournalReader)
 
     def __init__(self):
@@ -1,6 +1,7 @@
 """
 Define all game and journal entities to have determined and typed behavior
 """
+import copy
 from collections import defaultdict
 from operator import attrgetter, methodcaller
 from typing import Dict, Optional, Tuple, List
@@ -9,24 +10,59 @@ import dataclasses
 
 from edp.contracts import PositiveInt, NotEmptyStr, require_contract
 from edp.utils import infer_category
+from edp.utils.immutable import freeze
 
 
 class BaseEntity:
-    """Base entity class with logic for watching for changes"""
+    """
+    Base entity class with logic for watching for changes
+
+    Entity can be frozen, then it can not be changed anymore and copies of it are the same object.
+    """
     __sentinel__ = object()
     __changed__ = False
+    __frozen__ = False
 
     def __init__(self, *args, **kwargs):
         super(BaseEntity, self).__init__(*args, **kwargs)
         self.reset_changed()
 
     def __setattr__(self, key, value):
+        if self.__frozen__:
+            raise dataclasses.FrozenInstanceError(f'cannot assign to field {key!r} of frozen entity')
         if value is self.__sentinel__:
             return None
         if value != getattr(self, key, object()):
             super(BaseEntity, self).__setattr__('__changed__', True)
         return super(BaseEntity, self).__setattr__(key, value)
 
+    def __deepcopy__(self, memo):
+        if self.__frozen__:
+            return self
+        result = copy.copy(self)
+        memo[id(self)] = result
+        # noinspection PyUnresolvedReferences
+        for field_name in self.__dataclass_fields__:  # pylint: disable=no-member
+            object.__setattr__(result, field_name, copy.deepcopy(getattr(self, field_name), memo))
+        return result
+
+    def __freeze__(self):
+        if not self.__frozen__:
+            # noinspection PyUnresolvedReferences
+            for field_name in self.__dataclass_fields__:  # pylint: disable=no-member
+                object.__setattr__(self, field_name, freeze(getattr(self, field_name)))
+            object.__setattr__(self, '__frozen__', True)
+        return self
+
+    def frozen_copy(self):
+        """Return frozen deep copy of entity"""
+        return freeze(copy.deepcopy(self))
+
+    @property
+    def is_frozen(self) -> bool:
+        """Return True if entity is frozen"""
+        return self.__frozen__
+
     def _dataclass_type_fields(self):
         # noinspection PyUnresolvedReferences
         for field_name, field in self.__dataclass_fields__.items():  # pylint: disable=no-member
@@ -2,11 +2,11 @@
 Base things for GUI components
 """
 import logging
-from typing import Optional
+from typing import Optional, Container
 
 from PyQt5 import QtWidgets, QtCore
 
-from edp import journal
+from edp import journal, signalslib
 
 logger = logging.getLogger(__name__)
 
@@ -18,15 +18,19 @@ class JournalEventHandlerMixin:
     This connects edp signal and qt signal.
 
     To process journal event you want to override `on_journal_event` method.
+    Set `handled_events` to names of events it handles, other events are not delivered to it.
     """
     journal_event_signal = QtCore.pyqtSignal(journal.Event)
+    handled_events: Optional[Container[str]] = None  # None means all events
 
     def __init__(self):
         super(JournalEventHandlerMixin, self).__init__()
 
         self.journal_event_signal.connect(self.on_journal_event_signal)
         # pylint: disable=unnecessary-lambda
-        journal.journal_event_signal.bind_nonstrict(lambda event: self.journal_event_signal.emit(event))
+        callback = lambda event: self.journal_event_signal.emit(event)
+        journal.journal_event_signal.bind_nonstrict(callback, keys=self.handled_events,
+                                                    priority=signalslib.Priority.INTERACTIVE)
 
     @QtCore.pyqtSlot(journal.Event)
     def on_journal_event_signal(self, event: journal.Event):
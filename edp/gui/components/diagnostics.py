@@ -0,0 +1,171 @@
+"""Sections with signal execution statistics and thread health, for diagnosing slow subscribers and threads"""
+import logging
+import time
+from typing import List, Dict, Tuple, Sequence, FrozenSet
+
+import inject
+from PyQt5 import QtCore, QtWidgets
+
+from edp import signalslib, thread
+from edp.gui.components.base import BaseMainWindowSection
+
+logger = logging.getLogger(__name__)
+
+
+def create_table(columns: Sequence[str]) -> QtWidgets.QTableWidget:
+    """Return read only table with given columns"""
+    table = QtWidgets.QTableWidget(0, len(columns))
+    table.setHorizontalHeaderLabels(columns)
+    table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+    table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+    header = table.verticalHeader()
+    assert header is not None
+    header.setVisible(False)
+    table.setMinimumSize(QtCore.QSize(0, 100))
+    table.setMaximumSize(QtCore.QSize(16777215, 200))
+    return table
+
+
+def fill_table(table: QtWidgets.QTableWidget, rows: Sequence[Sequence[str]]):
+    """Replace table contents with given rows"""
+    table.setRowCount(len(rows))
+    for row, values in enumerate(rows):
+        for column, value in enumerate(values):
+            table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+    table.resizeColumnsToContents()
+
+
+class SignalDiagnosticsComponent(BaseMainWindowSection):
+    """Signal diagnostics component"""
+    name = 'Signal Diagnostics'
+    handled_events: FrozenSet[str] = frozenset()
+
+    refresh_interval = 2000  # ms
+    callback_columns = ('Callback', 'Calls', 'Errors', 'Mean, ms', 'Max, ms', 'Queue wait, ms', 'Queue')
+    slowest_count = 5
+
+    def __init__(self):
+        super(SignalDiagnosticsComponent, self).__init__()
+        self.setLayout(QtWidgets.QVBoxLayout())
+
+        self.signals_label = QtWidgets.QLabel()
+        self.signals_label.setWordWrap(True)
+        self.layout().addWidget(self.signals_label)
+
+        self.callbacks_table = create_table(self.callback_columns)
+        self.layout().addWidget(self.callbacks_table)
+
+        self.slowest_list = QtWidgets.QListWidget()
+        self.slowest_list.setMaximumSize(QtCore.QSize(16777215, 100))
+        self.slowest_list.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.layout().addWidget(self.slowest_list)
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(self.refresh_interval)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    def refresh(self):
+        """Show current signal statistics"""
+        if not self.isVisible():
+            return
+        try:
+            self.update_view(signalslib.signal_manager)
+        except:
+            logger.exception('Failed to refresh signal diagnostics')
+
+    def update_view(self, signal_manager: signalslib.SignalManager):
+        """Fill widgets with statistics of given signal manager"""
+        instrumentation = signal_manager.instrumentation
+        signal_stats = instrumentation.get_signal_stats()
+        counters = signal_manager.get_signal_counters()
+        self.signals_label.setText('\n'.join(
+            f'{name}: {stats.emits} emits, {stats.execution.calls} calls, {stats.execution.errors} errors, '
+            f'wait {stats.execution.mean_queue_wait * 1000:.1f} ms'
+            + (f', dropped {counters[name].dropped}, coalesced {counters[name].coalesced}, '
+               f'quarantined {counters[name].quarantined}' if name in counters else '')
+            for name, stats in sorted(signal_stats.items())
+        ))
+
+        depths = signal_manager.get_queue_depths()
+        callback_stats = sorted(instrumentation.get_callback_stats().items(),
+                                key=lambda item: item[1].total_time, reverse=True)
+        fill_table(self.callbacks_table, [
+            (name, str(stats.calls), str(stats.errors), f'{stats.mean_time * 1000:.2f}',
+             f'{stats.max_time * 1000:.2f}', f'{stats.mean_queue_wait * 1000:.2f}', str(depths.get(name, 0)))
+            for name, stats in callback_stats
+        ])
+
+        self.slowest_list.clear()
+        for invocation in instrumentation.get_slowest_invocations(self.slowest_count):
+            timestamp = time.strftime('%H:%M:%S', time.localtime(invocation.timestamp))
+            self.slowest_list.addItem(f'{timestamp} {invocation.callback} ({invocation.signal}): '
+                                      f'{invocation.duration * 1000:.1f} ms' + (' failed' if invocation.failed else ''))
+
+
+class ThreadDiagnosticsComponent(BaseMainWindowSection):
+    """Thread health component: heartbeats and CPU usage of managed threads and scheduled jobs"""
+    name = 'Thread Diagnostics'
+    handled_events: FrozenSet[str] = frozenset()
+    thread_manager: thread.ThreadManager = inject.attr(thread.ThreadManager)
+
+    refresh_interval = 2000  # ms
+    thread_columns = ('Thread', 'State', 'Target', 'Iterations', 'Last heartbeat, s', 'CPU, s', 'CPU, %')
+    job_columns = ('Job', 'Runs', 'Misfires', 'Last duration, ms', 'CPU, s')
+
+    def __init__(self):
+        super(ThreadDiagnosticsComponent, self).__init__()
+        self.setLayout(QtWidgets.QVBoxLayout())
+        self._cpu_samples: Dict[str, Tuple[float, float]] = {}  # thread name -> cpu time, time.monotonic
+
+        self.threads_table = create_table(self.thread_columns)
+        self.layout().addWidget(self.threads_table)
+
+        self.jobs_table = create_table(self.job_columns)
+        self.layout().addWidget(self.jobs_table)
+
+        if not thread.has_thread_cpu_time():
+            for table, columns in ((self.threads_table, self.thread_columns), (self.jobs_table, self.job_columns)):
+                for column, name in enumerate(columns):
+                    table.setColumnHidden(column, name.startswith('CPU'))
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(self.refresh_interval)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    def refresh(self):
+        """Show current thread health"""
+        if not self.isVisible():
+            return
+        try:
+            self.update_view(self.thread_manager, thread.scheduler)
+        except:
+            logger.exception('Failed to refresh thread diagnostics')
+
+    def update_view(self, thread_manager: thread.ThreadManager, scheduler: thread.Scheduler):
+        """Fill widgets with health of threads of given thread manager and jobs of given scheduler"""
+        now = time.monotonic()
+        rows: List[Tuple[str, ...]] = []
+        for health in thread_manager.get_health():
+            cpu_time, cpu_percent = '', ''
+            if health.cpu_time is not None:
+                previous = self._cpu_samples.get(health.name)
+                self._cpu_samples[health.name] = (health.cpu_time, now)
+                cpu_time = f'{health.cpu_time:.2f}'
+                cpu_percent = f'{(health.cpu_time - previous[0]) / (now - previous[1]) * 100:.1f}' \
+                    if previous and now > previous[1] else '0.0'
+
+            state = 'stuck' if health.stuck else 'stopped' if not health.alive else \
+                'busy' if health.target else 'idle'
+            since_heartbeat = f'{health.since_heartbeat:.1f}' if health.since_heartbeat is not None else ''
+            rows.append((health.name, state, health.target or '', str(health.iterations), since_heartbeat,
+                         cpu_time, cpu_percent))
+        fill_table(self.threads_table, rows)
+
+        fill_table(self.jobs_table, [
+            (job.name, str(job.runs), str(job.misfires),
+             f'{job.last_duration * 1000:.1f}' if job.last_duration is not None else '',
+             f'{job.cpu_time:.2f}' if job.cpu_time is not None else '')
+            for job in scheduler.get_jobs()
+        ])
@@ -76,6 +76,7 @@ class MaterialsStorageModel(QtCore.QAbstractTableModel):
 class MaterialsCollectedComponent(BaseMainWindowSection):
     """Materials collected component"""
     name = 'Materials Collected'
+    handled_events = frozenset({'MaterialCollected'})
 
     def __init__(self):
         super(MaterialsCollectedComponent, self).__init__()
@@ -15,6 +15,7 @@ from edp.gui.components.overlay_widgets.manager import register
 class UnknownSystemsWidget(Ui_Form, JournalEventHandlerMixin, BaseOverlayWidget):
     """Unknown systems widget"""
     friendly_name = 'EDSM unknown systems'
+    handled_events = frozenset({'FSDTarget'})
 
     def __init__(self):
         super(UnknownSystemsWidget, self).__init__()
@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 class SimpleEventsListComponent(BaseMainWindowSection):
     """Events list component"""
     name = 'Simple Events List'
+    handled_events = journal.JOURNAL_FILE_EVENTS
 
     plugin_proxy: plugins.PluginProxy = inject.attr(plugins.PluginProxy)
 
@@ -1,4 +1,6 @@
 """Simple game state overview window section"""
+from typing import FrozenSet
+
 import inject
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot
@@ -11,6 +13,7 @@ from edp.plugins import PluginProxy
 class StateOverviewComponent(BaseMainWindowSection):
     """State overview component"""
     name = 'State Overview'
+    handled_events: FrozenSet[str] = frozenset()
 
     set_game_state_signal = pyqtSignal(gamestate.GameStateData)
 
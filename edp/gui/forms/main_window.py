@@ -9,7 +9,8 @@ import logging
 from PyQt5 import QtWidgets, QtCore
 
 from edp.gui.compiled.main_window import Ui_MainWindow
-from edp.gui.components import state_overview, simple_events_list, materials_collected, main_window_sections
+from edp.gui.components import state_overview, simple_events_list, materials_collected, main_window_sections, \
+    diagnostics
 from edp.gui.forms.settings_window import SettingsWindow
 from edp.plugins import PluginManager
 from edp.signalslib import Signal
@@ -31,6 +32,8 @@ class MainWindow(Ui_MainWindow, QtWidgets.QMainWindow):
         self.sections_view.add_component(state_overview.StateOverviewComponent, enabled=True)
         self.sections_view.add_component(simple_events_list.SimpleEventsListComponent)
         self.sections_view.add_component(materials_collected.MaterialsCollectedComponent)
+        self.sections_view.add_component(diagnostics.SignalDiagnosticsComponent)
+        self.sections_view.add_component(diagnostics.ThreadDiagnosticsComponent)
 
         self.settings_window = SettingsWindow(plugin_manager)
 
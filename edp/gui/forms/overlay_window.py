@@ -25,7 +25,7 @@ OPACITY_FULL = 1.0
 
 logger = logging.getLogger(__name__)
 
-toggle_overlay_signal = signalslib.Signal('toggle overlay ui')
+toggle_overlay_signal = signalslib.Signal('toggle overlay ui').set_priority(signalslib.Priority.INTERACTIVE)
 
 hotkey_list = [
     winhotkeys.HotkeyInfo(winhotkeys.signal_emit_action(toggle_overlay_signal), win32con.VK_TAB, win32con.MOD_CONTROL)
@@ -171,6 +171,7 @@ class OverlayWidgetSelector(QtCore.QObject):
 class GameOverlayWindow(JournalEventHandlerMixin, Ui_Form, QtWidgets.QWidget):
     """Overlay UI window"""
     thread_manager: thread.ThreadManager = inject.attr(thread.ThreadManager)
+    handled_events = frozenset({'Status'})
 
     toggle_visibility_signal = QtCore.pyqtSignal()
 
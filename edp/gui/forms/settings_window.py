@@ -117,6 +117,7 @@ class TabGeneral(VLayoutTab):
 
         yield self.link_checkbox(settings, 'check_for_updates', 'Check for updates')
         yield self.link_checkbox(settings, 'receive_patches', 'Check for patches updates')
+        yield self.link_checkbox(settings, 'enable_journal_archive', 'Index journal history (app restart required)')
 
 
 class SettingsWindow(QtWidgets.QTabWidget):
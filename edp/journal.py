@@ -7,29 +7,101 @@ Defined signals:
 - journal_event_signal: Sent when new journal event is read and parsed
 """
 import datetime
-import json
 import logging
 import os
+import re
 import threading
+import time
 from pathlib import Path
-from typing import NamedTuple, Optional, List, Dict, Any, Iterator
+from typing import NamedTuple, Optional, List, Dict, Any, Iterator, Union, IO, Tuple, Iterable, Set, Container, \
+    Sequence
 
-from edp.signalslib import Signal
+from edp.signalslib import Signal, Backpressure, route
 from edp.thread import StoppableThread
-from edp.utils import from_ed_timestamp
+from edp.utils import from_ed_timestamp, to_ed_timestamp, json_backend
+from edp.utils.fswatch import DirectoryWatcher, get_directory_watcher
+from edp.utils.immutable import FrozenDict, ImmutableMixin, freeze
 
 logger = logging.getLogger(__name__)
 
 
-class Event(NamedTuple):
+class Event(ImmutableMixin):
     """
     Defines an event that was read from journal
+
+    Event line is decoded lazily: timestamp and name are known upfront, `data` is decoded from `raw`
+    on first access. So events that subscribers filter out by name are never fully decoded.
+    Behaves like `(timestamp, name, data, raw)` named tuple.
+
+    Event is immutable: attributes can not be set and `data` is FrozenDict, so event is shared by all signal
+    callbacks instead of being copied for each of them. Use `utils.immutable.OverlayDict` to get changed version
+    of event data, or `_replace` to get changed event.
     """
+    __slots__ = ('timestamp', 'name', '_data', 'raw')
     timestamp: datetime.datetime
     name: str
-    data: Dict[str, Any]
+    _data: Optional[Dict[str, Any]]
     raw: str
 
+    def __init__(self, timestamp: datetime.datetime, name: str, data: Optional[Dict[str, Any]], raw: str):
+        object.__setattr__(self, 'timestamp', timestamp)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, 'raw', raw)
+
+    def __setattr__(self, name: str, value: Any):
+        if name != '_data':  # only decoded data cache is set after init
+            raise AttributeError(f'{self.__class__.__name__} is immutable')
+        super(Event, self).__setattr__(name, value)
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Return event data, decoding event line if required"""
+        data = self._data
+        if isinstance(data, FrozenDict):
+            return data
+
+        if data is None:
+            try:
+                data = json_backend.loads(self.raw)
+            except ValueError:
+                logger.exception('Failed to decode event data: %s', self.raw)
+                data = {'timestamp': to_ed_timestamp(self.timestamp), 'event': self.name}
+        frozen: FrozenDict = freeze(data)
+        self._data = frozen
+        return frozen
+
+    @property
+    def is_decoded(self) -> bool:
+        """Return True if event data is already decoded"""
+        return self._data is not None
+
+    def _replace(self, **kwargs) -> 'Event':
+        """Return new event with given fields replaced, like namedtuple does"""
+        fields: Dict[str, Any] = {'timestamp': self.timestamp, 'name': self.name, 'data': self._data, 'raw': self.raw}
+        fields.update(kwargs)
+        return Event(**fields)
+
+    def __iter__(self):
+        return iter((self.timestamp, self.name, self.data, self.raw))
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return (self.timestamp, self.name, self.raw) == (other.timestamp, other.name, other.raw) and \
+            self.data == other.data
+
+    __hash__ = None  # type: ignore
+
+    def __reduce__(self):
+        return Event, (self.timestamp, self.name, self._data, self.raw)
+
+    def __repr__(self):
+        return f'Event(timestamp={self.timestamp!r}, name={self.name!r}, raw={self.raw!r})'
+
 
 class VersionInfo(NamedTuple):
     """Game version information"""
@@ -37,37 +109,250 @@ class VersionInfo(NamedTuple):
     build: str = 'unknown'
 
 
-journal_event_signal = Signal('journal event', event=Event)
+# Status.json is rewritten many times per second, subscribers need only its latest state
+journal_event_signal = Signal('journal event', event=Event).set_queue_policy(
+    Backpressure.COALESCE, key=lambda data: 'Status' if data['event'].name == 'Status' else None
+).set_route_key(lambda data: data['event'].name)
+
+# Emitted by JournalLiveEventThread when it starts reading journal file, on startup and when game creates new one
+journal_file_opened_signal = Signal('journal file opened', path=Path)
+
+# Single-event companion files, written by game next to journal. Event name -> file name
+COMPANION_FILES: Dict[str, str] = {
+    'Status': 'Status.json',
+    'Cargo': 'Cargo.json',
+    'Market': 'Market.json',
+    'ModuleInfo': 'ModulesInfo.json',
+    'Outfitting': 'Outfitting.json',
+}
+
+_EVENT_HEADER_RE = re.compile(r'\s*"timestamp"\s*:\s*"(?P<timestamp>[^"]*)"\s*,\s*"event"\s*:\s*"(?P<event>[^"]*)"')
+
+
+def peek_event_header(event_line: str) -> Optional[Tuple[str, str]]:
+    """
+    Return (event name, timestamp string) of event line without decoding whole line.
+
+    Game always writes timestamp and event fields first. Return None if line does not start like that.
+    """
+    match = _EVENT_HEADER_RE.match(event_line, 1) if event_line.startswith('{') else None
+    if match is None:
+        return None
+    return match.group('event'), match.group('timestamp')
+
+
+_JSON_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+def is_complete_event_line(line: bytes) -> bool:
+    """
+    Check if event line is completely written, without decoding it.
+
+    Journal line is a single json object, so line is complete if its braces are balanced outside of strings.
+    """
+    line = line.strip()
+    if not line.startswith(b'{') or not line.endswith(b'}'):
+        return False
+    structure = _JSON_STRING_RE.sub(b'', line)
+    return b'"' not in structure and structure.count(b'{') == structure.count(b'}')
 
 
-def get_file_end_pos(filename: str) -> int:
+def handles_events(names: Container[str]):
     """
-    Get EOF offset
+    Declare that decorated journal_event_signal callback handles only events with given names.
+
+    Other events are not queued for it at all. Undeclared callbacks are considered to handle every event.
+    Also used to skip reading companion files like Market.json if nobody wants their events.
     """
-    with open(filename, 'r') as f:
-        f.seek(0, os.SEEK_END)
-        return f.tell()
+    return route(keys=names)
+
+
+class AllEventsExcept:
+    """
+    Container of every event name except given ones.
+
+    Used as `handles_events` names of callbacks that handle almost every event, so events they do not handle
+    are still not queued for them, and companion files with those events are not read for them.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = frozenset(names)
+
+    def __contains__(self, name: object) -> bool:
+        return name not in self.names
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({set(self.names)!r})'
+
+
+# Events written to journal file. Status event is only in Status.json, which is rewritten many times per second
+JOURNAL_FILE_EVENTS = AllEventsExcept({'Status'})
+
+
+def has_event_subscribers(name: str) -> bool:
+    """Check if any journal_event_signal callback may handle event with given name"""
+    return journal_event_signal.has_callbacks(name)
+
+
+def get_file_end_pos(filename: Union[str, Path]) -> int:
+    """
+    Get EOF byte offset
+    """
+    return os.path.getsize(filename)
 
 
 def process_event(event_line: str) -> Event:
     """
     Parse given event string into Event object
 
+    If line starts with timestamp and event fields, as game writes them, rest of the line is not decoded
+    until event data is accessed.
+
     :raise ValueError: if either timestamp or event fields are not present in event
-    :raise json.JSONDecodeError: if unable to parse event string with json
+        or if unable to parse event string with json
+    """
+    header = peek_event_header(event_line)
+    if header is not None:
+        name, timestamp = header
+        return Event(from_ed_timestamp(timestamp), name, None, event_line)
+
+    return make_event(json_backend.loads(event_line), event_line)
+
+
+def make_event(data: Any, event_line: str) -> Event:
     """
-    event = json.loads(event_line)
+    Create Event from decoded event line
 
-    if 'timestamp' not in event:
+    :raise ValueError: if either timestamp or event fields are not present in event
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Invalid event: not a json object')
+    if 'timestamp' not in data:
         raise ValueError('Invalid event dict: missing timestamp field')
-    if 'event' not in event:
+    if 'event' not in data:
         raise ValueError('Invalid event dict: missing event field')
 
-    timestamp = from_ed_timestamp(event['timestamp'])
+    timestamp = from_ed_timestamp(data['timestamp'])
 
-    name: str = event['event']
+    name: str = data['event']
 
-    return Event(timestamp, name, event, event_line)
+    return Event(timestamp, name, data, event_line)
+
+
+def process_events(event_lines: Sequence[str]) -> Iterator[Event]:
+    """
+    Parse many event lines at once, decoding them in bulk.
+
+    Used for catch-up reads, where most of events data will be accessed anyway.
+    Invalid lines are logged and skipped.
+    """
+    event_lines = [line for line in event_lines if line.strip()]
+    for line, data in zip(event_lines, json_backend.loads_many(event_lines)):
+        if isinstance(data, ValueError):
+            logger.error('Failed to process event: %s: %s', line, data)
+            continue
+        try:
+            event = make_event(data, line)
+        except:
+            logger.exception('Failed to process event: %s', line)
+            continue
+        yield event
+
+
+JOURNAL_FILENAME_RE = re.compile(r'^Journal\.(?P<timestamp>.+)\.(?P<part>\d+)\.log$')
+_JOURNAL_TIMESTAMP_RE = re.compile(r'^(\d\d)?(\d\d)-?(\d\d)-?(\d\d)T?(\d\d)(\d\d)(\d\d)$')
+
+
+def get_journal_file_sort_key(path: Path) -> Tuple[datetime.datetime, int]:
+    """
+    Return sort key for journal file, based on timestamp encoded in its name.
+
+    Supports both `Journal.<yymmddHHMMSS>.<part>.log` and `Journal.<yyyy-mm-ddTHHMMSS>.<part>.log` formats.
+    If name does not match known format, file modification time is used.
+    """
+    match = JOURNAL_FILENAME_RE.match(path.name)
+    timestamp_match = match and _JOURNAL_TIMESTAMP_RE.match(match.group('timestamp'))
+    if match and timestamp_match:
+        century, year, month, day, hour, minute, second = timestamp_match.groups()
+        try:
+            dt = datetime.datetime(int(century or '20') * 100 + int(year), int(month), int(day),
+                                   int(hour), int(minute), int(second))
+            return dt, int(match.group('part'))
+        except ValueError:
+            pass
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path)), 0
+
+
+class JournalDirectoryIndex:
+    """
+    Keeps journal files of a directory ordered by timestamp encoded in their names.
+
+    Directory is rescanned only when its modification time changes or when index is invalidated,
+    for example when directory watcher reports new file.
+    """
+    pattern = 'Journal.*.log'
+    # Directory mtime may have coarse resolution, so do not trust it if it is too close to last scan time
+    racy_interval = 2
+
+    def __init__(self, base_dir: Path):
+        self._base_dir = base_dir
+        self._files: List[Path] = []
+        self._names: Set[str] = set()
+        self._dir_mtime_ns: Optional[int] = None
+        self._scanned_at = 0.0
+        self._invalidated = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Force rescan on next access"""
+        self._invalidated = True
+
+    def _is_stale(self) -> bool:
+        dir_mtime_ns: Optional[int]
+        try:
+            dir_mtime_ns = os.stat(self._base_dir).st_mtime_ns
+        except OSError:
+            dir_mtime_ns = None
+
+        if self._invalidated or dir_mtime_ns != self._dir_mtime_ns:
+            self._dir_mtime_ns = dir_mtime_ns
+            return True
+
+        return dir_mtime_ns is not None and self._scanned_at - dir_mtime_ns / 1e9 < self.racy_interval
+
+    def _scan(self) -> List[Path]:
+        try:
+            paths = list(self._base_dir.glob(self.pattern))
+        except OSError:
+            logger.exception('Failed to list journal directory %s', self._base_dir)
+            return []
+
+        keys: Dict[Path, Tuple[datetime.datetime, int]] = {}
+        for path in paths:
+            try:
+                keys[path] = get_journal_file_sort_key(path)
+            except OSError:
+                continue
+        return sorted(keys, key=keys.__getitem__)
+
+    def get_files(self) -> List[Path]:
+        """Return journal files, from oldest to newest"""
+        with self._lock:
+            if self._is_stale():
+                self._invalidated = False
+                self._scanned_at = time.time()
+                self._files = self._scan()
+                self._names = {path.name for path in self._files}
+            return self._files.copy()
+
+    def is_known(self, name: str) -> bool:
+        """Check if file with given name was found by last scan"""
+        return name in self._names
+
+    def get_latest_file(self) -> Optional[Path]:
+        """Return latest journal file or None if nothing found"""
+        files = self.get_files()
+        return files[-1] if files else None
 
 
 class JournalReader:
@@ -81,15 +366,26 @@ class JournalReader:
         self._latest_file: Optional[Path] = None
         self._lock = threading.Lock()
         self._file_event_timestamp: Dict[str, datetime.datetime] = {}
+        self._file_stat: Dict[Path, Tuple[int, int]] = {}
+        self._file_index = JournalDirectoryIndex(base_dir)
+
+    @property
+    def base_dir(self) -> Path:
+        """Return journal directory path"""
+        return self._base_dir
+
+    @property
+    def file_index(self) -> JournalDirectoryIndex:
+        """Return journal files index"""
+        return self._file_index
 
     def get_latest_file(self) -> Optional[Path]:
         """
-        Return latest journal file path, by its modification time.
+        Return latest journal file path, by timestamp in its name.
 
         Return None if nothing found.
         """
-        files_list = sorted(self._base_dir.glob('Journal.*.log'), key=os.path.getmtime)
-        return files_list[-1] if files_list else None
+        return self._file_index.get_latest_file()
 
     @staticmethod
     def read_all_file_events(path: Path) -> Iterator['Event']:
@@ -99,14 +395,12 @@ class JournalReader:
         try:
             # noinspection PyTypeChecker
             with path.open('r', encoding='utf-8') as f:
-                for line in f.readlines():
-                    try:
-                        yield process_event(line)
-                    except:
-                        logger.exception('Failed to process event: %s', line)
-                        continue
+                lines = f.read().splitlines()
         except:
             logger.exception('Failed to read events from file %s', path)
+            return
+
+        yield from process_events(lines)
 
     def get_latest_file_events(self) -> List[Event]:
         """
@@ -129,28 +423,6 @@ class JournalReader:
 
         return self._latest_file_events.copy()
 
-    def _get_file_event(self, path: Path) -> Optional[Event]:  # pylint: disable=no-self-use
-        """
-        Return single event from a single-event file like Status.json
-
-        If path not exist, return None. If error happens, return None.
-        All errors are suppressed and logged.
-        Sometimes path may be empty, so JSONDecodeError just logged at DEBUG level.
-        """
-        if not path.exists():
-            return None
-
-        with path.open('r', encoding='utf-8') as f:
-            try:
-                event_line = f.read().strip()
-                return process_event(event_line)
-            except json.decoder.JSONDecodeError:
-                logger.debug(f'JSONDecodeError while reading {path.name}')
-            except:
-                logger.exception(f'Failed to read status from {path}')
-
-        return None
-
     def _filter_file_event(self, event: Event) -> Optional[Event]:
         """
         Filter event and return it only if it newer that previous.
@@ -167,44 +439,98 @@ class JournalReader:
 
         return None
 
+    def _read_file_if_changed(self, path: Path) -> Optional[str]:
+        """
+        Return file content if its size or modification time changed since previous call.
+
+        Return None if file not changed or not exists.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._file_stat.pop(path, None)
+            return None
+
+        file_stat = (stat.st_size, stat.st_mtime_ns)
+        if self._file_stat.get(path) == file_stat:
+            return None
+
+        try:
+            with path.open('r', encoding='utf-8') as f:
+                content = f.read().strip()
+        except (OSError, UnicodeDecodeError):
+            # File may be locked by game while it writes it, so try again on next call
+            logger.exception(f'Failed to read {path}')
+            return None
+
+        self._file_stat[path] = file_stat
+        return content
+
     def _get_file_event_filtered(self, path: Path) -> Optional[Event]:
         """
         Return Event from single-event file, only if it newer than prevous.
+
+        File is not opened if it is unchanged since previous call.
+        Event line is not decoded here, only its header is parsed. Data is decoded when subscribers access it.
+        """
+        event_line = self._read_file_if_changed(path)
+        if not event_line:
+            return None
+
+        # Game may be in the middle of rewriting the file, so line is checked to be complete before its timestamp
+        # is remembered. Otherwise complete version of this event would be filtered out as not newer.
+        if not is_complete_event_line(event_line.encode('utf-8')):
+            logger.debug(f'Incomplete event in {path.name}')
+            return None
+
+        try:
+            event = process_event(event_line)
+        except ValueError:
+            logger.debug(f'Invalid event in {path.name}')
+            return None
+        except:
+            logger.exception(f'Failed to read status from {path}')
+            return None
+
+        return self._filter_file_event(event)
+
+    def get_companion_file_event(self, name: str) -> Optional[Event]:
         """
-        event = self._get_file_event(path)
-        if event:
-            event = self._filter_file_event(event)
-        return event
+        Return event from companion file of given event name, like Status.json for Status event.
+
+        :raises KeyError: If there is no companion file for event name
+        """
+        return self._get_file_event_filtered(self._base_dir / COMPANION_FILES[name])
 
     def get_status_file_event(self) -> Optional[Event]:
         """
         Return Status.json file event
         """
-        return self._get_file_event_filtered(self._base_dir / 'Status.json')
+        return self.get_companion_file_event('Status')
 
     def get_cargo_file_event(self) -> Optional[Event]:
         """
         Return Cargo.json file event
         """
-        return self._get_file_event_filtered(self._base_dir / 'Cargo.json')
+        return self.get_companion_file_event('Cargo')
 
     def get_market_file_event(self) -> Optional[Event]:
         """
         Return Market.json file event
         """
-        return self._get_file_event_filtered(self._base_dir / 'Market.json')
+        return self.get_companion_file_event('Market')
 
     def get_modules_info_file_event(self) -> Optional[Event]:
         """
         Return ModulesInfo.json file event
         """
-        return self._get_file_event_filtered(self._base_dir / 'ModulesInfo.json')
+        return self.get_companion_file_event('ModuleInfo')
 
     def get_outfitting_file_event(self) -> Optional[Event]:
         """
         Return Outfitting.json file event
         """
-        return self._get_file_event_filtered(self._base_dir / 'Outfitting.json')
+        return self.get_companion_file_event('Outfitting')
 
     def get_game_version_info(self) -> Optional[VersionInfo]:
         """
@@ -219,46 +545,194 @@ class JournalReader:
         return None
 
 
+class JournalFileTailer:
+    """
+    Incrementally read lines appended to a journal file.
+
+    File is opened in binary mode and handle is kept open between reads, so every read costs
+    only the bytes appended since the previous one. Incomplete trailing line (game has not finished writing it yet)
+    is held back until it is finished.
+    """
+
+    def __init__(self):
+        self._path: Optional[Path] = None
+        self._file: Optional[IO[bytes]] = None
+        self._pos = 0
+        self._pending = b''
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Return path of currently tailed file"""
+        return self._path
+
+    @property
+    def position(self) -> int:
+        """Return byte offset of the end of last complete line"""
+        return self._pos - len(self._pending)
+
+    def open(self, path: Path, pos: int = 0):
+        """
+        Start tailing given file from byte offset. Closes previous file.
+
+        Should be called only on journal rotation.
+        """
+        self.close()
+        # noinspection PyTypeChecker
+        file = path.open('rb')
+        file.seek(pos, os.SEEK_SET)
+        self._file = file
+        self._path = path
+        self._pos = pos
+
+    def close(self):
+        """Close tailed file"""
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._path = None
+        self._pos = 0
+        self._pending = b''
+
+    def read_lines(self) -> List[str]:
+        """
+        Return complete lines appended since last read.
+
+        Empty lines are skipped. If file was truncated, it is read again from the beginning.
+        """
+        if self._file is None:
+            return []
+
+        if os.fstat(self._file.fileno()).st_size < self._pos:
+            logger.debug('Journal file %s truncated, reading from start', self._path)
+            self._file.seek(0, os.SEEK_SET)
+            self._pos = 0
+            self._pending = b''
+
+        chunk = self._file.read()
+        if not chunk:
+            return []
+
+        self._pos += len(chunk)
+        *lines, self._pending = (self._pending + chunk).split(b'\n')
+
+        if self._pending.strip() and is_complete_event_line(self._pending):
+            lines.append(self._pending)
+            self._pending = b''
+
+        result = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result.append(line.decode('utf-8'))
+            except UnicodeDecodeError:
+                logger.exception('Failed to decode journal line: %s', line)
+        return result
+
+
 class JournalLiveEventThread(StoppableThread):
     """
     Read journal events in a thread
+
+    If platform supports it, journal directory is watched for changes and journal is read only when
+    something changes. Otherwise directory is polled, every `interval` seconds while game session is active
+    and every `idle_interval` seconds after Shutdown event or `idle_timeout` seconds without any events.
     """
-    interval = 1
+    interval: Union[int, float] = 1
+    idle_interval: Union[int, float] = 10
+    idle_timeout: Union[int, float] = 300
 
-    def __init__(self, journal_reader: JournalReader):
+    def __init__(self, journal_reader: JournalReader, use_watcher: bool = True):
         super(JournalLiveEventThread, self).__init__()
 
         self._journal_reader = journal_reader
+        self._use_watcher = use_watcher
 
         self._current_file: Optional[Path] = None
         self._last_file: Optional[Path] = None
-        self._last_pos = 0
+        self._tailer = JournalFileTailer()
+
+        self._session_active = True
+        self._last_activity = time.monotonic()
 
     def run(self):
         self._last_file = self._journal_reader.get_latest_file()
 
-        while not self.is_stopped:
-            try:
-                self.read_journal()
-                self.read_status_files()
-            except:
-                logger.exception('Error reading journal')
-            finally:
-                self.sleep(self.interval)
+        watcher = get_directory_watcher(self._journal_reader.base_dir) if self._use_watcher else None
+        if watcher:
+            logger.debug('Watching journal directory with %s', watcher)
+
+        try:
+            while not self.is_stopped:
+                self.heartbeat('read journal')
+                try:
+                    self.read_journal()
+                    self.read_status_files()
+                except:
+                    logger.exception('Error reading journal')
+                finally:
+                    self.wait_for_changes(watcher)
+        finally:
+            self._tailer.close()
+            if watcher:
+                watcher.close()
+
+    def get_poll_interval(self) -> Union[int, float]:
+        """
+        Return current polling interval.
+
+        Backs off to `idle_interval` if game is not running.
+        """
+        if not self._session_active or time.monotonic() - self._last_activity > self.idle_timeout:
+            return self.idle_interval
+        return self.interval
+
+    def wait_for_changes(self, watcher: Optional[DirectoryWatcher] = None):
+        """
+        Wait until journal directory changes.
+
+        Without watcher just sleeps for current polling interval.
+        With watcher waits for change notification, but no longer than `idle_interval`.
+        """
+        if watcher is None:
+            self.sleep(self.get_poll_interval())
+            return
+
+        self.idle()
+        remaining = self.idle_interval
+        while remaining > 0 and not self.is_stopped:
+            timeout = min(remaining, 1)
+            changed = watcher.wait(timeout)
+            if changed:
+                self.on_files_changed(changed)
+                return
+            remaining -= timeout
+
+    def on_files_changed(self, names: Iterable[str]):
+        """Invalidate journal files index if watcher reported new journal files"""
+        file_index = self._journal_reader.file_index
+        if any(JOURNAL_FILENAME_RE.match(name) and not file_index.is_known(name) for name in names):
+            file_index.invalidate()
+
+    def register_activity(self, event: Event):
+        """Track game session activity by journal events to adapt polling interval"""
+        self._last_activity = time.monotonic()
+        self._session_active = event.name != 'Shutdown'
 
     def read_status_files(self):
         """
         Read all single-event files like Status.json and emit journal_event_signal on their events.
+
+        Files whose events nobody handles are not read at all.
         """
-        events: List[Optional[Event]] = [
-            self._journal_reader.get_status_file_event(),
-            self._journal_reader.get_cargo_file_event(),
-            self._journal_reader.get_market_file_event(),
-            self._journal_reader.get_modules_info_file_event(),
-            self._journal_reader.get_outfitting_file_event()
-        ]
-        for event in filter(None, events):
-            journal_event_signal.emit(event=event)
+        for name in COMPANION_FILES:
+            if not has_event_subscribers(name):
+                continue
+            event = self._journal_reader.get_companion_file_event(name)
+            if event is not None:
+                self.register_activity(event)
+                journal_event_signal.emit(event=event)
 
     def read_journal(self):
         """
@@ -278,34 +752,28 @@ class JournalLiveEventThread(StoppableThread):
 
             if self._current_file is None and self._last_file is not None:
                 logger.debug('Startup skipping existing journal content')
-                self._last_pos = get_file_end_pos(latest_file)
+                pos = get_file_end_pos(latest_file)
             else:
-                self._last_pos = 0
+                pos = 0
 
+            self._tailer.open(latest_file, pos)
             self._current_file = latest_file
+            journal_file_opened_signal.emit(path=latest_file)
 
-        self._last_pos = self.read_file(self._current_file, self._last_pos)
+        self.read_new_lines()
         self._last_file = latest_file
 
-    def read_file(self, filename: Path, pos: int = 0) -> int:
+    def read_new_lines(self):
         """
-        Read given journal file from position.
-
-        Returns EOF offest.
+        Process lines appended to current journal file since last read.
         """
-        num_events = 0
-
-        # noinspection PyTypeChecker
-        with open(filename, 'r', encoding='utf-8') as f:
-            f.seek(pos, os.SEEK_SET)
-
-            for num_events, line in enumerate(f.readlines()):
-                self.process_line(line)
+        lines = self._tailer.read_lines()
 
-            if num_events:
-                logger.debug('Read %s events', num_events)
+        for line in lines:
+            self.process_line(line)
 
-            return f.tell()
+        if lines:
+            logger.debug('Read %s events', len(lines))
 
     def process_line(self, line: str):  # pylint: disable=no-self-use
         """
@@ -317,4 +785,5 @@ class JournalLiveEventThread(StoppableThread):
             logger.exception('Failed to process event: %s', line)
             return
 
+        self.register_activity(processed_event)
         journal_event_signal.emit(event=processed_event)
@@ -0,0 +1,479 @@
+"""
+Persistent index of the whole journal history.
+
+JournalArchive records location (file, byte offset, length) and a few key fields of every journal event
+in sqlite database. Historical queries are answered from the index, and events are read by seeking
+straight to their offsets instead of scanning journal files.
+"""
+import collections
+import concurrent.futures
+import datetime
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional, List, Iterator, Iterable, Tuple, Union, Callable, Deque
+
+from edp.journal import JournalDirectoryIndex, Event, peek_event_header, process_event
+from edp.thread import StoppableThread
+from edp.utils import json_backend, to_ed_timestamp, from_ed_timestamp
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    indexed_size INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS events (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    name TEXT NOT NULL,
+    system_address INTEGER,
+    market_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_timestamp ON events(timestamp);
+CREATE INDEX IF NOT EXISTS events_name_timestamp ON events(name, timestamp);
+CREATE INDEX IF NOT EXISTS events_system_address ON events(system_address);
+CREATE INDEX IF NOT EXISTS events_market_id ON events(market_id);
+'''
+
+_SYSTEM_ADDRESS_RE = re.compile(rb'"SystemAddress"\s*:\s*(\d+)')
+_MARKET_ID_RE = re.compile(rb'"MarketID"\s*:\s*(\d+)')
+
+
+class EventRecord(NamedTuple):
+    """Indexed event line location and key fields"""
+    offset: int
+    length: int
+    timestamp: str
+    name: str
+    system_address: Optional[int]
+    market_id: Optional[int]
+
+
+class FileRecords(NamedTuple):
+    """Index records read from a journal file"""
+    name: str
+    records: List[EventRecord]
+    start: int  # byte offset records were read from
+    indexed_size: int  # byte offset index covers after these records
+    reset: bool  # file shrunk and must be indexed from scratch
+
+
+class EventLocation(NamedTuple):
+    """Location of event line in journal file"""
+    path: Path
+    offset: int
+    length: int
+    timestamp: datetime.datetime
+    name: str
+
+
+def _search_int(pattern, line: bytes) -> Optional[int]:
+    match = pattern.search(line)
+    return int(match.group(1)) if match else None
+
+
+def parse_record(line: bytes, offset: int) -> Optional[EventRecord]:
+    """
+    Build index record of a single journal line.
+
+    Line is not decoded as a whole if it starts with timestamp and event fields.
+    Return None if line is not a valid event.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+
+    try:
+        text = stripped.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+    header = peek_event_header(text)
+    if header is not None:
+        name, timestamp = header
+        return EventRecord(offset, len(line), timestamp, name,
+                           _search_int(_SYSTEM_ADDRESS_RE, stripped), _search_int(_MARKET_ID_RE, stripped))
+
+    try:
+        data = json_backend.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or 'timestamp' not in data or 'event' not in data:
+        return None
+    return EventRecord(offset, len(line), data['timestamp'], data['event'],
+                       data.get('SystemAddress'), data.get('MarketID'))
+
+
+def parse_records(data: bytes, base_offset: int = 0) -> Tuple[List[EventRecord], int]:
+    """
+    Build index records of complete lines in journal file chunk.
+
+    :returns: List of records and length of chunk part that was consumed (up to last newline)
+    """
+    end = data.rfind(b'\n') + 1
+    records: List[EventRecord] = []
+    offset = 0
+    while offset < end:
+        line_end = data.index(b'\n', offset) + 1
+        record = parse_record(data[offset:line_end], base_offset + offset)
+        if record is not None:
+            records.append(record)
+        offset = line_end
+    return records, end
+
+
+def read_file_records(path: Path, indexed_size: int = 0) -> FileRecords:
+    """
+    Read index records of journal file lines after `indexed_size` bytes.
+
+    If file became smaller than indexed size, it is read from the beginning.
+    """
+    reset = path.stat().st_size < indexed_size
+    start = 0 if reset else indexed_size
+
+    # noinspection PyTypeChecker
+    with path.open('rb') as f:
+        f.seek(start)
+        data = f.read()
+
+    records, consumed = parse_records(data, start)
+    return FileRecords(path.name, records, start, start + consumed, reset)
+
+
+class JournalArchive:
+    """
+    Persistent sqlite index of all journal files in journal directory.
+
+    Call :py:meth:`update` to index new files and lines appended to already indexed files.
+    While game runs, only live journal file grows: bind :py:meth:`on_journal_file_opened` to
+    journal_file_opened_signal and live file is indexed on every query, other files are not checked.
+    """
+
+    def __init__(self, db_path: Union[str, Path], journal_dir: Path):
+        self._journal_dir = journal_dir
+        self._live_file: Optional[Path] = None
+        self._file_index = JournalDirectoryIndex(journal_dir)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close database"""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_file(self, name: str) -> Tuple[int, int]:
+        """Return file id and indexed size, register file if not known"""
+        row = self._connection.execute('SELECT id, indexed_size FROM files WHERE name = ?', (name,)).fetchone()
+        if row is not None:
+            return row
+        cursor = self._connection.execute('INSERT INTO files (name) VALUES (?)', (name,))
+        assert cursor.lastrowid is not None
+        return cursor.lastrowid, 0
+
+    def get_indexed_size(self, name: str) -> int:
+        """Return number of bytes of journal file that are indexed"""
+        with self._lock:
+            row = self._connection.execute('SELECT indexed_size FROM files WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def get_journal_files(self) -> List[Path]:
+        """Return journal files, from oldest to newest"""
+        return self._file_index.get_files()
+
+    def add_file_records(self, file_records: FileRecords) -> bool:
+        """
+        Store index records of journal file.
+
+        Records are stored only if they continue already indexed part of file, so concurrent updates
+        of the same file do not duplicate events.
+
+        :returns: True if records were stored
+        """
+        with self._lock, self._connection:
+            file_id, indexed_size = self._get_file(file_records.name)
+            if not file_records.reset and indexed_size != file_records.start:
+                logger.debug(f'Skipping stale records of {file_records.name}')
+                return False
+            if file_records.reset:
+                self._connection.execute('DELETE FROM events WHERE file_id = ?', (file_id,))
+            self._connection.executemany(
+                'INSERT INTO events (file_id, offset, length, timestamp, name, system_address, market_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((file_id, *record) for record in file_records.records)
+            )
+            self._connection.execute('UPDATE files SET indexed_size = ? WHERE id = ?',
+                                     (file_records.indexed_size, file_id))
+        return True
+
+    def update_file(self, path: Path) -> int:
+        """
+        Index lines appended to journal file since previous update.
+
+        If file became smaller than indexed size, it is indexed from scratch.
+
+        :returns: Number of indexed events
+        """
+        indexed_size = self.get_indexed_size(path.name)
+        if path.stat().st_size == indexed_size:
+            return 0
+
+        file_records = read_file_records(path, indexed_size)
+        if file_records.reset:
+            logger.debug(f'Journal file {path.name} shrunk, reindexing')
+
+        return len(file_records.records) if self.add_file_records(file_records) else 0
+
+    def update(self) -> int:
+        """
+        Index new journal files and new lines of already indexed files.
+
+        :returns: Number of indexed events
+        """
+        total = 0
+        for path in self.get_journal_files():
+            try:
+                total += self.update_file(path)
+            except:
+                logger.exception(f'Failed to index journal file {path}')
+        if total:
+            logger.debug(f'Indexed {total} journal events')
+        return total
+
+    def on_journal_file_opened(self, path: Path):
+        """Index journal file that live journal reader started reading, and rest of previous live file"""
+        previous, self._live_file = self._live_file, path
+        self._try_update_file(previous)
+        self._try_update_file(path)
+
+    def _try_update_file(self, path: Optional[Path]):
+        if path is None:
+            return
+        try:
+            self.update_file(path)
+        except:
+            logger.exception(f'Failed to index journal file {path}')
+
+    # pylint: disable=too-many-arguments
+    def find(self, *names: str, start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None,
+             system_address: Optional[int] = None, market_id: Optional[int] = None,
+             limit: Optional[int] = None, reverse: bool = False) -> List[EventLocation]:
+        """
+        Find indexed events. Lines appended to live journal file are indexed first.
+
+        :param names: Event names, all events if not set
+        :param start: Find events with timestamp greater or equal to start
+        :param end: Find events with timestamp less than end
+        :param reverse: Return newest events first
+        """
+        query = 'SELECT files.name, events.offset, events.length, events.timestamp, events.name ' \
+                'FROM events JOIN files ON files.id = events.file_id'
+        conditions: List[str] = []
+        params: list = []
+
+        if names:
+            conditions.append(f'events.name IN ({", ".join("?" * len(names))})')
+            params.extend(names)
+        if start is not None:
+            conditions.append('events.timestamp >= ?')
+            params.append(to_ed_timestamp(start))
+        if end is not None:
+            conditions.append('events.timestamp < ?')
+            params.append(to_ed_timestamp(end))
+        if system_address is not None:
+            conditions.append('events.system_address = ?')
+            params.append(system_address)
+        if market_id is not None:
+            conditions.append('events.market_id = ?')
+            params.append(market_id)
+
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        order = 'DESC' if reverse else 'ASC'
+        query += f' ORDER BY events.timestamp {order}, files.name {order}, events.offset {order}'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        self._try_update_file(self._live_file)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        return [EventLocation(self._journal_dir / file_name, offset, length,
+                              from_ed_timestamp(timestamp), name)
+                for file_name, offset, length, timestamp, name in rows]
+
+    @staticmethod
+    def read_events(locations: Iterable[EventLocation]) -> Iterator[Event]:
+        """
+        Read events by their locations, seeking directly to their offsets.
+
+        Errors are logged and unreadable events skipped.
+        """
+        current_path: Optional[Path] = None
+        f = None
+        try:
+            for location in locations:
+                try:
+                    if f is None or location.path != current_path:
+                        if f is not None:
+                            f.close()
+                            f = None
+                        # noinspection PyTypeChecker
+                        f = location.path.open('rb')
+                        current_path = location.path
+                    f.seek(location.offset)
+                    line = f.read(location.length).decode('utf-8').strip()
+                    event = process_event(line)
+                except:
+                    logger.exception(f'Failed to read event at {location}')
+                    continue
+                yield event
+        finally:
+            if f is not None:
+                f.close()
+
+    def get_events(self, *names: str, **kwargs) -> Iterator[Event]:
+        """
+        Find and read events.
+
+        Accepts same arguments as :py:meth:`find`
+        """
+        return self.read_events(self.find(*names, **kwargs))
+
+    def get_last_event(self, name: str, before: Optional[datetime.datetime] = None) -> Optional[Event]:
+        """Return latest event with given name, optionally before given time"""
+        return next(self.get_events(name, end=before, limit=1, reverse=True), None)
+
+
+class ImportProgress(NamedTuple):
+    """Bulk import progress"""
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    events: int
+
+
+def log_import_progress(progress: ImportProgress):
+    """Default progress callback, logs import progress"""
+    logger.info(f'Journal import: {progress.files_done}/{progress.files_total} files, '
+                f'{progress.bytes_done * 100 // max(progress.bytes_total, 1)}%, {progress.events} events')
+
+
+def _read_file_records_job(job: Tuple[Path, int]) -> FileRecords:
+    return read_file_records(*job)
+
+
+class JournalBulkImporter:
+    """
+    Import whole journal history into archive using multiple processes.
+
+    Journal files are sharded across process pool. Workers read and parse files and return compact
+    index records, which are stored in file timestamp order. Every file is stored in its own transaction,
+    so interrupted import resumes from first not completely imported file.
+    """
+    # Number of files per worker that are read ahead of stored ones
+    read_ahead = 2
+
+    def __init__(self, archive: JournalArchive, workers: Optional[int] = None,
+                 progress: Optional[Callable[[ImportProgress], None]] = log_import_progress):
+        """
+        :param workers: Number of worker processes, cpu count by default. If 1, import in current process.
+        :param progress: Callback called after every imported file
+        """
+        self._archive = archive
+        self._workers = workers or os.cpu_count() or 1
+        self._progress = progress
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop import after currently stored file. Next run continues from where it was stopped."""
+        self._cancelled = True
+
+    def get_jobs(self) -> List[Tuple[Path, int]]:
+        """Return (path, indexed size) of journal files that are not completely imported, oldest first"""
+        jobs = []
+        for path in self._archive.get_journal_files():
+            indexed_size = self._archive.get_indexed_size(path.name)
+            if path.stat().st_size != indexed_size:
+                jobs.append((path, indexed_size))
+        return jobs
+
+    def iter_file_records(self, jobs: List[Tuple[Path, int]]) -> Iterator[FileRecords]:
+        """Read records of given jobs in parallel and yield them in jobs order"""
+        if self._workers == 1 or len(jobs) <= 1:
+            yield from map(_read_file_records_job, jobs)
+            return
+
+        # Only limited number of files is read ahead, so parsed records do not pile up in memory
+        window = self._workers * self.read_ahead
+        futures: Deque[concurrent.futures.Future] = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(self._workers) as executor:
+            try:
+                for job in jobs:
+                    futures.append(executor.submit(_read_file_records_job, job))
+                    if len(futures) >= window:
+                        yield futures.popleft().result()
+                while futures:
+                    yield futures.popleft().result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def run(self) -> int:
+        """
+        Import all not yet imported journal files.
+
+        :returns: Number of imported events
+        """
+        jobs = self.get_jobs()
+        sizes = {path.name: path.stat().st_size - indexed_size for path, indexed_size in jobs}
+        bytes_total = sum(sizes.values())
+        bytes_done = events = 0
+        self._cancelled = False
+
+        for files_done, file_records in enumerate(self.iter_file_records(jobs), 1):
+            if self._cancelled:
+                logger.info('Journal import cancelled')
+                break
+            if self._archive.add_file_records(file_records):
+                events += len(file_records.records)
+            bytes_done += sizes[file_records.name]
+            if self._progress is not None:
+                self._progress(ImportProgress(files_done, len(jobs), bytes_done, bytes_total, events))
+
+        return events
+
+
+class JournalBulkImportThread(StoppableThread):
+    """Run bulk journal import once in background"""
+
+    def __init__(self, importer: JournalBulkImporter, **kwargs):
+        super(JournalBulkImportThread, self).__init__(**kwargs)
+        self._importer = importer
+
+    def run(self):
+        try:
+            events = self._importer.run()
+            logger.info(f'Journal import finished, {events} events imported')
+        except:
+            logger.exception('Journal import failed')
+
+    def stop(self):
+        super(JournalBulkImportThread, self).stop()
+        self._importer.cancel()
@@ -0,0 +1,238 @@
+"""
+Replay recorded journal files through journal_event_signal.
+
+JournalReplayThread stands in for JournalLiveEventThread and emits events of given journal files
+at real time speed, scaled speed or as fast as possible. It measures how subscribers keep up:
+emitted events per second, end-to-end dispatch latency and time spent in every subscriber.
+"""
+import functools
+import logging
+import statistics
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional, List, Dict, Callable, Iterator, Union, NamedTuple
+
+from edp.journal import Event, JournalReader, journal_event_signal, get_journal_file_sort_key
+from edp.signalslib import get_callback_name
+from edp.thread import StoppableThread
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayReport(NamedTuple):
+    """Replay measurements. Times are in seconds."""
+    events: int
+    duration: float
+    events_per_second: float
+    latency_mean: float
+    latency_p95: float
+    latency_max: float
+    subscriber_time: Dict[str, float]
+    subscriber_calls: Dict[str, int]
+
+    def format(self) -> str:
+        """Return human readable report"""
+        lines = [
+            f'{self.events} events in {self.duration:.3f} s, {self.events_per_second:.1f} events/s',
+            f'dispatch latency: mean {self.latency_mean * 1000:.3f} ms, '
+            f'p95 {self.latency_p95 * 1000:.3f} ms, max {self.latency_max * 1000:.3f} ms',
+        ]
+        for name, total in sorted(self.subscriber_time.items(), key=lambda item: item[1], reverse=True):
+            calls = self.subscriber_calls[name]
+            lines.append(f'  {name}: {total * 1000:.3f} ms total, {calls} calls, '
+                         f'{total * 1000 / max(calls, 1):.3f} ms per call')
+        return '\n'.join(lines)
+
+
+def _percentile(values: List[float], percent: int) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * percent // 100)]
+
+
+class DispatchRecorder:
+    """
+    Measure journal_event_signal dispatch.
+
+    While installed, signal callbacks are replaced with timing wrappers, bound with options of original callbacks:
+    route, priority and timeout.
+    Event latency is time between `on_emit` call and return of the last callback that handled the event.
+    """
+
+    def __init__(self):
+        self._original_callbacks: Optional[List[Callable]] = None
+        self._emit_times: Dict[int, float] = {}
+        self._pending: Dict[int, int] = {}  # emitted event id -> number of callbacks yet to handle it
+        self._latencies: List[float] = []
+        self._subscriber_time: Dict[str, float] = defaultdict(float)
+        self._subscriber_calls: Dict[str, int] = defaultdict(int)
+        self._emitted = 0
+        self._done = threading.Condition()
+
+    def install(self):
+        """Wrap current journal_event_signal callbacks"""
+        self._original_callbacks = list(journal_event_signal.callbacks)
+        journal_event_signal.callbacks[:] = [self._wrap(callback) for callback in self._original_callbacks]
+
+    def uninstall(self):
+        """Restore original journal_event_signal callbacks"""
+        if self._original_callbacks is not None:
+            journal_event_signal.callbacks[:] = self._original_callbacks
+            self._original_callbacks = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    def _wrap(self, callback: Callable) -> Callable:
+        name = get_callback_name(callback)
+
+        def wrapper(**kwargs):
+            start = time.perf_counter()
+            try:
+                return callback(**kwargs)
+            finally:
+                self._on_dispatched(name, id(kwargs.get('event')), start, time.perf_counter())
+
+        functools.update_wrapper(wrapper, callback)
+        # binding options of bound methods live on underlying function, outside of method __dict__
+        for attr in dir(callback):
+            if attr.startswith('__edp_signal_'):
+                setattr(wrapper, attr, getattr(callback, attr))
+        return wrapper
+
+    def on_emit(self, event: Event):
+        """Register that event is about to be emitted"""
+        with self._done:
+            if self._original_callbacks is not None:
+                # events are shared by callbacks, not copied, so event identity is kept until it is handled
+                receivers = len(journal_event_signal.get_callbacks({'event': event}))
+                if receivers:
+                    self._emit_times[id(event)] = time.perf_counter()
+                    self._pending[id(event)] = receivers
+            self._emitted += 1
+
+    def _on_dispatched(self, name: str, event_id: int, start: float, end: float):
+        with self._done:
+            self._subscriber_time[name] += end - start
+            self._subscriber_calls[name] += 1
+            if event_id not in self._pending:
+                return
+            self._pending[event_id] -= 1
+            if not self._pending[event_id]:
+                del self._pending[event_id]
+                self._latencies.append(end - self._emit_times.pop(event_id))
+                self._done.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all emitted events are dispatched to subscribers
+
+        :returns: False on timeout
+        """
+        with self._done:
+            return self._done.wait_for(lambda: not self._pending, timeout)
+
+    def get_report(self, duration: float) -> ReplayReport:
+        """Return measurements of events emitted so far"""
+        with self._done:
+            latencies = list(self._latencies)
+            subscriber_time = dict(self._subscriber_time)
+            subscriber_calls = dict(self._subscriber_calls)
+        return ReplayReport(
+            events=self._emitted,
+            duration=duration,
+            events_per_second=self._emitted / duration if duration else 0.0,
+            latency_mean=statistics.mean(latencies) if latencies else 0.0,
+            latency_p95=_percentile(latencies, 95),
+            latency_max=max(latencies, default=0.0),
+            subscriber_time=subscriber_time,
+            subscriber_calls=subscriber_calls,
+        )
+
+
+def get_replay_files(path: Path) -> List[Path]:
+    """Return journal files to replay: given file or all journal files in given directory, oldest first"""
+    if path.is_file():
+        return [path]
+    return sorted(path.glob('Journal.*.log'), key=get_journal_file_sort_key)
+
+
+def iter_replay_events(files: Iterable[Path]) -> Iterator[Event]:
+    """Read all events of given journal files"""
+    for path in files:
+        yield from JournalReader.read_all_file_events(path)
+
+
+class JournalReplayThread(StoppableThread):
+    """
+    Emit events of recorded journal files, like JournalLiveEventThread does for live journal.
+
+    With `speed` set, relative timing of events is preserved and scaled: speed 1 replays in real time,
+    speed 10 - ten times faster. Without `speed` events are emitted as fast as possible.
+    Gaps between events are limited to `max_delay` seconds of replay time, so hours between game sessions
+    are skipped.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, files: Iterable[Path], speed: Optional[Union[int, float]] = None,
+                 max_delay: Union[int, float] = 10, wait_timeout: Union[int, float] = 60,
+                 on_finish: Optional[Callable[[ReplayReport], None]] = None):
+        """
+        :param wait_timeout: How long to wait for subscribers to process emitted events after replay ends
+        :param on_finish: Callback called with replay report after replay finished
+        """
+        super(JournalReplayThread, self).__init__()
+        self._files = list(files)
+        self._speed = speed
+        self._max_delay = max_delay
+        self._wait_timeout = wait_timeout
+        self._on_finish = on_finish
+        self.report: Optional[ReplayReport] = None
+
+    def run(self):
+        recorder = DispatchRecorder()
+        start = time.perf_counter()
+
+        with recorder:
+            try:
+                self.replay(recorder)
+            except:
+                logger.exception('Error replaying journal')
+
+            if not recorder.wait(self._wait_timeout):
+                logger.warning(f'Subscribers did not process replayed events in {self._wait_timeout} seconds')
+
+        self.report = recorder.get_report(time.perf_counter() - start)
+        logger.info(f'Journal replay finished:\n{self.report.format()}')
+
+        if self._on_finish is not None:
+            self._on_finish(self.report)
+
+    def replay(self, recorder: DispatchRecorder):
+        """Emit events of journal files, keeping their relative timing if speed is set"""
+        replay_time = 0.0
+        previous: Optional[Event] = None
+        start = time.perf_counter()
+
+        for event in iter_replay_events(self._files):
+            if self.is_stopped:
+                break
+
+            if self._speed and previous is not None:
+                gap = (event.timestamp - previous.timestamp).total_seconds()
+                replay_time += min(max(gap, 0), self._max_delay) / self._speed
+                delay = start + replay_time - time.perf_counter()
+                if delay > 0:
+                    self.sleep(delay)
+            previous = event
+
+            self.heartbeat('replay')
+            recorder.on_emit(event)
+            journal_event_signal.emit(event=event)
@@ -1,18 +1,20 @@
 """
 Implementation of EDP's plugin system
 """
+import asyncio
 import functools
 import importlib.util
 import inspect
 import logging
 from pathlib import Path
 from types import ModuleType
-from typing import Iterator, Type, List, Dict, Optional, NamedTuple, Tuple, Iterable, Callable, Union
+from typing import Iterator, Type, List, Dict, Optional, NamedTuple, Tuple, Iterable, Callable, Union, Container, \
+    Hashable, Any
 
 from PyQt5 import QtWidgets
 
-from edp import signalslib
-from edp.thread import IntervalRunnerThread
+from edp import signalslib, asyncloop
+from edp import thread
 
 logger = logging.getLogger(__name__)
 
@@ -52,14 +54,44 @@ def mark_function(name: str, **options):
 def get_marked_methods(mark: str, obj) -> Iterator[Tuple[Callable, FunctionMark]]:
     """
     Return object methods that was marked
+
+    Methods are looked up in mark table of object class, see `get_class_marks`.
+    """
+    for name, func_mark in get_class_marks(type(obj)).get(mark, ()):
+        yield getattr(obj, name), func_mark
+
+
+def get_class_marks(cls: type) -> Dict[str, List[Tuple[str, FunctionMark]]]:
     """
-    for name, t, _, _ in inspect.classify_class_attrs(type(obj)):
-        if not name.startswith('__') and t == 'method':
-            method: Callable = getattr(obj, name)
-            marks = get_function_marks(method)
-            for func_mark in marks:
-                if func_mark.name == mark:
-                    yield method, func_mark
+    Return mark table of class: mark name to list of marked method names and their marks, ordered by method name.
+
+    Table is built once per class and stored on it. Plugin classes build it when they are defined,
+    so methods must be marked before that.
+    """
+    marks = cls.__dict__.get('__edp_plugin_marks__')
+    if marks is None:
+        marks = build_class_marks(cls)
+        try:
+            setattr(cls, '__edp_plugin_marks__', marks)
+        except (TypeError, AttributeError):
+            pass  # builtin or extension class
+    return marks
+
+
+def build_class_marks(cls: type) -> Dict[str, List[Tuple[str, FunctionMark]]]:
+    """Build mark table of class from marked functions in its and its base classes namespaces"""
+    attributes: Dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        attributes.update(klass.__dict__)
+
+    marks: Dict[str, List[Tuple[str, FunctionMark]]] = {}
+    for name in sorted(attributes):
+        value = attributes[name]
+        if name.startswith('__') or not inspect.isfunction(value):
+            continue
+        for func_mark in get_function_marks(value):
+            marks.setdefault(func_mark.name, []).append((name, func_mark))
+    return marks
 
 
 def get_function_marks(func: Callable) -> List[FunctionMark]:
@@ -67,34 +99,88 @@ def get_function_marks(func: Callable) -> List[FunctionMark]:
     return getattr(func, '__edp_plugin_mark__', [])
 
 
-def scheduled(interval: Union[float, int] = 1, plugin_enabled=True, skipfirst=False):
+# pylint: disable=too-many-arguments
+def scheduled(interval: Union[float, int] = 1, plugin_enabled=True, skipfirst=False, jitter: Union[float, int] = 0,
+              misfire_grace: Optional[Union[float, int]] = None, min_interval: Union[float, int] = 0,
+              max_interval: Optional[Union[float, int]] = None, wake_signals: Iterable[signalslib.Signal] = ()):
     """
     Decorator to mark wrapped function as scheduled.
 
-    After plugin registration, a special routine will be called that will create :py:class:IntervalRunnerThread
-    for every marked function. This function then will be executed in background thread every `interval` seconds.
+    After plugin registration, a special routine will add every marked function to :py:class:Scheduler,
+    which executes it on its worker threads every `interval` seconds.
+    Function can return number of seconds to wait before its next execution instead, see ScheduledJob.
+    It can be executed early with `wake_scheduled`, or on emit of any of `wake_signals`.
+
+    `async def` methods are scheduled the same way, but executed on asyncio loop thread.
 
     :param interval: Seconds to wait between function execution
     :param plugin_enabled: Execute function only if plugin enabled (is_enabled method returns True)
     :param skipfirst: Skip first execution of scheduled function
+    :param jitter: Max random delay added to interval, spreads functions with equal intervals
+    :param misfire_grace: Skip execution that is late more than that many seconds
+    :param min_interval: Min seconds to wait before next execution, if function returned less
+    :param max_interval: Max seconds to wait before next execution. If set, failed function is retried
+        with exponential backoff up to that many seconds.
+    :param wake_signals: Signals that execute function as soon as possible when emitted
     """
     if interval <= 0:
         raise ValueError(f'interval must be greater than zero: {interval}')
-    return mark_function(MARKS.SCHEDULED, interval=interval, plugin_enabled=plugin_enabled, skipfirst=skipfirst)
+    if max_interval is not None and max_interval < max(interval, min_interval):
+        raise ValueError(f'max_interval must not be less than interval and min_interval: {max_interval}')
+    return mark_function(MARKS.SCHEDULED, interval=interval, plugin_enabled=plugin_enabled, skipfirst=skipfirst,
+                         jitter=jitter, misfire_grace=misfire_grace, min_interval=min_interval,
+                         max_interval=max_interval, wake_signals=tuple(wake_signals))
+
+
+def _get_scheduler_and_job(method: Callable) -> Optional[Tuple[thread.Scheduler, thread.ScheduledJob]]:
+    jobs: Dict[str, Tuple[thread.Scheduler, thread.ScheduledJob]] = \
+        getattr(getattr(method, '__self__', None), '__edp_scheduled_jobs__', {})
+    name: Optional[str] = getattr(method, '__name__', None)
+    return jobs.get(name) if name is not None else None
+
 
+def get_scheduled_job(method: Callable) -> Optional[thread.ScheduledJob]:
+    """Return job of scheduled plugin method, None if method is not scheduled"""
+    scheduled_job = _get_scheduler_and_job(method)
+    return None if scheduled_job is None else scheduled_job[1]
 
-def bind_signal(*signals: signalslib.Signal, plugin_enabled=True):
+
+def wake_scheduled(method: Callable, delay: Union[float, int] = 0) -> bool:
+    """
+    Execute scheduled plugin method no later than `delay` seconds from now.
+
+    Returns False if method is not scheduled, for example when plugin is used without plugin manager.
+    """
+    scheduled_job = _get_scheduler_and_job(method)
+    if scheduled_job is None:
+        return False
+    scheduler, job = scheduled_job
+    scheduler.wake(job, delay)
+    return True
+
+
+def bind_signal(*signals: signalslib.Signal, plugin_enabled=True,
+                keys: Optional[Union[Container[Hashable], Callable[['BasePlugin'], Optional[Container]]]] = None,
+                predicate: Optional[Callable[..., bool]] = None,
+                priority: Optional[signalslib.Priority] = None, timeout: Optional[float] = None):
     """
     Decorator to mark wrapped function as binded
 
     After plugin registration, a special routine will be called that will bind all specified signals to this function.
+    `async def` methods are executed on asyncio loop thread, so their awaited calls do not block other callbacks.
 
     :param signals: List of signals to bind this function to
     :param plugin_enabled: Execute function only if plugin enabled (is_enabled method returns True)
+    :param keys: Route keys of signal items function handles, like journal event names. Can be a function
+        of plugin instance that returns route keys, if they depend on plugin class or its settings.
+    :param predicate: Function called with signal data, wrapped function gets only items it returns True for
+    :param priority: Execution priority of wrapped function, instead of signal priority
+    :param timeout: Seconds wrapped function may run before signal watchdog quarantines it
     """
     if not signals:
         raise ValueError('At least one signal must be specified')
-    return mark_function(MARKS.SIGNAL, signals=signals, plugin_enabled=plugin_enabled)
+    return mark_function(MARKS.SIGNAL, signals=signals, plugin_enabled=plugin_enabled, keys=keys,
+                         predicate=predicate, priority=priority, timeout=timeout)
 
 
 class BasePlugin:
@@ -105,6 +191,10 @@ class BasePlugin:
     friendly_name: Optional[str] = None
     github_link: Optional[str] = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__edp_plugin_marks__ = build_class_marks(cls)
+
     def is_enalbed(self) -> bool:  # pylint: disable=no-self-use
         """
         Return True if this plugin enabled.
@@ -199,6 +289,23 @@ def get_plugins_cls_from_package(path: Path) -> Iterator[Type[BasePlugin]]:
     raise NotImplementedError
 
 
+def _get_wake_callback(scheduler: thread.Scheduler, job: thread.ScheduledJob) -> Callable:
+    def wake(**kwargs):  # pylint: disable=unused-argument
+        scheduler.wake(job)
+
+    wake.__qualname__ = f'{job.name}.wake'
+    return wake
+
+
+def _get_coroutine_job(callback: Callable, loop_thread: asyncloop.AsyncLoopThread) -> Callable:
+    @functools.wraps(callback)
+    def job():
+        coro = callback()
+        return None if coro is None else loop_thread.run_coroutine(coro)
+
+    return job
+
+
 class MarkedMethodType(NamedTuple):
     """Container for plugin method mark information"""
     plugin: BasePlugin
@@ -233,17 +340,33 @@ class PluginManager:
             except:
                 logger.exception(f'Failed to get plugin marked methods: {plugin}')
 
-    def get_scheduled_methods_threads(self) -> Iterator[IntervalRunnerThread]:
+    def schedule_methods(self, scheduler: Optional[thread.Scheduler] = None,
+                         loop_thread: Optional[asyncloop.AsyncLoopThread] = None) -> List[thread.ScheduledJob]:
         """
-        Iterate over threads created to run plugin methods marked as scheduled.
+        Add plugin methods marked as scheduled to scheduler. Returns scheduled jobs.
+
+        Coroutine methods are executed on asyncio loop thread, scheduler worker waits for them.
         """
+        scheduler = scheduler or thread.scheduler
+        loop_thread = loop_thread or asyncloop.loop_thread
+        jobs: List[thread.ScheduledJob] = []
         for marked_method in self.get_marked_methods(MARKS.SCHEDULED):
-            plugin_enabled: bool = marked_method.mark.options['plugin_enabled']
-            interval: int = marked_method.mark.options.get('interval', 1)
-            skipfirst: bool = marked_method.mark.options.get('skipfirst', False)
-
-            callback = self._callback_wrapper(marked_method.method, marked_method.plugin, plugin_enabled)
-            yield IntervalRunnerThread(callback, interval=interval, skipfirst=skipfirst)
+            options = marked_method.mark.options
+            callback = self._callback_wrapper(marked_method.method, marked_method.plugin, options['plugin_enabled'])
+            if asyncio.iscoroutinefunction(marked_method.method):
+                callback = _get_coroutine_job(callback, loop_thread)
+            job = scheduler.add_job(
+                callback, options.get('interval', 1), skipfirst=options.get('skipfirst', False),
+                jitter=options.get('jitter', 0), misfire_grace=options.get('misfire_grace'),
+                name=f'{marked_method.plugin.__class__.__name__}.{marked_method.method.__name__}',
+                min_interval=options.get('min_interval', 0), max_interval=options.get('max_interval'))
+            jobs.append(job)
+
+            scheduled_jobs = marked_method.plugin.__dict__.setdefault('__edp_scheduled_jobs__', {})
+            scheduled_jobs[marked_method.method.__name__] = (scheduler, job)
+            for signal in options.get('wake_signals', ()):
+                signal.bind_nonstrict(_get_wake_callback(scheduler, job))
+        return jobs
 
     def set_plugin_annotation_references(self):
         """
@@ -271,11 +394,17 @@ class PluginManager:
         for marked_method in self.get_marked_methods(MARKS.SIGNAL):
             signals: Iterable[signalslib.Signal] = marked_method.mark.options['signals']
             plugin_enabled: bool = marked_method.mark.options['plugin_enabled']
+            keys = marked_method.mark.options.get('keys', None)
+            predicate = marked_method.mark.options.get('predicate', None)
+            priority = marked_method.mark.options.get('priority', None)
+            timeout = marked_method.mark.options.get('timeout', None)
 
             for signal in signals:
                 try:
+                    if callable(keys):
+                        keys = keys(marked_method.plugin)
                     callback = self._callback_wrapper(marked_method.method, marked_method.plugin, plugin_enabled)
-                    signal.bind(callback)
+                    signal.bind(callback, keys=keys, predicate=predicate, priority=priority, timeout=timeout)
                 except:
                     logger.exception(f'Failed to bind plugin signal "{signal.name}" {marked_method.method}')
 
@@ -97,6 +97,7 @@ class EDPSettings(BaseSettings):
     plugin_dir: Path = config.BASE_DIR / 'plugins'
     enable_error_reports: bool = True
     check_for_updates: bool = True
+    enable_journal_archive: bool = False
     receive_patches: bool = True
 
     @property
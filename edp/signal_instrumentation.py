@@ -0,0 +1,141 @@
+"""
+Signal instrumentation: emit counts and callback execution statistics.
+"""
+import bisect
+import heapq
+import threading
+import time
+from collections import deque, Counter, defaultdict
+from typing import List, NamedTuple, Dict, Deque, Tuple
+
+from edp.signal_queues import SignalExecutionItem
+
+
+# Upper bounds of execution time histogram buckets, in seconds. Last bucket counts slower calls.
+HISTOGRAM_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class ExecutionStats(NamedTuple):
+    """
+    Callback execution statistics. Times are in seconds.
+
+    Queue wait is time from signal emit to start of callback execution. For coroutine callbacks
+    only time to create and submit coroutine is measured.
+    """
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    histogram: Tuple[int, ...] = (0,) * (len(HISTOGRAM_BOUNDS) + 1)
+
+    @property
+    def mean_time(self) -> float:
+        """Mean execution time"""
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def mean_queue_wait(self) -> float:
+        """Mean queue wait time"""
+        return self.queue_wait_total / self.calls if self.calls else 0.0
+
+
+class SignalStats(NamedTuple):
+    """Signal statistics: number of emits and execution statistics of all its callbacks"""
+    emits: int
+    execution: ExecutionStats
+
+
+class Invocation(NamedTuple):
+    """Single callback execution"""
+    callback: str
+    signal: str
+    duration: float
+    queue_wait: float
+    failed: bool
+    timestamp: float  # unix time of execution end
+
+
+class ExecutionStatsAccumulator:
+    """Mutable ExecutionStats, not thread safe"""
+    __slots__ = ('calls', 'errors', 'total_time', 'max_time', 'queue_wait_total', 'queue_wait_max', 'histogram')
+
+    def __init__(self):
+        self.calls = self.errors = 0
+        self.total_time = self.max_time = self.queue_wait_total = self.queue_wait_max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, duration: float, queue_wait: float, failed: bool):
+        """Add execution"""
+        self.calls += 1
+        self.errors += failed
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+
+    def get_stats(self) -> ExecutionStats:
+        """Return immutable snapshot"""
+        return ExecutionStats(self.calls, self.errors, self.total_time, self.max_time,
+                              self.queue_wait_total, self.queue_wait_max, tuple(self.histogram))
+
+
+class SignalInstrumentation:
+    """
+    Collects signal emit counts and callback execution statistics.
+
+    Statistics are aggregated by signal name and by callback name. `recent_size` last executions are kept
+    to find slowest recent invocations. Thread safe.
+    """
+
+    def __init__(self, recent_size: int = 1000):
+        self._lock = threading.Lock()
+        self._emits: Counter = Counter()
+        self._signals: Dict[str, ExecutionStatsAccumulator] = defaultdict(ExecutionStatsAccumulator)
+        self._callbacks: Dict[str, ExecutionStatsAccumulator] = defaultdict(ExecutionStatsAccumulator)
+        self._recent: Deque[Invocation] = deque(maxlen=recent_size)
+
+    def record_emit(self, signal_name: str):
+        """Count signal emit"""
+        with self._lock:
+            self._emits[signal_name] += 1
+
+    # pylint: disable=too-many-arguments
+    def record_call(self, callback_name: str, signal_item: SignalExecutionItem, start: float, end: float,
+                    failed: bool):
+        """Record callback execution. Times are `time.perf_counter` values."""
+        duration = end - start
+        queue_wait = max(start - signal_item.emitted, 0.0) if signal_item.emitted else 0.0
+        invocation = Invocation(callback_name, signal_item.name, duration, queue_wait, failed, time.time())
+        with self._lock:
+            self._signals[signal_item.name].add(duration, queue_wait, failed)
+            self._callbacks[callback_name].add(duration, queue_wait, failed)
+            self._recent.append(invocation)
+
+    def get_signal_stats(self) -> Dict[str, SignalStats]:
+        """Return statistics of signals, by signal name"""
+        with self._lock:
+            return {name: SignalStats(self._emits[name], self._signals[name].get_stats()
+                                      if name in self._signals else ExecutionStats())
+                    for name in set(self._emits) | set(self._signals)}
+
+    def get_callback_stats(self) -> Dict[str, ExecutionStats]:
+        """Return execution statistics of callbacks, by callback name"""
+        with self._lock:
+            return {name: accumulator.get_stats() for name, accumulator in self._callbacks.items()}
+
+    def get_slowest_invocations(self, count: int = 10) -> List[Invocation]:
+        """Return slowest of recent callback executions, slowest first"""
+        with self._lock:
+            recent = list(self._recent)
+        return heapq.nlargest(count, recent, key=lambda invocation: invocation.duration)
+
+    def reset(self):
+        """Clear all statistics"""
+        with self._lock:
+            self._emits.clear()
+            self._signals.clear()
+            self._callbacks.clear()
+            self._recent.clear()
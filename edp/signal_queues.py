@@ -0,0 +1,263 @@
+"""
+Signal queueing: backpressure policies, execution priorities, per-callback queues and ready queue of workers.
+"""
+import enum
+import queue
+import threading
+from collections import deque, defaultdict
+from typing import List, NamedTuple, Dict, Callable, Deque, Any, Optional, Hashable
+
+
+class Backpressure(enum.Enum):
+    """What to do when signal callback queue is full"""
+    BLOCK = 'block'  # block emitting thread until callback catches up
+    DROP_OLDEST = 'drop oldest'  # drop oldest queued item of signal
+    COALESCE = 'coalesce'  # replace queued item with same key, only latest value is delivered
+
+
+class Priority(enum.IntEnum):
+    """Signal execution priority. Callbacks with pending items of higher priority get workers first."""
+    INTERACTIVE = 0  # state changes, gui and overlay updates
+    NORMAL = 1
+    BULK = 2  # uploads, buffered flushes, remote api payloads
+
+
+def get_binding_priority(callback: Callable) -> Optional[Priority]:
+    """Return priority callback was bound with, None if it uses priority of signal"""
+    return getattr(callback, '__edp_signal_priority__', None)
+
+
+def get_binding_timeout(callback: Callable) -> Optional[float]:
+    """Return execution timeout callback was bound with, None if it uses default timeout of signal manager"""
+    return getattr(callback, '__edp_signal_timeout__', None)
+
+
+class QueuePolicy(NamedTuple):
+    """
+    Signal queueing policy
+
+    `maxsize` limits number of queued items of signal for every callback.
+    With COALESCE backpressure, `key` function returns coalescing key from signal data. Items with None key
+    are not coalesced and block when queue is full. Without `key` all items of signal are coalesced.
+    """
+    backpressure: Backpressure = Backpressure.BLOCK
+    maxsize: int = 10000
+    key: Optional[Callable[[Dict[str, Any]], Optional[Hashable]]] = None
+
+    def get_coalesce_key(self, name: str, data: Dict[str, Any]) -> Optional[Hashable]:
+        """Return key to coalesce signal item with, or None if item should not be coalesced"""
+        if self.backpressure is not Backpressure.COALESCE:
+            return None
+        if self.key is None:
+            return name
+        # pylint infers type of key field from its None default only
+        key = self.key(data)  # pylint: disable=not-callable
+        return None if key is None else (name, key)
+
+
+DEFAULT_QUEUE_POLICY = QueuePolicy()
+
+
+class SignalExecutionItem(NamedTuple):
+    """
+    Container for signal data to be executed asynchronously.
+    """
+    name: str
+    callbacks: List[Callable]
+    kwargs: dict
+    policy: QueuePolicy = DEFAULT_QUEUE_POLICY
+    emitted: float = 0.0  # time.perf_counter value at emit, 0 if unknown
+    priority: Priority = Priority.NORMAL
+    sequence: int = 0  # emit sequence number of signal recorder, 0 if not recorded
+
+
+class SignalCounters(NamedTuple):
+    """Backpressure counters of signal"""
+    dropped: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    quarantined: int = 0  # items dropped because callback was quarantined by watchdog
+
+
+def get_callback_name(callback: Callable) -> str:
+    """Return readable callback name, like `GameStatePlugin.on_journal_event`"""
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+
+class SubscriberQueue:
+    """
+    Serial queue of signal items for one callback.
+
+    Items are executed in order they were emitted, and never concurrently. Item priorities decide
+    only when queue gets a worker, see `get_priority`.
+    `scheduled` is True while queue is waiting for worker or being executed by one.
+    Not thread safe, SignalManager guards it with its lock.
+    """
+
+    def __init__(self, callback: Callable):
+        self.callback = callback
+        self.name = get_callback_name(callback)
+        self.binding_priority = get_binding_priority(callback)
+        self.timeout = get_binding_timeout(callback)
+        self.quarantined = False  # set by watchdog while callback is stuck
+        # [signal item, coalesce key, priority] entries. Coalesced entries are emptied in place and skipped on pop,
+        # so latest item takes its place in emit order
+        self._entries: Deque[list] = deque()
+        self._coalesced_entries: Dict[Hashable, list] = {}
+        self._size = 0
+        self._removed = 0  # removed entries still in deque
+        self.counts: Dict[str, int] = defaultdict(int)  # number of queued items by signal name
+        self._priorities: Dict[Priority, int] = defaultdict(int)  # number of queued items by priority
+        self.scheduled = False
+        self.ready_priority: Optional[Priority] = None  # lane of ReadyQueue queue is waiting in
+
+    def __len__(self):
+        return self._size
+
+    def put(self, signal_item: SignalExecutionItem, coalesce_key: Optional[Hashable] = None,
+            priority: Priority = Priority.NORMAL) -> Optional[Backpressure]:
+        """
+        Queue signal item according to its policy.
+
+        :returns: DROP_OLDEST if other item was dropped, COALESCE if item replaced queued one, None otherwise
+        """
+        result = None
+        if coalesce_key is not None:
+            previous = self._coalesced_entries.get(coalesce_key)
+            if previous is not None:
+                self._remove_entry(previous)
+                result = Backpressure.COALESCE
+        elif signal_item.policy.backpressure is Backpressure.DROP_OLDEST \
+                and self.counts[signal_item.name] >= signal_item.policy.maxsize:
+            self._drop_oldest(signal_item.name)
+            result = Backpressure.DROP_OLDEST
+
+        entry = [signal_item, coalesce_key, priority]
+        if coalesce_key is not None:
+            self._coalesced_entries[coalesce_key] = entry
+        self._entries.append(entry)
+        self._size += 1
+        self.counts[signal_item.name] += 1
+        self._priorities[priority] += 1
+        return result
+
+    def get_item_priority(self, signal_item: SignalExecutionItem) -> Priority:
+        """Return priority of signal item for this callback: priority of binding, or priority of signal"""
+        return signal_item.priority if self.binding_priority is None else self.binding_priority
+
+    def get_priority(self) -> Priority:
+        """Return highest priority of queued items"""
+        return min((priority for priority, count in self._priorities.items() if count), default=Priority.NORMAL)
+
+    def _remove_entry(self, entry: list, in_queue: bool = True):
+        signal_item, coalesce_key, priority = entry
+        entry[0] = None
+        self._size -= 1
+        self.counts[signal_item.name] -= 1
+        self._priorities[priority] -= 1
+        if coalesce_key is not None:
+            del self._coalesced_entries[coalesce_key]
+
+        if in_queue:
+            self._removed += 1
+            if self._removed > max(64, self._size):
+                self._entries = deque(entry for entry in self._entries if entry[0] is not None)
+                self._removed = 0
+
+    def _drop_oldest(self, name: str):
+        for entry in self._entries:
+            if entry[0] is not None and entry[0].name == name:
+                self._remove_entry(entry)
+                return
+
+    def pop(self) -> Optional[SignalExecutionItem]:
+        """Return next item to execute, or None if queue is empty"""
+        while self._entries:
+            entry = self._entries.popleft()
+            if entry[0] is not None:
+                signal_item = entry[0]
+                self._remove_entry(entry, in_queue=False)
+                return signal_item
+            self._removed -= 1
+        return None
+
+
+class ReadyQueue:
+    """
+    Subscriber queues waiting for worker, in priority lanes.
+
+    Highest priority lane is served first. Lower lane that was passed over `starvation_limit` times in a row
+    is served next, so low priority work still makes progress under steady high priority load.
+    Has `queue.Queue` get interface.
+    """
+
+    def __init__(self, starvation_limit: int = 8):
+        self.starvation_limit = starvation_limit
+        self._lanes: Dict[Priority, Deque[SubscriberQueue]] = {priority: deque() for priority in Priority}
+        self._passed_over: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._condition = threading.Condition()
+        self._interrupts = 0
+
+    def __len__(self):
+        return sum(map(len, self._lanes.values()))
+
+    def empty(self) -> bool:
+        """Return True if no subscriber queue is waiting"""
+        return not any(self._lanes.values())
+
+    def put(self, subscriber_queue: SubscriberQueue, priority: Priority):
+        """Add subscriber queue to lane of given priority"""
+        with self._condition:
+            self._lanes[priority].append(subscriber_queue)
+            subscriber_queue.ready_priority = priority
+            self._condition.notify()
+
+    def has_waiting_above(self, priority: Priority) -> bool:
+        """Return True if subscriber queue with priority higher than given is waiting"""
+        return any(self._lanes[lane] for lane in Priority if lane < priority)
+
+    def promote(self, subscriber_queue: SubscriberQueue, priority: Priority):
+        """Move waiting subscriber queue to lane of given priority, if it is higher than current one"""
+        with self._condition:
+            current = subscriber_queue.ready_priority
+            if current is not None and priority < current:
+                self._lanes[current].remove(subscriber_queue)
+                self._lanes[priority].append(subscriber_queue)
+                subscriber_queue.ready_priority = priority
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> SubscriberQueue:
+        """
+        Return next subscriber queue to execute
+
+        :raises queue.Empty: If there is no waiting subscriber queue, or `interrupt` was called while waiting
+        """
+        with self._condition:
+            interrupts = self._interrupts
+            self._condition.wait_for(lambda: not self.empty() or self._interrupts != interrupts,
+                                     timeout if block else 0)
+            if self.empty():
+                raise queue.Empty
+            subscriber_queue = self._lanes[self._select_lane()].popleft()
+            subscriber_queue.ready_priority = None
+            return subscriber_queue
+
+    def interrupt(self):
+        """Wake up all waiting `get` calls"""
+        with self._condition:
+            self._interrupts += 1
+            self._condition.notify_all()
+
+    def _select_lane(self) -> Priority:
+        waiting = [priority for priority in Priority if self._lanes[priority]]
+        selected = waiting[0]
+        for priority in reversed(waiting[1:]):
+            if self._passed_over[priority] >= self.starvation_limit:
+                selected = priority
+                break
+
+        for priority in Priority:
+            if priority == selected or not self._lanes[priority]:
+                self._passed_over[priority] = 0
+            elif priority > selected:
+                self._passed_over[priority] += 1
+        return selected
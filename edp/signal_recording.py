@@ -0,0 +1,306 @@
+"""
+Record emitted signals to file and play them back.
+
+SignalRecorder, installed on signal manager, appends every emitted signal to compact append-only file:
+signal name, timestamp and reference to pickled payload. Payloads are compressed, equal ones are stored only once.
+Every callback execution is recorded too, with its queue wait and duration.
+
+SignalPlaybackThread re-emits recorded signals, usually in fresh process with real plugins bound,
+to reproduce production load offline and compare recorded timings with playback ones.
+"""
+import hashlib
+import logging
+import pickle
+import statistics
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional, Dict, Any, Union, Iterator, IO, Set, Iterable, Container, List, \
+    Callable
+
+from edp import signalslib
+from edp.thread import StoppableThread
+
+logger = logging.getLogger(__name__)
+
+# Recording is a stream of pickled tuples, first item is record type
+RECORD_SESSION = 0  # (type, unix time): recorder opened file, payload references and sequences start over
+RECORD_PAYLOAD = 1  # (type, ref, zlib compressed pickled signal data)
+RECORD_EMIT = 2  # (type, sequence, signal name, unix time, perf counter, payload ref or None, eager)
+RECORD_CALL = 3  # (type, emit sequence, callback name, queue wait, duration)
+
+
+class EmitRecord(NamedTuple):
+    """Recorded signal emit"""
+    sequence: int
+    name: str
+    timestamp: float  # unix time
+    clock: float  # time.perf_counter value, for relative timing of emits
+    data: Optional[Dict[str, Any]]  # None if payload could not be pickled
+    eager: bool
+
+
+class CallRecord(NamedTuple):
+    """Recorded callback execution. Times are in seconds."""
+    sequence: int  # sequence of emit that callback was executed for
+    callback: str
+    queue_wait: float
+    duration: float
+
+
+class SignalRecorder:
+    """
+    Records signal emits and callback executions to file.
+
+    Install it on signal manager with `install` or use as context manager. Signal data is pickled at emit,
+    data that can not be pickled, like gui objects, is recorded without payload. Thread safe.
+    """
+
+    def __init__(self, path: Path, signal_manager: Optional[signalslib.SignalManager] = None):
+        self.path = path
+        self._signal_manager = signal_manager or signalslib.signal_manager
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._sequence = 0
+        self._payload_refs: Dict[bytes, int] = {}  # payload digest -> ref
+        self._unpicklable: Set[str] = set()
+
+    def install(self) -> 'SignalRecorder':
+        """Open recording file and start recording emits of signal manager. Returns recorder itself."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._file = self.path.open('ab')
+            self._sequence = 0
+            self._payload_refs.clear()
+            self._write((RECORD_SESSION, time.time()))
+        self._signal_manager.recorder = self
+        logger.info(f'Recording signals to {self.path}')
+        return self
+
+    def uninstall(self):
+        """Stop recording and close file"""
+        if self._signal_manager.recorder is self:
+            self._signal_manager.recorder = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    def _write(self, record: tuple):
+        if self._file is None:
+            return
+        try:
+            pickle.dump(record, self._file, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            logger.exception(f'Failed to write signal recording {self.path}, recording stopped')
+            self._file.close()
+            self._file = None
+
+    def _dump_payload(self, name: str, data: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            if name not in self._unpicklable:
+                self._unpicklable.add(name)
+                logger.debug(f'Data of signal {name} can not be pickled, it is recorded without payload')
+            return None
+
+    def record_emit(self, name: str, data: Dict[str, Any], eager: bool) -> int:
+        """Record signal emit, return its sequence number. Returns 0 if recorder is not recording."""
+        if self._file is None:
+            return 0
+        payload = self._dump_payload(name, data)
+        with self._lock:
+            if self._file is None:
+                return 0
+            ref = None
+            if payload is not None:
+                digest = hashlib.blake2b(payload, digest_size=16).digest()
+                ref = self._payload_refs.get(digest)
+                if ref is None:
+                    ref = self._payload_refs[digest] = len(self._payload_refs) + 1
+                    self._write((RECORD_PAYLOAD, ref, zlib.compress(payload, 1)))
+            self._sequence += 1
+            self._write((RECORD_EMIT, self._sequence, name, time.time(), time.perf_counter(), ref, eager))
+            return self._sequence
+
+    def record_call(self, callback_name: str, signal_item: signalslib.SignalExecutionItem, start: float, end: float):
+        """Record callback execution of recorded emit. Times are `time.perf_counter` values."""
+        if not signal_item.sequence or self._file is None:
+            return
+        queue_wait = max(start - signal_item.emitted, 0.0) if signal_item.emitted else 0.0
+        with self._lock:
+            if self._file is not None:
+                self._write((RECORD_CALL, signal_item.sequence, callback_name, queue_wait, end - start))
+
+
+def read_recording(path: Path) -> Iterator[Union[EmitRecord, CallRecord]]:
+    """
+    Read signal recording, yield emit and call records in recorded order.
+
+    Payload of every emit is unpickled separately, so emitted data is not shared between emits.
+    Recording written by crashed process may end with truncated record, it is ignored.
+    """
+    payloads: Dict[int, bytes] = {}
+    with path.open('rb') as f:
+        while True:
+            try:
+                record = pickle.load(f)
+            except EOFError:
+                break
+            except pickle.UnpicklingError:
+                logger.warning(f'Signal recording {path} is truncated')
+                break
+
+            record_type = record[0]
+            if record_type == RECORD_SESSION:
+                payloads.clear()
+            elif record_type == RECORD_PAYLOAD:
+                payloads[record[1]] = record[2]
+            elif record_type == RECORD_EMIT:
+                _, sequence, name, timestamp, clock, ref, eager = record
+                data = None
+                if ref is not None:
+                    try:
+                        data = pickle.loads(zlib.decompress(payloads[ref]))
+                    except:
+                        logger.exception(f'Failed to load payload of recorded signal {name}')
+                yield EmitRecord(sequence, name, timestamp, clock, data, eager)
+            elif record_type == RECORD_CALL:
+                yield CallRecord(*record[1:])
+
+
+class TimingSummary(NamedTuple):
+    """Callback timings. Times are in seconds."""
+    calls: int
+    mean_queue_wait: float
+    mean_duration: float
+
+
+class PlaybackReport(NamedTuple):
+    """Playback results: recorded and playback callback timings, by callback name"""
+    emitted: int
+    skipped: int
+    duration: float
+    recorded: Dict[str, TimingSummary]
+    playback: Dict[str, TimingSummary]
+
+    def format(self) -> str:
+        """Return human readable report"""
+        lines = [f'{self.emitted} signals emitted, {self.skipped} skipped in {self.duration:.3f} s']
+        for name in sorted(set(self.recorded) | set(self.playback)):
+            line = [f'  {name}:']
+            for title, summary in (('recorded', self.recorded.get(name)), ('playback', self.playback.get(name))):
+                if summary is not None:
+                    line.append(f'{title} {summary.calls} calls, wait {summary.mean_queue_wait * 1000:.3f} ms, '
+                                f'duration {summary.mean_duration * 1000:.3f} ms;')
+            lines.append(' '.join(line))
+        return '\n'.join(lines)
+
+
+class SignalPlaybackThread(StoppableThread):
+    """
+    Re-emit recorded signals through signals created in this process.
+
+    With `speed` set, relative timing of emits is preserved and scaled, gaps are limited to `max_delay` seconds.
+    Without `speed` signals are emitted as fast as possible. Signals with names in `skip`, signals without
+    recorded payload and signals not created in this process are not emitted.
+    Instrumentation of signal manager is reset at start, so report contains only playback executions.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, path: Path, speed: Optional[Union[int, float]] = None, max_delay: Union[int, float] = 10,
+                 skip: Container[str] = (), wait_timeout: Union[int, float] = 60,
+                 signal_manager: Optional[signalslib.SignalManager] = None,
+                 on_finish: Optional[Callable[[PlaybackReport], None]] = None):
+        """
+        :param wait_timeout: How long to wait for callbacks to process emitted signals after playback ends
+        :param on_finish: Callback called with playback report after playback finished
+        """
+        super(SignalPlaybackThread, self).__init__()
+        self._path = path
+        self._speed = speed
+        self._max_delay = max_delay
+        self._skip = skip
+        self._wait_timeout = wait_timeout
+        self._signal_manager = signal_manager or signalslib.signal_manager
+        self._on_finish = on_finish
+        self._recorded_calls: Dict[str, List[CallRecord]] = defaultdict(list)
+        self._emitted = 0
+        self._skipped = 0
+        self.report: Optional[PlaybackReport] = None
+
+    def run(self):
+        self._signal_manager.instrumentation.reset()
+        start = time.perf_counter()
+
+        try:
+            self.play(read_recording(self._path))
+        except:
+            logger.exception('Error playing signal recording')
+
+        if not self._signal_manager.wait_idle(self._wait_timeout):
+            logger.warning(f'Callbacks did not process played signals in {self._wait_timeout} seconds')
+
+        self.report = self.get_report(time.perf_counter() - start)
+        logger.info(f'Signal playback finished:\n{self.report.format()}')
+
+        if self._on_finish is not None:
+            self._on_finish(self.report)
+
+    def play(self, records: Iterable[Union[EmitRecord, CallRecord]]):
+        """Emit recorded signals, keeping their relative timing if speed is set"""
+        missing: Set[str] = set()
+        playback_time = 0.0
+        previous: Optional[EmitRecord] = None
+        start = time.perf_counter()
+
+        for record in records:
+            if self.is_stopped:
+                break
+            if isinstance(record, CallRecord):
+                self._recorded_calls[record.callback].append(record)
+                continue
+
+            signal = signalslib.get_signal(record.name)
+            if signal is None or record.data is None or record.name in self._skip:
+                if signal is None and record.name not in missing:
+                    missing.add(record.name)
+                    logger.warning(f'Recorded signal {record.name} does not exist, it is not played')
+                self._skipped += 1
+                continue
+
+            if self._speed and previous is not None:
+                playback_time += min(max(record.clock - previous.clock, 0), self._max_delay) / self._speed
+                delay = start + playback_time - time.perf_counter()
+                if delay > 0:
+                    self.sleep(delay)
+            previous = record
+
+            self.heartbeat('playback')
+            if record.eager:
+                signal.emit_eager(**record.data)
+            else:
+                signal.emit(**record.data)
+            self._emitted += 1
+
+    def get_report(self, duration: float) -> PlaybackReport:
+        """Return recorded timings and timings of playback so far"""
+        recorded = {
+            name: TimingSummary(len(calls), statistics.mean(call.queue_wait for call in calls),
+                                statistics.mean(call.duration for call in calls))
+            for name, calls in self._recorded_calls.items()
+        }
+        playback = {
+            name: TimingSummary(stats.calls, stats.mean_queue_wait, stats.mean_time)
+            for name, stats in self._signal_manager.instrumentation.get_callback_stats().items()
+        }
+        return PlaybackReport(self._emitted, self._skipped, duration, recorded, playback)
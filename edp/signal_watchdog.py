@@ -0,0 +1,51 @@
+"""
+Signal watchdog: finds callbacks running longer than their timeout.
+"""
+import sys
+import threading
+import time
+import traceback
+from typing import NamedTuple, Dict, List, Tuple
+
+from edp.signal_queues import SubscriberQueue, SignalExecutionItem
+
+
+class RunningCallback(NamedTuple):
+    """Callback being executed by signal worker"""
+    subscriber_queue: SubscriberQueue
+    signal_item: SignalExecutionItem
+    start: float  # time.monotonic value
+
+
+class StuckCallback(NamedTuple):
+    """Callback running longer than its timeout"""
+    thread: threading.Thread
+    running: RunningCallback
+    duration: float
+    stack: str
+
+
+def find_stuck_callbacks(running_callbacks: Dict[threading.Thread, RunningCallback],
+                         default_timeout: float) -> List[StuckCallback]:
+    """
+    Return callbacks running longer than their timeout, `default_timeout` if callback was bound without one.
+
+    Callbacks of already quarantined subscribers are skipped.
+    """
+    now = time.monotonic()
+    expired: List[Tuple[threading.Thread, RunningCallback]] = []
+    for thread, running in list(running_callbacks.items()):
+        subscriber_queue = running.subscriber_queue
+        timeout = subscriber_queue.timeout or default_timeout
+        if not subscriber_queue.quarantined and now - running.start >= timeout:
+            expired.append((thread, running))
+    if not expired:
+        return []
+
+    frames = sys._current_frames()  # pylint: disable=protected-access
+    stuck: List[StuckCallback] = []
+    for thread, running in expired:
+        frame = frames.get(thread.ident) if thread.ident is not None else None
+        stack = ''.join(traceback.format_stack(frame)) if frame is not None else 'not available\n'
+        stuck.append(StuckCallback(thread, running, now - running.start, stack))
+    return stuck
@@ -5,17 +5,30 @@ Allows creating declarative, typed and asynhronous signals to send events across
 
 
 """
+import asyncio
 import copy
+import functools
 import logging
 import queue
+import threading
+import time
+import weakref
+from collections import Counter
 from types import FunctionType
-from typing import Type, List, NamedTuple, Dict, Union, Callable
+from typing import Type, List, NamedTuple, Dict, Union, Callable, Any, Optional, Hashable, Container, Tuple
 
+from edp import asyncloop
+from edp.signal_instrumentation import SignalInstrumentation
+from edp.signal_queues import Backpressure, Priority, QueuePolicy, DEFAULT_QUEUE_POLICY, SignalExecutionItem, \
+    SignalCounters, SubscriberQueue, ReadyQueue, get_callback_name
+from edp.signal_watchdog import RunningCallback, find_stuck_callbacks
 from edp.thread import StoppableThread
 from edp.utils import is_dict_subset
 
 logger = logging.getLogger(__name__)
 
+_NONE_TYPE: type = type(None)
+
 
 def check_signature(func: FunctionType, signature: Dict[str, Type]) -> bool:
     """
@@ -36,44 +49,300 @@ def get_data_signature(data: dict) -> Dict[str, Type]:
     return d
 
 
+def _is_plain_class(type_: Any) -> bool:
+    """Check if type can be used with isinstance: it is a class, but not parameterized generic like List[int]"""
+    return isinstance(type_, type) and getattr(type_, '__origin__', None) is None
+
+
+def compile_type_check(type_: Any) -> Callable[[Any], bool]:
+    """
+    Return function that checks if value is instance of given type.
+
+    Supports plain classes and typing types: Any, Optional and Union, generic aliases like List[int].
+    Generic aliases are checked by their origin only, items are not checked.
+    """
+    if type_ is Any:
+        return lambda value: True
+    if type_ is None:
+        type_ = _NONE_TYPE
+
+    origin = getattr(type_, '__origin__', None)
+    if origin is Union:
+        if all(_is_plain_class(arg) for arg in type_.__args__):
+            types = tuple(type_.__args__)
+            return lambda value: isinstance(value, types)
+        checks = [compile_type_check(arg) for arg in type_.__args__]
+        return lambda value: any(check(value) for check in checks)
+    if isinstance(origin, type):
+        type_ = origin
+    if isinstance(type_, type):
+        return lambda value: isinstance(value, type_)
+
+    logger.debug(f'Type {type_} is not supported by signature validation, not checking it')
+    return lambda value: True
+
+
+def compile_data_validator(signature: Dict[str, Any]) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Return function that validates signal data against signature.
+
+    Validator returns error message or None if data is valid.
+    """
+    size = len(signature)
+
+    def keys_error(data: Dict[str, Any]) -> str:
+        return f'expected keys {sorted(signature)}, got {sorted(data)}'
+
+    if all(_is_plain_class(type_) for type_ in signature.values()):
+        # fast path for plain classes: isinstance calls without any wrappers
+        types = tuple(signature.items())
+
+        def validate(data: Dict[str, Any]) -> Optional[str]:
+            if len(data) != size:
+                return keys_error(data)
+            for key, type_ in types:
+                if key not in data:
+                    return keys_error(data)
+                if not isinstance(data[key], type_):
+                    return f'{key} expected {type_}, got {type(data[key])}'
+            return None
+
+        return validate
+
+    checks = tuple((key, compile_type_check(type_)) for key, type_ in signature.items())
+
+    def validate_typing(data: Dict[str, Any]) -> Optional[str]:
+        if len(data) != size:
+            return keys_error(data)
+        for key, check in checks:
+            if key not in data:
+                return keys_error(data)
+            if not check(data[key]):
+                return f'{key} expected {signature[key]}, got {type(data[key])}'
+        return None
+
+    return validate_typing
+
+
+class SignalRoute(NamedTuple):
+    """
+    Which items of signal callback handles
+
+    Callback gets signal item only if route key of item data is in `keys` and `predicate` called with item data
+    returns True. None means no restriction. Signals without route key function ignore `keys`.
+    """
+    keys: Optional[Container[Hashable]] = None
+    predicate: Optional[Callable[..., bool]] = None
+
+
+def get_route(callback: Callable) -> Optional[SignalRoute]:
+    """Return route of signal callback, None if callback handles every signal item"""
+    return getattr(callback, '__edp_signal_route__', None)
+
+
+def route(keys: Optional[Container[Hashable]] = None, predicate: Optional[Callable[..., bool]] = None):
+    """
+    Decorator to declare route of signal callback, see SignalRoute.
+
+    >>> @journal_event_signal.bind
+    ... @route(keys={'Docked'})
+    ... def on_docked(event): ...
+    """
+    def decor(func):
+        func.__edp_signal_route__ = SignalRoute(keys, predicate)
+        return func
+
+    return decor
+
+
+_ANY_KEY = object()  # route key of signals without route key function, matches any callback keys
+
+RouteEntry = Tuple[List[Callable], List[Tuple[Callable, Optional[Callable[..., bool]]]]]
+
+
+class RouteIndex:
+    """
+    Signal callbacks indexed by route key.
+
+    Built from snapshot of signal callbacks. List of callbacks matching route key is computed on first lookup
+    of that key and reused afterwards.
+    """
+
+    def __init__(self, callbacks: List[Callable]):
+        self.source = tuple(callbacks)
+        self._routes = [(callback, get_route(callback)) for callback in self.source]
+        self.is_routed = any(callback_route is not None for _, callback_route in self._routes)
+        self._entries: Dict[Optional[Hashable], RouteEntry] = {}
+
+    def lookup(self, key: Optional[Hashable]) -> RouteEntry:
+        """
+        Return callbacks matching route key and their predicates.
+
+        None key, returned by route key function for items without key, matches only callbacks
+        not restricted by route keys.
+        Predicates list is empty if none of matching callbacks has predicate, otherwise it has
+        (callback, predicate or None) pair for every matching callback.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            callbacks: List[Callable] = []
+            predicates: List[Tuple[Callable, Optional[Callable[..., bool]]]] = []
+            for callback, callback_route in self._routes:
+                if callback_route is None:
+                    callbacks.append(callback)
+                    predicates.append((callback, None))
+                elif key is _ANY_KEY or callback_route.keys is None or \
+                        (key is not None and key in callback_route.keys):
+                    callbacks.append(callback)
+                    predicates.append((callback, callback_route.predicate))
+            if all(predicate is None for _, predicate in predicates):
+                predicates = []
+            entry = self._entries[key] = (callbacks, predicates)
+        return entry
+
+
+# All created signals by name, used to find signal of recorded emit on playback
+_signals: 'weakref.WeakValueDictionary[str, Signal]' = weakref.WeakValueDictionary()
+
+
+def get_signal(name: str) -> Optional['Signal']:
+    """Return signal with given name, if it is created"""
+    return _signals.get(name)
+
+
 class Signal:
     """
     Define signal with name and signature
 
     Signature is used to verify binded callbacks and sent data.
+    Signature types can be classes or typing types, like Optional[int].
     """
-    # need support for typing types, like Optional[int]
+
     def __init__(self, name: str, **signature: Type):
         self.name = name
         self.signature: Dict[str, Type] = signature
         self.callbacks: List[Callable] = []
+        self.queue_policy: QueuePolicy = DEFAULT_QUEUE_POLICY
+        self.priority: Priority = Priority.NORMAL
+        self.route_key: Optional[Callable[[Dict[str, Any]], Optional[Hashable]]] = None
+        self._route_index = RouteIndex([])
+        self._validate_data = compile_data_validator(signature)
+        _signals[name] = self
+
+    def set_queue_policy(self, backpressure: Backpressure, maxsize: int = DEFAULT_QUEUE_POLICY.maxsize,
+                         key: Optional[Callable[[Dict[str, Any]], Optional[Hashable]]] = None) -> 'Signal':
+        """Set how signal is queued for its callbacks, see QueuePolicy. Returns signal itself."""
+        self.queue_policy = QueuePolicy(backpressure, maxsize, key)
+        return self
+
+    def set_priority(self, priority: Priority) -> 'Signal':
+        """Set execution priority of signal callbacks. Returns signal itself."""
+        self.priority = priority
+        return self
+
+    def set_route_key(self, key: Callable[[Dict[str, Any]], Optional[Hashable]]) -> 'Signal':
+        """
+        Set function that returns route key from signal data, like journal event name. Returns signal itself.
+
+        Callbacks bound with route keys get only signal items with these keys.
+        """
+        self.route_key = key
+        return self
 
-    def bind_nonstrict(self, func: Callable):
+    # pylint: disable=too-many-arguments
+    def bind_nonstrict(self, func: Callable, keys: Optional[Container[Hashable]] = None,
+                       predicate: Optional[Callable[..., bool]] = None, priority: Optional[Priority] = None,
+                       timeout: Optional[float] = None):
         """
         Bind callback without checking signature.
 
         Most of the time you dont want to use this,
         unless you bind lambdas that emit pyqt signals.
         """
-        self.callbacks.append(func)
+        self.callbacks.append(self._apply_binding_options(func, keys, predicate, priority, timeout))
         return func
 
-    def bind(self, func: Callable):
+    # pylint: disable=too-many-arguments
+    def bind(self, func: Callable, keys: Optional[Container[Hashable]] = None,
+             predicate: Optional[Callable[..., bool]] = None, priority: Optional[Priority] = None,
+             timeout: Optional[float] = None):
         """
         Bind callback, check its signature.
 
+        :param keys: Route keys of signal items callback handles, see `set_route_key`
+        :param predicate: Function called with signal data, callback gets only items it returns True for
+        :param priority: Execution priority of this callback, instead of signal priority
+        :param timeout: Seconds callback may run before watchdog quarantines it, see SignalManager
         :raises TypeError: If callback and signal signatures does not match
         """
         self.check_signature(func)  # runtime type checking, yay!
-        self.callbacks.append(func)
+        self.callbacks.append(self._apply_binding_options(func, keys, predicate, priority, timeout))
         return func  # to be used as decorator
 
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def _apply_binding_options(func: Callable, keys: Optional[Container[Hashable]],
+                               predicate: Optional[Callable[..., bool]], priority: Optional[Priority],
+                               timeout: Optional[float] = None) -> Callable:
+        """
+        Attach route, priority and timeout to callback.
+
+        Callbacks that can not have attributes, like bound methods, are wrapped.
+        """
+        if keys is None and predicate is None and priority is None and timeout is None:
+            return func
+
+        def apply(callback):
+            if keys is not None or predicate is not None:
+                route(keys, predicate)(callback)
+            if priority is not None:
+                callback.__edp_signal_priority__ = priority
+            if timeout is not None:
+                callback.__edp_signal_timeout__ = timeout
+            return callback
+
+        try:
+            return apply(func)
+        except AttributeError:
+            return apply(functools.update_wrapper(functools.partial(func), func))
+
+    def get_callbacks(self, data: Dict[str, Any]) -> List[Callable]:
+        """Return callbacks that should get signal item with given data"""
+        index = self._get_route_index()
+        if not index.is_routed:
+            return self.callbacks
+
+        key = _ANY_KEY if self.route_key is None else self.route_key(data)
+        callbacks, predicates = index.lookup(key)
+        if not predicates:
+            return callbacks
+        return [callback for callback, predicate in predicates
+                if predicate is None or self._check_predicate(predicate, data)]
+
+    def _check_predicate(self, predicate: Callable[..., bool], data: Dict[str, Any]) -> bool:
+        try:
+            return bool(predicate(**data))
+        except:
+            logger.exception(f'Error in route predicate {predicate} of signal {self.name}')
+            return False
+
+    def has_callbacks(self, key: Hashable) -> bool:
+        """Check if any callback may get signal item with given route key. Predicates are not checked."""
+        return bool(self._get_route_index().lookup(key)[0])
+
+    def _get_route_index(self) -> RouteIndex:
+        index = self._route_index
+        if index.source != tuple(self.callbacks):  # callbacks list may be changed in place or replaced
+            index = self._route_index = RouteIndex(self.callbacks)
+        return index
+
     def emit(self, **data):
         """
         Execute signals callbacks with given data, asynchronously. Checks data signature.
         """
-        self.check_signature(data)
-        signal_manager.emit(self, **data)
+        if self.callbacks:
+            self._check_data(data)
+            signal_manager.emit(self, **data)
 
     def emit_eager(self, **data):
         """
@@ -81,8 +350,15 @@ class Signal:
 
         Should be used with cauton.
         """
-        self.check_signature(data)
-        signal_manager.emit_eager(self, **data)
+        if self.callbacks:
+            self._check_data(data)
+            signal_manager.emit_eager(self, **data)
+
+    def _check_data(self, data: Dict):
+        """Check emitted data with compiled validator of signal signature"""
+        error = self._validate_data(data)
+        if error is not None:
+            raise TypeError(f'Signature mismatch of signal {self.name}: {error}')
 
     def check_signature(self, func_or_data: Union[Callable, Dict]):
         """
@@ -93,75 +369,400 @@ class Signal:
         if isinstance(func_or_data, FunctionType) and not check_signature(func_or_data, self.signature):
             raise TypeError(f'Signature mismatch: {self.signature} != {func_or_data} {func_or_data.__annotations__}')
         elif isinstance(func_or_data, Dict):
-            data_signature = get_data_signature(func_or_data)
-            if data_signature != self.signature:
-                raise TypeError(f'Signature mismatch: {self.signature} != {data_signature}')
+            error = self._validate_data(func_or_data)
+            if error is not None:
+                raise TypeError(f'Signature mismatch of signal {self.name}: {error}')
 
 
-class SignalExecutionItem(NamedTuple):
+class SignalExecutorThread(StoppableThread):
     """
-    Container for signal data to be executed asynchronously.
+    Thread for asynchronous signal execution.
+
+    Takes emitted signals from signal queue and dispatches them to subscriber queues,
+    which are executed by pool of SignalWorkerThread. Pool is started and stopped with this thread,
+    workers are waited for no longer than `workers_join_timeout` seconds.
     """
-    name: str
-    callbacks: List[Callable]
-    kwargs: dict
+    workers_join_timeout: float = 5
 
+    def __init__(self, manager: 'SignalManager'):
+        self._signal_manager = manager
+        self._workers: List[SignalWorkerThread] = []
+        super(SignalExecutorThread, self).__init__()
 
-class SignalExecutorThread(StoppableThread):
+    def run(self):
+        workers = [SignalWorkerThread(self._signal_manager) for _ in range(self._signal_manager.workers)]
+        self._workers = workers
+        for worker in workers:
+            worker.start()
+
+        next_check = time.monotonic() + self._signal_manager.watchdog_interval
+        try:
+            while not self.is_stopped:
+                self.heartbeat()
+                try:
+                    signal_item: Optional[SignalExecutionItem] = \
+                        self._signal_manager.signal_queue.get(block=True, timeout=1)
+                except queue.Empty:
+                    pass
+                else:
+                    self.process_signal_item(signal_item, bool(workers))
+
+                if workers and time.monotonic() >= next_check:
+                    next_check = time.monotonic() + self._signal_manager.watchdog_interval
+                    self.replace_stuck_workers(workers)
+        finally:
+            for worker in workers:
+                worker.stop()
+            deadline = time.monotonic() + self.workers_join_timeout
+            for worker in workers:
+                worker.join(max(deadline - time.monotonic(), 0))
+
+    def process_signal_item(self, signal_item: Optional[SignalExecutionItem], dispatch: bool):
+        """Dispatch emitted signal item to subscriber queues, or execute it right here if there are no workers"""
+        if signal_item is None:
+            return  # woken up by stop
+        try:
+            if dispatch:
+                self._signal_manager.dispatch(signal_item)
+            else:
+                self._signal_manager.execute_signal_item(signal_item)
+        finally:
+            self._signal_manager.signal_item_done(signal_item)
+
+    def stop(self):
+        super(SignalExecutorThread, self).stop()
+        self._signal_manager.signal_queue.put_nowait(None)
+
+    def get_child_threads(self) -> List[StoppableThread]:
+        return list(self._workers)
+
+    def replace_stuck_workers(self, workers: List['SignalWorkerThread']):
+        """
+        Replace workers stuck in callbacks with fresh ones, so other subscribers keep getting signals.
+
+        Stuck worker exits after its callback returns.
+        """
+        for thread in self._signal_manager.check_running_callbacks():
+            if thread in workers:
+                thread.stop()
+                worker = SignalWorkerThread(self._signal_manager)
+                worker.start()
+                workers[workers.index(thread)] = worker
+                logger.warning(f'Signal worker {thread.name} is stuck, started {worker.name} instead')
+
+
+class SignalWorkerThread(StoppableThread):
     """
-    Thread for asynchronous signal execution.
+    Executes subscriber queues that have pending signal items.
     """
 
-    def __init__(self, signal_queue: queue.Queue):
-        self._signal_queue = signal_queue
-        super(SignalExecutorThread, self).__init__()
+    def __init__(self, manager: 'SignalManager'):
+        self._signal_manager = manager
+        super(SignalWorkerThread, self).__init__()
 
     def run(self):
         while not self.is_stopped:
             try:
-                signal_item: SignalExecutionItem = self._signal_queue.get(block=True, timeout=1)
+                subscriber_queue: SubscriberQueue = self._signal_manager.ready_queue.get(block=True, timeout=1)
             except queue.Empty:
+                self.heartbeat()
                 continue
 
-            execute_signal_item(signal_item)
+            self.heartbeat(subscriber_queue.name)
+            self._signal_manager.execute_subscriber_queue(subscriber_queue)
+            self.idle()
+
+    def stop(self):
+        super(SignalWorkerThread, self).stop()
+        self._signal_manager.ready_queue.interrupt()
+
+
+def copy_signal_data(data: dict) -> dict:
+    """
+    Deep copy signal data, so emitter can not change it after emit.
+
+    Immutable payloads, like journal Event or frozen entities, are not copied at all.
+    """
+    try:
+        return copy.deepcopy(data)
+    except Exception as e:
+        logger.debug(f'Failed to deepcopy signal data: {e}')
+        return data
+
+
+def execute_callback(callback: Callable, signal_item: SignalExecutionItem) -> bool:
+    """
+    Execute callback with data of given SignalExecutionItem, return False if it raised an error
+
+    Data is shared by all callbacks of signal, so callbacks must not change it.
+    Coroutine callbacks are submitted to asyncio loop thread, they are not awaited here.
+    """
+    try:
+        result = callback(**signal_item.kwargs)
+        if result is not None and asyncio.iscoroutine(result):
+            asyncloop.loop_thread.submit(result, name=f'callback {callback} of signal {signal_item.name}')
+        return True
+    except:
+        logger.exception(f'Error calling callback {callback} of signal {signal_item.name}')
+        return False
 
 
 def execute_signal_item(signal_item: SignalExecutionItem):
     """Execute all callbacks in given SignalExecutionItem"""
     for callback in signal_item.callbacks:
-        try:
-            kwargs = copy.deepcopy(signal_item.kwargs)
-        except Exception as e:
-            logger.debug(f'Failed to deepcopy signal data: {e}')
-            kwargs = signal_item.kwargs
-        try:
-            callback(**kwargs)
-        except:
-            logger.exception(f'Error calling callback {callback} of signal {signal_item.name}')
+        execute_callback(callback, signal_item)
 
 
 class SignalManager:
-    """Manages asynchronous signal execution. Private api."""
-    def __init__(self):
-        self._signal_queue = queue.Queue()
-        self._signal_executor_thread = SignalExecutorThread(self._signal_queue)
+    """
+    Manages asynchronous signal execution. Private api.
+
+    Every callback gets its own serial queue, executed by pool of `workers` threads. So callbacks see signals
+    in emit order, but slow callback does not block others. If `workers` is 0, all callbacks are executed
+    one by one in signal executor thread.
+
+    Queues with pending items of higher priority get workers first, see ReadyQueue.
+
+    Signal executor thread works as watchdog: every `watchdog_interval` seconds it looks for callbacks running
+    longer than their timeout, `callback_timeout` by default. Stack of such callback is logged, its subscriber
+    is quarantined - pending and new items are dropped until callback returns, and stuck worker is replaced
+    with a fresh one. Without workers there is no watchdog.
+    """
+    # Max number of items executed from one subscriber queue before worker switches to another
+    batch_size = 16
+    callback_timeout: float = 60
+    watchdog_interval: float = 1
+
+    def __init__(self, workers: int = 4, starvation_limit: int = 8):
+        self.workers = workers
+        self.signal_queue: queue.Queue = queue.Queue()
+        self.ready_queue = ReadyQueue(starvation_limit)
+        self._subscriber_queues: Dict[Callable, SubscriberQueue] = {}
+        self._lock = threading.Condition()
+        self._blocked_emitters = 0
+        self._pending: Counter = Counter()  # emitted items of signal not yet taken by signal executor thread
+        self._dropped: Counter = Counter()
+        self._coalesced: Counter = Counter()
+        self._blocked: Counter = Counter()
+        self._quarantined: Counter = Counter()
+        self._running: Dict[threading.Thread, RunningCallback] = {}
+        self.instrumentation = SignalInstrumentation()
+        self.recorder: Any = None  # edp.signal_recording.SignalRecorder, records emits and calls if set
+        self._signal_executor_thread = SignalExecutorThread(self)
 
     def get_signal_executor_thread(self) -> SignalExecutorThread:
         """Return thread that executes signals"""
         return self._signal_executor_thread
 
     def emit(self, signal: Signal, **kwargs):
-        """Asynchronously execute given signal with data"""
-        if signal.callbacks:
-            signal_item = SignalExecutionItem(signal.name, signal.callbacks, kwargs)
-            self._signal_queue.put_nowait(signal_item)
+        """
+        Asynchronously execute given signal with data
+
+        Blocks if queues of signal callbacks are full, unless signal items are dropped or coalesced.
+        """
+        self.instrumentation.record_emit(signal.name)
+        sequence = self.recorder.record_emit(signal.name, kwargs, False) if self.recorder is not None else 0
+        callbacks = signal.get_callbacks(kwargs)
+        if callbacks:
+            policy = signal.queue_policy
+            if policy.backpressure is not Backpressure.DROP_OLDEST \
+                    and policy.get_coalesce_key(signal.name, kwargs) is None:
+                self._wait_for_room(signal, callbacks)
+            signal_item = SignalExecutionItem(signal.name, callbacks, copy_signal_data(kwargs), policy,
+                                              time.perf_counter(), signal.priority, sequence)
+            with self._lock:
+                self._pending[signal.name] += 1
+            self.signal_queue.put_nowait(signal_item)
+
+    def signal_item_done(self, signal_item: SignalExecutionItem):
+        """Called by signal executor thread after emitted signal item is dispatched or executed"""
+        with self._lock:
+            self._pending[signal_item.name] -= 1
+            if self._blocked_emitters:
+                self._lock.notify_all()
+
+    def _get_backlog(self, signal: Signal, callbacks: List[Callable]) -> int:
+        """
+        Return max number of not executed items of signal among given callbacks
+
+        Items of signal that are not dispatched yet are counted too, items of other signals are not.
+        """
+        backlog = 0
+        for callback in callbacks:
+            subscriber_queue = self._subscriber_queues.get(callback)
+            if subscriber_queue is not None:
+                backlog = max(backlog, subscriber_queue.counts.get(signal.name, 0))
+        return backlog + self._pending[signal.name]
+
+    def _wait_for_room(self, signal: Signal, callbacks: List[Callable]):
+        """Block until given callbacks of signal have room in their queues"""
+        maxsize = signal.queue_policy.maxsize
+        if self._get_backlog(signal, callbacks) < maxsize or not self._signal_executor_thread.is_alive():
+            return
+
+        current_thread = threading.current_thread()
+        if isinstance(current_thread, (SignalExecutorThread, SignalWorkerThread)):
+            return  # callbacks emitting signals must never wait for other callbacks, that is a deadlock
+
+        with self._lock:
+
+            self._blocked[signal.name] += 1
+            self._blocked_emitters += 1
+            try:
+                while self._get_backlog(signal, callbacks) >= maxsize and self._signal_executor_thread.is_alive() \
+                        and not getattr(current_thread, 'is_stopped', False):
+                    self._lock.wait(1)
+            finally:
+                self._blocked_emitters -= 1
 
-    # pylint: disable=no-self-use
     def emit_eager(self, signal: Signal, **kwargs):
         """Synchronously execute given signal with data"""
-        if signal.callbacks:
-            signal_item = SignalExecutionItem(signal.name, signal.callbacks, kwargs)
-            execute_signal_item(signal_item)
+        self.instrumentation.record_emit(signal.name)
+        sequence = self.recorder.record_emit(signal.name, kwargs, True) if self.recorder is not None else 0
+        callbacks = signal.get_callbacks(kwargs)
+        if callbacks:
+            signal_item = SignalExecutionItem(signal.name, callbacks, copy_signal_data(kwargs), signal.queue_policy,
+                                              time.perf_counter(), signal.priority, sequence)
+            self.execute_signal_item(signal_item)
+
+    def execute_callback(self, callback: Callable, signal_item: SignalExecutionItem,
+                         callback_name: Optional[str] = None):
+        """Execute callback with signal item data and record its execution statistics"""
+        start = time.perf_counter()
+        succeeded = execute_callback(callback, signal_item)
+        end = time.perf_counter()
+        callback_name = callback_name or get_callback_name(callback)
+        self.instrumentation.record_call(callback_name, signal_item, start, end, not succeeded)
+        if self.recorder is not None:
+            self.recorder.record_call(callback_name, signal_item, start, end)
+
+    def execute_signal_item(self, signal_item: SignalExecutionItem):
+        """Execute all callbacks of signal item one by one, recording their execution statistics"""
+        for callback in signal_item.callbacks:
+            self.execute_callback(callback, signal_item)
+
+    def dispatch(self, signal_item: SignalExecutionItem):
+        """Put signal item to queues of its callbacks and schedule them for execution"""
+        coalesce_key = signal_item.policy.get_coalesce_key(signal_item.name, signal_item.kwargs)
+        with self._lock:
+            for callback in signal_item.callbacks:
+                subscriber_queue = self._subscriber_queues.get(callback)
+                if subscriber_queue is None:
+                    subscriber_queue = self._subscriber_queues[callback] = SubscriberQueue(callback)
+                if subscriber_queue.quarantined:
+                    self._quarantined[signal_item.name] += 1
+                    continue
+
+                priority = subscriber_queue.get_item_priority(signal_item)
+                result = subscriber_queue.put(signal_item, coalesce_key, priority)
+                if result is Backpressure.DROP_OLDEST:
+                    self._dropped[signal_item.name] += 1
+                elif result is Backpressure.COALESCE:
+                    self._coalesced[signal_item.name] += 1
+
+                if not subscriber_queue.scheduled:
+                    subscriber_queue.scheduled = True
+                    self.ready_queue.put(subscriber_queue, priority)
+                else:
+                    self.ready_queue.promote(subscriber_queue, priority)
+
+    def execute_subscriber_queue(self, subscriber_queue: SubscriberQueue):
+        """
+        Execute pending items of subscriber queue.
+
+        At most `batch_size` items are executed, then queue is rescheduled if it still has items.
+        Worker switches earlier if queue of higher priority is waiting.
+        """
+        for _ in range(self.batch_size):
+            with self._lock:
+                signal_item = subscriber_queue.pop()
+                if signal_item is None:
+                    subscriber_queue.scheduled = False
+                    return
+                if self._blocked_emitters:
+                    self._lock.notify_all()
+                worker = threading.current_thread()
+                running = self._running[worker] = RunningCallback(subscriber_queue, signal_item, time.monotonic())
+
+            try:
+                self.execute_callback(subscriber_queue.callback, signal_item, subscriber_queue.name)
+            finally:
+                del self._running[worker]
+            if subscriber_queue.quarantined:
+                with self._lock:
+                    subscriber_queue.quarantined = False
+                logger.warning(f'Callback {subscriber_queue.name} returned after '
+                               f'{time.monotonic() - running.start:.1f} seconds, quarantine lifted')
+            if self.ready_queue.has_waiting_above(subscriber_queue.get_item_priority(signal_item)):
+                break
+
+        with self._lock:
+            if subscriber_queue:
+                self.ready_queue.put(subscriber_queue, subscriber_queue.get_priority())
+            else:
+                subscriber_queue.scheduled = False
+
+    def check_running_callbacks(self) -> List[SignalWorkerThread]:
+        """
+        Find callbacks running longer than their timeout, log their stack and quarantine their subscribers.
+
+        Returns workers stuck in newly quarantined callbacks.
+        """
+        stuck: List[SignalWorkerThread] = []
+        for stuck_callback in find_stuck_callbacks(self._running, self.callback_timeout):
+            running = stuck_callback.running
+            subscriber_queue = running.subscriber_queue
+            with self._lock:
+                subscriber_queue.quarantined = True
+                while True:
+                    signal_item = subscriber_queue.pop()
+                    if signal_item is None:
+                        break
+                    self._quarantined[signal_item.name] += 1
+                if self._blocked_emitters:
+                    self._lock.notify_all()
+
+            logger.error(f'Callback {subscriber_queue.name} of signal {running.signal_item.name} is running for '
+                         f'{stuck_callback.duration:.1f} seconds, quarantined until it returns. '
+                         f'Stack:\n{stuck_callback.stack}')
+            if isinstance(stuck_callback.thread, SignalWorkerThread):
+                stuck.append(stuck_callback.thread)
+        return stuck
+
+    def is_idle(self) -> bool:
+        """Return True if no emitted signal items are waiting for execution or being executed"""
+        with self._lock:
+            return not any(self._pending.values()) and not self._running \
+                   and not any(self._subscriber_queues.values())
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all emitted signal items are executed
+
+        :returns: False on timeout or if signal executor thread is not running
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_idle():
+            if not self._signal_executor_thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Return number of pending signal items of every subscriber, by callback name"""
+        depths: Dict[str, int] = {}
+        with self._lock:
+            for subscriber_queue in self._subscriber_queues.values():
+                depths[subscriber_queue.name] = depths.get(subscriber_queue.name, 0) + len(subscriber_queue)
+        return depths
+
+    def get_signal_counters(self) -> Dict[str, SignalCounters]:
+        """Return backpressure counters of signals, by signal name"""
+        with self._lock:
+            names = set(self._dropped) | set(self._coalesced) | set(self._blocked) | set(self._quarantined)
+            return {name: SignalCounters(self._dropped[name], self._coalesced[name], self._blocked[name],
+                                         self._quarantined[name])
+                    for name in names}
 
 
 signal_manager = SignalManager()
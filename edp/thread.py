@@ -1,11 +1,78 @@
 """Threading helpers"""
+import concurrent.futures
+import ctypes
+import enum
+import functools
+import heapq
+import itertools
 import logging
+import os
+import random
+import sys
 import threading
 import time
-from typing import List, Callable, Union
+from typing import List, Callable, Union, Optional, Tuple, Dict, Any, NamedTuple
 
 logger = logging.getLogger(__name__)
 
+_PROC_THREAD_STAT = '/proc/thread-self/stat'
+
+
+def _get_proc_thread_cpu_time() -> float:
+    """Return CPU time of current thread from procfs, Linux only"""
+    with open(_PROC_THREAD_STAT, 'rb') as f:
+        # skip pid and command name, which may contain spaces; utime and stime are 14th and 15th fields
+        fields = f.read().rsplit(b')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def _get_windows_thread_cpu_time(kernel32) -> float:
+    """Return CPU time of current thread with GetThreadTimes, Windows only"""
+    creation, exit_, kernel, user = (ctypes.c_ulonglong() for _ in range(4))  # FILETIME, 100 ns units
+    if not kernel32.GetThreadTimes(kernel32.GetCurrentThread(), ctypes.byref(creation), ctypes.byref(exit_),
+                                   ctypes.byref(kernel), ctypes.byref(user)):
+        raise OSError('GetThreadTimes failed')
+    return (kernel.value + user.value) / 10 ** 7
+
+
+def _get_thread_cpu_time_function() -> Optional[Callable[[], float]]:
+    """Return function that measures CPU time of current thread, None if platform can not measure it"""
+    if sys.version_info >= (3, 7):
+        return time.thread_time  # pylint: disable=no-member
+    if sys.platform == 'win32':
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentThread.restype = ctypes.c_void_p
+        kernel32.GetThreadTimes.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ulonglong)] * 4
+        return functools.partial(_get_windows_thread_cpu_time, kernel32)
+    if os.path.exists(_PROC_THREAD_STAT):
+        return _get_proc_thread_cpu_time
+    return None
+
+
+_thread_cpu_time = _get_thread_cpu_time_function()
+
+
+def has_thread_cpu_time() -> bool:
+    """Check if CPU time of threads can be measured on this platform"""
+    return _thread_cpu_time is not None
+
+
+def get_thread_cpu_time() -> Optional[float]:
+    """Return CPU time of current thread, in seconds. None if platform can not measure it."""
+    return _thread_cpu_time() if _thread_cpu_time is not None else None
+
+
+class ThreadHealth(NamedTuple):
+    """Health of thread, as reported by thread itself with heartbeats. Times are in seconds."""
+    name: str
+    alive: bool
+    stopped: bool
+    iterations: int
+    since_heartbeat: Optional[float]  # None if thread never reported heartbeat
+    target: Optional[str]  # what thread is busy with, None if it is idle
+    cpu_time: Optional[float]  # thread CPU time at last heartbeat or idle report, None if it is not measured
+    stuck: bool  # busy with one target longer than stuck_timeout
+
 
 class StoppableThread(threading.Thread):
     """
@@ -15,21 +82,33 @@ class StoppableThread(threading.Thread):
     To allow stopping such threads, this class was created.
 
     When creating such background loop, use `while self.is_stopped` and `self.sleep(10)` to be able to stop
-    thread in those places.
+    thread in those places. Sleep is interrupted as soon as thread is stopped.
+
+    Thread reports its health itself: loop calls `heartbeat` with name of what it is going to do on every
+    iteration and `idle` (or `sleep`) when work is done. Thread busy with one target for longer than
+    `stuck_timeout` seconds is reported as stuck.
     """
-    _stopped = False
+    stuck_timeout: float = 60
+
+    def __init__(self, *args, **kwargs):
+        super(StoppableThread, self).__init__(*args, **kwargs)
+        self._stop_event = threading.Event()
+        self.iterations = 0
+        self.current_target: Optional[str] = None
+        self.last_heartbeat: Optional[float] = None  # time.monotonic value
+        self.cpu_time: Optional[float] = 0.0 if has_thread_cpu_time() else None
 
     def start(self):
-        self._stopped = False
+        self._stop_event.clear()
         super(StoppableThread, self).start()
 
     def stop(self):
         """
         Stop thread.
 
-        Does not actually stops thread.
+        Does not actually stops thread, use `join` to wait until it finishes.
         """
-        self._stopped = True
+        self._stop_event.set()
 
     def __enter__(self):
         self.start()
@@ -41,7 +120,7 @@ class StoppableThread(threading.Thread):
     @property
     def is_stopped(self):
         """Return True if current thread is stopped."""
-        return self._stopped
+        return self._stop_event.is_set()
 
     def sleep(self, interval: Union[int, float]):
         """
@@ -51,13 +130,38 @@ class StoppableThread(threading.Thread):
 
         :param interval: Sleep interval, in seconds
         """
-        while interval > 0 and not self.is_stopped:
-            if interval > 1:
-                interval -= 1
-                time.sleep(1)
-            else:
-                time.sleep(interval)
-                interval = 0
+        self.idle()
+        if interval > 0:
+            self._stop_event.wait(interval)
+
+    def heartbeat(self, target: Optional[str] = None):
+        """
+        Report loop iteration: thread is alive and starts working on target, if given.
+
+        Must be called from thread itself, samples its CPU time.
+        """
+        self.iterations += 1
+        self.current_target = target
+        self.last_heartbeat = time.monotonic()
+        self.cpu_time = get_thread_cpu_time()
+
+    def idle(self):
+        """Report that thread finished its work and waits for more. Must be called from thread itself."""
+        self.current_target = None
+        self.cpu_time = get_thread_cpu_time()
+
+    def get_health(self) -> ThreadHealth:
+        """Return thread health, see ThreadHealth"""
+        target = self.current_target
+        since_heartbeat = time.monotonic() - self.last_heartbeat if self.last_heartbeat is not None else None
+        alive = self.is_alive()
+        stuck = alive and target is not None and since_heartbeat is not None and since_heartbeat > self.stuck_timeout
+        return ThreadHealth(self.name, alive, self.is_stopped, self.iterations, since_heartbeat, target,
+                            self.cpu_time, stuck)
+
+    def get_child_threads(self) -> List['StoppableThread']:  # pylint: disable=no-self-use
+        """Return threads started and stopped by this thread, like worker pool"""
+        return []
 
 
 class IntervalRunnerThread(StoppableThread):
@@ -74,8 +178,10 @@ class IntervalRunnerThread(StoppableThread):
 
     # noinspection PyUnresolvedReferences
     def run(self):
+        target_name = getattr(self._target, '__qualname__', None) or repr(self._target)
         while not self.is_stopped:
             try:
+                self.heartbeat(target_name)
                 if not self._skipfirst:
                     self._target(*self._args, **self._kwargs)
                 else:
@@ -86,18 +192,260 @@ class IntervalRunnerThread(StoppableThread):
                 self.sleep(self._interval)
 
 
+class ScheduledJobFailure(Exception):
+    """
+    Raised by scheduled job function on expected failure, like when remote service is down.
+
+    Run is counted as failed, but error traceback is not logged.
+    """
+
+
+class ScheduledJob:
+    """
+    Function scheduled for repeated execution by Scheduler.
+
+    Next run is scheduled `interval` seconds after previous run finished, plus random delay up to `jitter`
+    seconds, so jobs with equal intervals do not run all at once. Job never runs concurrently with itself.
+
+    Function can return number of seconds before its next run instead, the hint is limited to
+    `min_interval` and `max_interval`. If `max_interval` is set, failed runs are retried with exponential
+    backoff: interval is doubled after every consecutive failure, up to `max_interval`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, func: Callable, interval: Union[int, float], jitter: Union[int, float] = 0,
+                 misfire_grace: Optional[Union[int, float]] = None, name: Optional[str] = None,
+                 min_interval: Union[int, float] = 0, max_interval: Optional[Union[int, float]] = None):
+        """
+        :param misfire_grace: Run is skipped if it starts later than that many seconds after it was due,
+            for example when all scheduler workers are busy. Late runs are never skipped if not set.
+        :param min_interval: Lower limit of next run hint returned by function
+        :param max_interval: Upper limit of next run hint and of failure backoff. No backoff if not set.
+        """
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.misfire_grace = misfire_grace
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failures = 0  # consecutive failed runs
+        self.name = name or getattr(func, '__qualname__', None) or repr(func)
+        self.next_run: Optional[float] = None  # time.monotonic value, None if job is running or removed
+        self.runs = 0
+        self.misfires = 0
+        self.cpu_time: Optional[float] = 0.0 if has_thread_cpu_time() else None  # total CPU time of all runs
+        self.last_start: Optional[float] = None  # time.monotonic value
+        self.last_duration: Optional[float] = None
+        self.running = False
+        self.removed = False
+        self._next_delay: Optional[float] = None  # delay of next run requested while job was running
+        self._wake_delay: Optional[float] = None  # earliest next run requested by wake while job was running
+
+    def add_cpu_time(self, cpu_start: Optional[float]):
+        """Add CPU time spent by current thread since `cpu_start`, value of get_thread_cpu_time"""
+        cpu_end = get_thread_cpu_time()
+        if self.cpu_time is not None and cpu_start is not None and cpu_end is not None:
+            self.cpu_time += cpu_end - cpu_start
+
+    def get_delay(self) -> float:
+        """Return delay before next run: interval with random jitter"""
+        return self.interval + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def get_next_delay(self, result: Any = None) -> float:
+        """Return delay before next run after run that returned `result`, or after failed run"""
+        if self.failures and self.max_interval is not None:
+            return min(self.interval * 2 ** self.failures, self.max_interval)
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            delay = max(result, self.min_interval)
+            return delay if self.max_interval is None else min(delay, self.max_interval)
+        return self.get_delay()
+
+    def __repr__(self):
+        return f'ScheduledJob({self.name!r}, interval={self.interval!r})'
+
+
+class Scheduler(StoppableThread):
+    """
+    Runs scheduled jobs on small pool of worker threads.
+
+    Single thread keeps heap of job due times and sleeps until the earliest one, so number of threads
+    and wakeups does not grow with number of jobs. Jobs can be added, rescheduled and removed at any time.
+    Late runs are coalesced: job that missed several intervals runs once.
+    """
+
+    def __init__(self, workers: int = 2):
+        super(Scheduler, self).__init__(name='scheduler')
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduler')
+        self._condition = threading.Condition()
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []
+        self._counter = itertools.count()
+        self._jobs: List[ScheduledJob] = []
+
+    # pylint: disable=too-many-arguments
+    def add_job(self, func: Callable, interval: Union[int, float], skipfirst: bool = False,
+                jitter: Union[int, float] = 0, misfire_grace: Optional[Union[int, float]] = None,
+                name: Optional[str] = None, min_interval: Union[int, float] = 0,
+                max_interval: Optional[Union[int, float]] = None) -> ScheduledJob:
+        """
+        Schedule function to run every `interval` seconds, see ScheduledJob.
+
+        :param skipfirst: Wait interval before first run instead of running it right away
+        """
+        job = ScheduledJob(func, interval, jitter=jitter, misfire_grace=misfire_grace, name=name,
+                           min_interval=min_interval, max_interval=max_interval)
+        with self._condition:
+            self._jobs.append(job)
+            self._push(job, job.get_delay() if skipfirst else 0)
+        logger.debug(f'Scheduled {job}')
+        return job
+
+    def reschedule(self, job: ScheduledJob, interval: Optional[Union[int, float]] = None,
+                   delay: Optional[Union[int, float]] = None):
+        """
+        Change job interval and/or delay before its next run.
+
+        Without delay next run is rescheduled with new interval. Running job is rescheduled after it finishes.
+        """
+        with self._condition:
+            if job.removed:
+                return
+            if interval is not None:
+                job.interval = interval
+            next_delay = job.get_delay() if delay is None else delay
+            if job.running:
+                job._next_delay = next_delay  # pylint: disable=protected-access
+            else:
+                self._push(job, next_delay)
+
+    def wake(self, job: ScheduledJob, delay: Union[int, float] = 0):
+        """
+        Run job no later than `delay` seconds from now. Job already due earlier is not delayed.
+
+        Running job runs again after it finishes, so work that arrived during the run is not missed.
+        """
+        with self._condition:
+            if job.removed:
+                return
+            if job.running:
+                # pylint: disable=protected-access
+                job._wake_delay = delay if job._wake_delay is None else min(job._wake_delay, delay)
+            elif job.next_run is None or time.monotonic() + delay < job.next_run:
+                self._push(job, delay)
+
+    def remove_job(self, job: ScheduledJob):
+        """Remove job from scheduler. Running job finishes its current run."""
+        with self._condition:
+            if not job.removed:
+                job.removed = True
+                job.next_run = None
+                self._jobs.remove(job)
+
+    def get_jobs(self) -> List[ScheduledJob]:
+        """Return scheduled jobs"""
+        with self._condition:
+            return list(self._jobs)
+
+    def _push(self, job: ScheduledJob, delay: float):
+        """Set job next run time. Heap entries with outdated run time are skipped when popped."""
+        job.next_run = time.monotonic() + delay
+        heapq.heappush(self._heap, (job.next_run, next(self._counter), job))
+        self._condition.notify()
+
+    def run(self):
+        with self._condition:
+            while not self.is_stopped:
+                self.heartbeat()
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, job = heapq.heappop(self._heap)
+                    if job.next_run != due:
+                        continue  # job was rescheduled or removed
+                    job.running = True
+                    job.next_run = None
+                    self._executor.submit(self._run_job, job, due)
+                self._condition.wait(self._heap[0][0] - now if self._heap else None)
+        self._executor.shutdown(wait=True)  # running jobs finish before scheduler thread does
+
+    def _run_job(self, job: ScheduledJob, due: float):
+        result = None
+        try:
+            if self.is_stopped:
+                return
+            lateness = time.monotonic() - due
+            if job.misfire_grace is not None and lateness > job.misfire_grace:
+                job.misfires += 1
+                logger.warning(f'Job {job.name} skipped, it is {lateness:.1f} seconds late')
+            else:
+                job.runs += 1
+                job.last_start = time.monotonic()
+                cpu_start = get_thread_cpu_time()
+                try:
+                    result = job.func()
+                    job.failures = 0
+                except:
+                    job.failures += 1
+                    raise
+                finally:
+                    job.add_cpu_time(cpu_start)
+                    job.last_duration = time.monotonic() - job.last_start
+        except ScheduledJobFailure as e:
+            logger.debug(f'Scheduled job {job.name} failed: {e!r}')
+        except:
+            logger.exception(f'Error executing scheduled job {job.name}')
+        finally:
+            with self._condition:
+                job.running = False
+                # pylint: disable=protected-access
+                next_delay = job.get_next_delay(result) if job._next_delay is None else job._next_delay
+                if job._wake_delay is not None:
+                    next_delay = min(next_delay, job._wake_delay)
+                job._next_delay = job._wake_delay = None
+                if not job.removed and not self.is_stopped:
+                    self._push(job, next_delay)
+
+    def stop(self):
+        super(Scheduler, self).stop()
+        with self._condition:
+            self._condition.notify()
+
+
+class ShutdownStage(enum.IntEnum):
+    """
+    Shutdown order of threads and shutdown callbacks.
+
+    Threads that produce signals are stopped first, then emitted signals are executed, buffers are flushed,
+    and threads that execute signals and jobs are stopped last.
+    """
+    INGESTION = 0
+    DRAIN = 1
+    FLUSH = 2
+    WORKERS = 3
+
+
 class ThreadManager:
     """
     Manages threads across application lifetime
 
     Implements context manager interface. Starts registered threads on context enter,
-    stops them on context exit.
+    stops them on context exit, stage by stage, see ShutdownStage. Threads of every stage are joined before
+    next stage starts, but whole shutdown waits for threads no longer than `shutdown_timeout` seconds.
     """
+    shutdown_timeout: float = 10
 
     def __init__(self):
         self._threads: List[StoppableThread] = []
+        self._stages: Dict[StoppableThread, ShutdownStage] = {}
+        self._shutdown_callbacks: List[Tuple[ShutdownStage, Callable[[float], Any]]] = []
         self._started = False
 
+    def get_health(self) -> List[ThreadHealth]:
+        """Return health of registered threads and their child threads"""
+        health: List[ThreadHealth] = []
+        for thread in self._threads:
+            health.append(thread.get_health())
+            health.extend(child.get_health() for child in thread.get_child_threads())
+        return health
+
     def add_interval_thread(self, func: Callable, interval):
         """
         Create and start interval thread with given function as target
@@ -105,21 +453,32 @@ class ThreadManager:
         thread = IntervalRunnerThread(func, interval=interval)
         self.add_thread(thread)
 
-    def add_thread(self, thread: StoppableThread):
+    def add_thread(self, thread: StoppableThread, stage: ShutdownStage = ShutdownStage.WORKERS):
         """
         Register thread with manager.
 
         Starts thread only if thread manager already started.
+
+        :param stage: Shutdown stage thread is stopped at
         """
         self._threads.append(thread)
+        self._stages[thread] = stage
         logger.debug('Registered thread %s', thread)
         if self._started:
             thread.start()
 
-    def add_threads(self, *threads: StoppableThread):
+    def add_threads(self, *threads: StoppableThread, stage: ShutdownStage = ShutdownStage.WORKERS):
         """Register multiple threads. Just a shortcut."""
         for thread in threads:
-            self.add_thread(thread)
+            self.add_thread(thread, stage=stage)
+
+    def add_shutdown_callback(self, callback: Callable[[float], Any], stage: ShutdownStage):
+        """
+        Register function called on shutdown, before threads of given stage are stopped.
+
+        Callback is called with seconds left until shutdown timeout.
+        """
+        self._shutdown_callbacks.append((stage, callback))
 
     def start(self):
         """Start registered threads"""
@@ -130,17 +489,53 @@ class ThreadManager:
             except:
                 logger.exception('Failed to start thread %s', thread)
 
-    def stop(self):
-        """Stop registered threads"""
+    def stop(self, timeout: Optional[float] = None) -> float:
+        """
+        Stop registered threads and wait for them, stage by stage
+
+        :param timeout: Max time to wait for threads, `shutdown_timeout` if not set
+        :returns: Shutdown time, in seconds
+        """
         self._started = False
-        for thread in self._threads:
-            try:
-                thread.stop()
-            except:
-                logger.exception('Failed to stop thread %s', thread)
+        start = time.monotonic()
+        deadline = start + (self.shutdown_timeout if timeout is None else timeout)
+
+        for stage in ShutdownStage:
+            stage_start = time.monotonic()
+            for callback_stage, callback in self._shutdown_callbacks:
+                if callback_stage == stage:
+                    try:
+                        callback(max(deadline - time.monotonic(), 0))
+                    except:
+                        logger.exception(f'Error executing shutdown callback {callback}')
+
+            threads = [thread for thread in self._threads if self._stages[thread] == stage]
+            for thread in threads:
+                try:
+                    thread.stop()
+                except:
+                    logger.exception('Failed to stop thread %s', thread)
+            for thread in threads:
+                self._join(thread, deadline)
+            logger.debug(f'Shutdown stage {stage.name} finished in {time.monotonic() - stage_start:.3f} seconds')
+
+        duration = time.monotonic() - start
+        logger.info(f'Threads stopped in {duration:.3f} seconds')
+        return duration
+
+    @staticmethod
+    def _join(thread: StoppableThread, deadline: float):
+        if thread is threading.current_thread() or not thread.ident:
+            return  # thread was not started
+        thread.join(max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            logger.warning(f'Thread {thread.name} did not stop before shutdown timeout')
 
     def __enter__(self):
         self.start()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
+
+
+scheduler = Scheduler()
@@ -111,11 +111,28 @@ def to_ed_timestamp(dt: datetime.datetime) -> str:
     return dt.isoformat(timespec='seconds') + 'Z'
 
 
+ED_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+@functools.lru_cache(1024)
 def from_ed_timestamp(timestamp: str) -> datetime.datetime:
     """
     Convert timestamp string in journal format into datetime object
+
+    Journal timestamps have fixed `YYYY-MM-DDTHH:MM:SSZ` format, so fields are sliced from known positions,
+    falling back to strptime for anything else. Results are cached, since many events share same second.
+
+    :raises ValueError: If timestamp is not in journal format
     """
-    return datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ')
+    if len(timestamp) == 20 and timestamp[4::3] == '--T::Z':
+        fields = timestamp[0:4], timestamp[5:7], timestamp[8:10], timestamp[11:13], timestamp[14:16], timestamp[17:19]
+        if ''.join(fields).isdigit():
+            year, month, day, hour, minute, second = map(int, fields)
+            try:
+                return datetime.datetime(year, month, day, hour, minute, second)
+            except ValueError:
+                pass
+    return datetime.datetime.strptime(timestamp, ED_TIMESTAMP_FORMAT)
 
 
 @functools.lru_cache(200)
@@ -0,0 +1,137 @@
+"""
+File system change notifications.
+
+On Linux directory changes are watched with inotify through ctypes, without any extra dependencies.
+On other platforms :py:func:`get_directory_watcher` returns None and caller should fall back to polling.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+from pathlib import Path
+from typing import Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+_READ_BUFFER_SIZE = 64 * 1024
+
+
+class DirectoryWatcher:
+    """
+    Base directory watcher interface.
+
+    Implements context manager interface, closes watcher on exit.
+    """
+
+    def wait(self, timeout: Union[int, float]) -> Set[str]:
+        """
+        Block until something changes in directory or timeout passes.
+
+        :param timeout: Maximum time to wait, in seconds
+        :returns: Set of changed file names. Empty set if nothing changed.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release watcher resources"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _get_libc() -> ctypes.CDLL:
+    libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+    return ctypes.CDLL(libc_name, use_errno=True)
+
+
+class InotifyDirectoryWatcher(DirectoryWatcher):
+    """
+    Watch directory with Linux inotify api.
+
+    :raises OSError: If inotify is not available or directory can not be watched
+    """
+
+    def __init__(self, path: Path, mask: int = WATCH_MASK):
+        self._path = path
+        libc = _get_libc()
+
+        self._fd: Optional[int] = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd is None or self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f'inotify_init1 failed: {os.strerror(err)}')
+
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            self._fd = None
+            raise OSError(err, f'inotify_add_watch failed for {path}: {os.strerror(err)}')
+
+    def wait(self, timeout: Union[int, float]) -> Set[str]:
+        if self._fd is None:
+            raise ValueError('Watcher is closed')
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def _read_events(self) -> Set[str]:
+        names: Set[str] = set()
+        try:
+            buffer = os.read(self._fd, _READ_BUFFER_SIZE)  # type: ignore
+        except BlockingIOError:
+            return names
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            _, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            names.add(os.fsdecode(name))
+
+        return names
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._path})'
+
+
+def get_directory_watcher(path: Path) -> Optional[DirectoryWatcher]:
+    """
+    Return watcher for given directory, if current platform supports it.
+
+    Return None if nothing available, errors are logged.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        return InotifyDirectoryWatcher(path)
+    except (OSError, AttributeError) as e:
+        logger.debug(f'inotify watcher is not available for {path}: {e}')
+
+    return None
@@ -12,6 +12,8 @@ BASE_URL = URL('https://api.github.com')
 
 class GithubApi:
     """Simple gitgub API client"""
+    timeout = 15
+
     def __init__(self, api_token: Optional[str] = None):
         self._token = api_token
         self._session = requests.Session()
@@ -22,12 +24,13 @@ class GithubApi:
 
     def get_releases(self, owner: str, repo: str) -> List[Dict]:
         """Return repo releases list"""
-        response = self._session.get(BASE_URL / 'repos' / owner / repo / 'releases')
+        response = self._session.get(BASE_URL / 'repos' / owner / repo / 'releases', timeout=self.timeout)
         return response.json()
 
     def get_releases_latest(self, owner: str, repo: str) -> Dict:
         """Return repo latest release"""
-        response = self._session.get(BASE_URL / 'repos' / owner / repo / 'releases' / 'latest')
+        response = self._session.get(BASE_URL / 'repos' / owner / repo / 'releases' / 'latest',
+                                     timeout=self.timeout)
         return response.json()
 
     # pylint: disable=too-many-arguments
@@ -0,0 +1,139 @@
+"""
+Immutable payload containers.
+
+Signal payloads are shared by all signal callbacks. Frozen containers can not be changed by any of them,
+so they are never copied: copy and deepcopy return the same object.
+FrozenDict and FrozenList are dict and list subclasses, so they are json serializable and work with
+any code that only reads them. To change event data, use OverlayDict - copy-on-write view over frozen data.
+"""
+import collections.abc
+from typing import Any, Dict, Iterator, Mapping, Optional, Set, Iterable
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f'{self.__class__.__name__} is immutable')
+
+
+class ImmutableMixin:
+    """Immutable object is shared instead of being copied: copy and deepcopy return the object itself"""
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenDict(ImmutableMixin, dict):
+    """Read-only dict"""
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict.__repr__(self)})'
+
+
+class FrozenList(ImmutableMixin, list):
+    """Read-only list"""
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly  # type: ignore
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly  # type: ignore
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list.__repr__(self)})'
+
+
+def freeze(value: Any) -> Any:
+    """
+    Return immutable version of value.
+
+    Dicts and lists are converted to FrozenDict and FrozenList recursively. Objects that define
+    `__freeze__` method are frozen with it, other values are returned as is.
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(map(freeze, value))
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):
+        return tuple(map(freeze, value))
+    freeze_method = getattr(type(value), '__freeze__', None)
+    if freeze_method is not None:
+        return freeze_method(value)
+    return value
+
+
+class OverlayDict(collections.abc.MutableMapping):
+    """
+    Copy-on-write dict view over base mapping.
+
+    Set and deleted keys are recorded in overlay, base mapping is never changed or copied.
+    Use `to_dict` to get plain dict, for example to serialize it.
+    """
+
+    def __init__(self, base: Mapping, updates: Optional[Dict] = None, dropped: Iterable = ()):
+        self._base = base
+        self._updates: Dict = dict(updates or {})
+        self._dropped: Set = set(dropped) - self._updates.keys()
+
+    def __getitem__(self, key):
+        if key in self._updates:
+            return self._updates[key]
+        if key in self._dropped:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __setitem__(self, key, value):
+        self._updates[key] = value
+        self._dropped.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._updates.pop(key, None)
+        if key in self._base:
+            self._dropped.add(key)
+
+    def __contains__(self, key):
+        return key in self._updates or (key not in self._dropped and key in self._base)
+
+    def __iter__(self) -> Iterator:
+        for key in self._base:
+            if key not in self._dropped:
+                yield key
+        for key in self._updates:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def drop(self, *keys) -> 'OverlayDict':
+        """Drop keys if they exist, return self"""
+        for key in keys:
+            if key in self:
+                del self[key]
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return plain dict with overlay applied"""
+        return {key: self[key] for key in self}
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.to_dict()!r})'
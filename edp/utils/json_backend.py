@@ -0,0 +1,102 @@
+"""
+Pluggable json decoding.
+
+Uses fastest available json library: orjson or ujson if installed, stdlib json otherwise.
+Journal ingestion should decode json through this module.
+"""
+import importlib
+import json
+import logging
+from typing import Any, Callable, List, NamedTuple, Sequence
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('orjson', 'ujson', 'json')
+
+
+class JSONBackend(NamedTuple):
+    """Json library name and its decode function"""
+    name: str
+    loads: Callable[[str], Any]
+
+
+def load_backend(name: str) -> JSONBackend:
+    """
+    Import json library by its name.
+
+    :raises ImportError: If library is not installed
+    """
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown json backend {name}, expected one of {BACKENDS}')
+    module = importlib.import_module(name)
+    return JSONBackend(name, module.loads)  # type: ignore
+
+
+def find_backend() -> JSONBackend:
+    """Return first installed json backend"""
+    for name in BACKENDS:
+        try:
+            return load_backend(name)
+        except ImportError:
+            continue
+    return JSONBackend('json', json.loads)  # pragma: no cover
+
+
+_backend: JSONBackend = find_backend()
+
+
+def get_backend() -> JSONBackend:
+    """Return currently used json backend"""
+    return _backend
+
+
+def set_backend(name: str):
+    """
+    Use json library with given name
+
+    :raises ImportError: If library is not installed
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = load_backend(name)
+    logger.debug(f'Using {name} json backend')
+
+
+def loads(s: str) -> Any:
+    """
+    Decode json string with current backend.
+
+    :raises ValueError: If string is not a valid json
+    """
+    return _backend.loads(s)
+
+
+def loads_many(lines: Sequence[str], chunk_size: int = 1000) -> List[Any]:
+    """
+    Decode many json lines.
+
+    Lines are joined into json arrays of `chunk_size` items and decoded with one call per chunk.
+    If chunk can not be decoded, its lines are decoded one by one, so invalid line does not affect others.
+
+    :returns: Decoded values in the same order as lines. Lines that could not be decoded
+        are represented by ValueError instances.
+    """
+    result: List[Any] = []
+
+    for start in range(0, len(lines), chunk_size):
+        chunk = lines[start:start + chunk_size]
+        try:
+            values = _backend.loads('[' + ','.join(chunk) + ']')
+        except ValueError:
+            values = None
+
+        if values is None or len(values) != len(chunk):
+            values = []
+            for line in chunk:
+                try:
+                    values.append(_backend.loads(line))
+                except ValueError as e:
+                    values.append(e)
+
+        result.extend(values)
+
+    return result
@@ -1,22 +1,50 @@
 """Various helpers for plugin development"""
 import logging
+import operator
 import threading
-from typing import List, Dict, Generic, TypeVar, Callable, Iterator, Optional
+from typing import List, Dict, Generic, TypeVar, Callable, Iterator, Optional, Container
 
-from edp import journal, plugins, signals
+from edp import journal, plugins, signals, signalslib, thread
 
 logger = logging.getLogger(__name__)
 
 
+FLUSH_INTERVAL = 60  # seconds between flushes of not empty buffer
+IDLE_FLUSH_INTERVAL = 30 * 60  # seconds between flushes of empty buffer, and max failed flush backoff
+
+
+class RetryLater(thread.ScheduledJobFailure):
+    """
+    Raised by `process_buffered_events` when events could not be processed now, like when service is down.
+
+    Given events are put back into buffer, next flush is delayed with exponential backoff.
+    """
+
+    def __init__(self, events: List[journal.Event], *args):
+        super(RetryLater, self).__init__(*args)
+        self.events = events
+
+
 class BufferedEventsMixin:
     """
-    Buffers journal events and processes them every minute
+    Buffers journal events and processes them a minute after first buffered event, and on application exit
+
+    Set `buffered_events` to names of events to buffer, other events are not delivered to plugin at all.
+    Buffer is flushed right away when it has `buffer_flush_size` events, and is not flushed at all while it is empty.
+    While flushes fail, they are retried with backoff only, and buffer keeps at most `buffer_max_size` newest events.
+    Buffer is flushed by one thread at a time, so events are processed in order.
     """
+    buffered_events: Optional[Container[str]] = None  # None means all events
+    buffer_flush_size: int = 100
+    buffer_max_size: int = 10000
+
     def __init__(self, *args, **kwargs):
         super(BufferedEventsMixin, self).__init__(*args, **kwargs)
 
         self._events_buffer: List[journal.Event] = []
         self._events_buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events_dropped = 0  # since last successful flush
 
     # pylint: disable=unused-argument,no-self-use
     def filter_event(self, event: journal.Event) -> bool:
@@ -27,10 +55,11 @@ class BufferedEventsMixin:
         """
         return True
 
-    @plugins.bind_signal(journal.journal_event_signal)
+    @plugins.bind_signal(journal.journal_event_signal, keys=operator.attrgetter('buffered_events'),
+                         priority=signalslib.Priority.BULK)
     def on_journal_event(self, event: journal.Event):
         """
-        Called on every journal event.
+        Called on every buffered journal event.
 
         Event is put into buffer if filter_event returns True.
         """
@@ -38,26 +67,64 @@ class BufferedEventsMixin:
             return
         with self._events_buffer_lock:
             self._events_buffer.append(event)
-
-    @plugins.scheduled(60)
-    def buffer_flush_callback(self):
+            self._trim_events_buffer()
+            size = len(self._events_buffer)
+
+        if size == 1:
+            plugins.wake_scheduled(self.buffer_flush_callback, FLUSH_INTERVAL)
+        elif size == self.buffer_flush_size:
+            job = plugins.get_scheduled_job(self.buffer_flush_callback)
+            if job is None or not job.failures:  # failed flush is retried with backoff
+                plugins.wake_scheduled(self.buffer_flush_callback)
+
+    def _trim_events_buffer(self):
+        """Drop oldest events if buffer is larger than `buffer_max_size`. Must be called with buffer lock held."""
+        excess = len(self._events_buffer) - self.buffer_max_size
+        if excess > 0:
+            del self._events_buffer[:excess]
+            if not self._events_dropped:
+                logger.warning(f'{self.__class__.__name__} buffer is full, dropping oldest events')
+            self._events_dropped += excess
+
+    # buffered plugins flush at different times
+    @plugins.scheduled(FLUSH_INTERVAL, jitter=10, max_interval=IDLE_FLUSH_INTERVAL)
+    def buffer_flush_callback(self) -> Optional[int]:
         """
         Flush buffer and process all buffered events
+
+        Waits for flush in progress to finish first. Returns seconds before next flush if buffer is empty,
+        first buffered event wakes it earlier.
+
+        :raises RetryLater: If events were put back into buffer
         """
-        if not self._events_buffer:
-            return
+        with self._flush_lock:
+            if not self._events_buffer:
+                return IDLE_FLUSH_INTERVAL
 
-        with self._events_buffer_lock:
-            events = self._events_buffer.copy()
-            self._events_buffer.clear()
+            with self._events_buffer_lock:
+                events = self._events_buffer.copy()
+                self._events_buffer.clear()
 
-        self.process_buffered_events(events)
+            try:
+                self.process_buffered_events(events)
+            except RetryLater as e:
+                with self._events_buffer_lock:
+                    self._events_buffer[:0] = e.events
+                    self._trim_events_buffer()
+                logger.warning(f'{self.__class__.__name__} will retry {len(e.events)} buffered events later: {e}')
+                raise
+
+            with self._events_buffer_lock:
+                dropped, self._events_dropped = self._events_dropped, 0
+            if dropped:
+                logger.warning(f'{self.__class__.__name__} dropped {dropped} events while buffer was full')
+        return None
 
     def process_buffered_events(self, events: List[journal.Event]):
         """
         Process buffered events.
 
-        Should be overriden by subclass.
+        Should be overriden by subclass. Raise RetryLater with events that should be processed later.
         """
         raise NotImplementedError
 
@@ -67,7 +134,10 @@ class BufferedEventsMixin:
         Flush buffer on application exit
         """
         logger.debug(f'{self.__class__.__name__} exit callback')
-        self.buffer_flush_callback()
+        try:
+            self.buffer_flush_callback()
+        except RetryLater as e:
+            logger.error(f'{self.__class__.__name__} failed to process {len(e.events)} buffered events on exit')
 
 
 CT = TypeVar('CT', bound=Callable)  # Callback Type
@@ -116,6 +186,10 @@ class RoutingSwitchRegistry(Generic[CT, RT]):
 
         return decor
 
+    def __contains__(self, routing_key) -> bool:
+        """Check if any callback is registered on routing key"""
+        return routing_key in self._callbacks
+
     def execute(self, routing_key: str, **kwargs) -> Iterator[RT]:
         """
         Execute callbacks registered on routing key with given parameters.
@@ -1,8 +1,11 @@
+import atexit
 import ctypes
 import logging
+import multiprocessing
 import platform
 import time
 import traceback
+from typing import Optional
 
 import inject
 import sentry_sdk
@@ -13,7 +16,8 @@ from edp.contrib import discord_rich_presence, inara, updater
 def main():
     from PyQt5.QtWidgets import QApplication
 
-    from edp import signalslib, plugins, thread, signals, journal, config, logging_tools
+    from edp import signalslib, plugins, thread, signals, journal, journal_archive, journal_replay, config, \
+        logging_tools, asyncloop, signal_recording
     from edp.gui.forms.main_window import MainWindow, main_window_created_signal
     from edp.contrib import edsm, gamestate, eddn, capi, overlay_ui
     from edp.settings import EDPSettings
@@ -36,6 +40,12 @@ def main():
         logger.info('Initializing flightlog journal handler')
         journal_reader = journal.JournalReader(settings.journal_dir)
 
+        archive: Optional[journal_archive.JournalArchive] = None
+        if settings.enable_journal_archive:
+            config.JOURNAL_ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            archive = journal_archive.JournalArchive(config.JOURNAL_ARCHIVE_PATH, settings.journal_dir)
+            journal.journal_file_opened_signal.bind(archive.on_journal_file_opened, priority=signalslib.Priority.BULK)
+
         game_version = journal_reader.get_game_version_info()
         if game_version:
             scope.set_tag('game_version', game_version.version)
@@ -62,6 +72,8 @@ def main():
             binder.bind(plugins.PluginProxy, plugin_proxy)
             binder.bind(thread.ThreadManager, thread_manager)
             binder.bind(journal.JournalReader, journal_reader)
+            if archive is not None:
+                binder.bind(journal_archive.JournalArchive, archive)
 
             for cls, obj in plugin_manager._plugins_cls_map.items():
                 binder.bind(cls, obj)
@@ -73,11 +85,32 @@ def main():
         plugin_manager.set_plugin_annotation_references()
         plugin_manager.register_plugin_signals()
 
+        if config.SIGNAL_RECORD_PATH:
+            recorder = signal_recording.SignalRecorder(config.SIGNAL_RECORD_PATH).install()
+            atexit.register(recorder.uninstall)
+
+        if config.JOURNAL_REPLAY_PATH:
+            logger.info(f'Replaying journal {config.JOURNAL_REPLAY_PATH}, speed={config.JOURNAL_REPLAY_SPEED}')
+            journal_thread: thread.StoppableThread = journal_replay.JournalReplayThread(
+                journal_replay.get_replay_files(config.JOURNAL_REPLAY_PATH), speed=config.JOURNAL_REPLAY_SPEED)
+        else:
+            journal_thread = journal.JournalLiveEventThread(journal_reader)
+
+        # on exit journal reading stops first, then emitted events are handled and uploader buffers flushed
+        thread_manager.add_threads(journal_thread, stage=thread.ShutdownStage.INGESTION)
+        if archive is not None:
+            thread_manager.add_threads(
+                journal_archive.JournalBulkImportThread(journal_archive.JournalBulkImporter(archive)),
+                stage=thread.ShutdownStage.INGESTION,
+            )
         thread_manager.add_threads(
-            journal.JournalLiveEventThread(journal_reader),
             signalslib.signal_manager.get_signal_executor_thread(),
-            *plugin_manager.get_scheduled_methods_threads()
+            asyncloop.loop_thread,
+            thread.scheduler,
         )
+        thread_manager.add_shutdown_callback(signalslib.signal_manager.wait_idle, thread.ShutdownStage.DRAIN)
+        thread_manager.add_shutdown_callback(lambda timeout: signals.exiting.emit_eager(), thread.ShutdownStage.FLUSH)
+        plugin_manager.schedule_methods()
 
         with thread_manager:
             time.sleep(0.1)  # do we need this? for threads warmup
@@ -98,11 +131,11 @@ def main():
             try:
                 app.exec_()
             finally:
-                logger.info('App finished, exiting signal emit')
-                signals.exiting.emit_eager()
+                logger.info('App finished, shutting down')
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     try:
         main()
     except:
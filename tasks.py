@@ -159,6 +159,14 @@ def unittests(c):
     c.run('pytest -sv tests')
 
 
+@task()
+def benchmarks(c):
+    """Run all performance benchmarks"""
+    for path in sorted((BASE_DIR / 'benchmarks').glob('bench_*.py')):
+        print(f'Running {path.stem}')
+        c.run(f'python -m benchmarks.{path.stem}')
+
+
 @task(mypy, pylint, unittests)
 def test(c):  # pylint: disable=unused-argument
     """
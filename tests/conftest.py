@@ -49,7 +49,7 @@ def clear_settings_instances(patch_settings_dir, tempdir):
     settings.BaseSettings.__setting_per_name__.clear()
 
 
-@pytest.fixture('session', autouse=True)
+@pytest.fixture(scope='session', autouse=True)
 def qapp():
     app = QtWidgets.QApplication([])
     yield app
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from edp import asyncloop, plugins, signalslib, thread
+
+
+@pytest.fixture()
+def loop_thread():
+    thread = asyncloop.AsyncLoopThread()
+    with mock.patch('edp.asyncloop.loop_thread', thread), thread:
+        yield thread
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_submit(loop_thread):
+    async def coro(value):
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    assert loop_thread.submit(coro(2)).result(5) == 4
+
+
+def test_submit_concurrent(loop_thread):
+    async def coro():
+        await asyncio.sleep(0.2)
+
+    start = time.monotonic()
+    futures = [loop_thread.submit(coro()) for _ in range(10)]
+    for future in futures:
+        future.result(5)
+    assert time.monotonic() - start < 1
+
+
+def test_submit_error_logged(loop_thread):
+    async def coro():
+        raise ValueError('test')
+
+    with mock.patch.object(asyncloop.logger, 'error') as error_mock:
+        future = loop_thread.submit(coro(), name='test coro')
+        with pytest.raises(ValueError):
+            future.result(5)
+
+    error_mock.assert_called_once()
+    assert 'test coro' in error_mock.call_args[0][0]
+
+
+def test_stop_cancels_tasks():
+    thread = asyncloop.AsyncLoopThread()
+    started = threading.Event()
+
+    async def coro():
+        started.set()
+        await asyncio.sleep(60)
+
+    with thread:
+        future = thread.submit(coro())
+        assert started.wait(5)
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert future.cancelled()
+
+
+def test_run_blocking(loop_thread):
+    async def coro():
+        return await asyncloop.run_blocking(threading.current_thread)
+
+    assert loop_thread.submit(coro()).result(5) not in (threading.current_thread(), loop_thread)
+
+
+def test_signal_async_callback(loop_thread):
+    received = []
+    done = threading.Event()
+
+    async def callback(value: int):
+        await asyncio.sleep(0.01)
+        received.append((value, threading.current_thread()))
+        done.set()
+
+    signal = signalslib.Signal('test', value=int)
+    signal.bind(callback)
+    signal.emit_eager(value=1)
+
+    assert done.wait(5)
+    assert received == [(1, loop_thread)]
+
+
+def test_plugin_async_methods(loop_thread):
+    signal = signalslib.Signal('test', value=int)
+    received = []
+
+    class Plugin(plugins.BasePlugin):
+        @plugins.scheduled(0.01)
+        async def scheduled_method(self):
+            await asyncio.sleep(0)
+            received.append('scheduled')
+
+        @plugins.bind_signal(signal)
+        async def signal_method(self, value: int):
+            await asyncio.sleep(0)
+            received.append(value)
+
+    plugin = Plugin()
+    plugin_manager = plugins.PluginManager([plugin])
+    plugin_manager.register_plugin_signals()
+    scheduler = thread.Scheduler()
+
+    with scheduler:
+        assert len(plugin_manager.schedule_methods(scheduler)) == 1
+        signal.emit_eager(value=1)
+        time.sleep(0.2)
+    scheduler.join(5)
+
+    assert 1 in received
+    assert received.count('scheduled') > 1
+    assert plugins.wake_scheduled(plugin.scheduled_method)
+
+
+def test_plugin_async_method_next_run_hint(loop_thread):
+    class Plugin(plugins.BasePlugin):
+        @plugins.scheduled(60, min_interval=0.01)
+        async def scheduled_method(self):
+            await asyncio.sleep(0)
+            return 0
+
+    scheduler = thread.Scheduler()
+    job, = plugins.PluginManager([Plugin()]).schedule_methods(scheduler)
+
+    with scheduler:
+        time.sleep(0.2)
+    scheduler.join(5)
+
+    assert job.runs > 1
+    assert job.failures == 0
@@ -1,3 +1,5 @@
+import threading
+import time
 from unittest import mock
 
 import pytest
@@ -51,3 +53,100 @@ def test_exit_callback_triggers_buffer_flush(buffered_events_mixin, event):
     buffered_events_mixin.exit_callback()
     assert len(buffered_events_mixin._events_buffer) == 0
     buffered_events_mixin.process_buffered_events.assert_called_once_with([event])
+
+
+def test_exit_callback_waits_for_flush_in_progress(buffered_events_mixin, event):
+    release = threading.Event()
+    processed = []
+
+    def process_buffered_events(events):
+        release.wait(5)
+        processed.append(events)
+
+    buffered_events_mixin.process_buffered_events.side_effect = process_buffered_events
+    buffered_events_mixin.on_journal_event(event)
+    flush_thread = threading.Thread(target=buffered_events_mixin.buffer_flush_callback)
+    flush_thread.start()
+    time.sleep(0.1)
+
+    buffered_events_mixin.on_journal_event(event)
+    exit_thread = threading.Thread(target=buffered_events_mixin.exit_callback)
+    exit_thread.start()
+    time.sleep(0.1)
+    assert len(processed) == 0  # exit flush waits for scheduled flush
+
+    release.set()
+    flush_thread.join(5)
+    exit_thread.join(5)
+    assert processed == [[event], [event]]
+
+
+def test_buffer_flush_callback_next_run_hint(buffered_events_mixin, event):
+    assert buffered_events_mixin.buffer_flush_callback() == plugins_helpers.IDLE_FLUSH_INTERVAL
+    buffered_events_mixin.on_journal_event(event)
+    assert buffered_events_mixin.buffer_flush_callback() is None
+
+
+def test_on_journal_event_wakes_flush(buffered_events_mixin, event):
+    buffered_events_mixin.buffer_flush_size = 3
+    with mock.patch('edp.plugins.wake_scheduled') as wake_scheduled:
+        for _ in range(4):
+            buffered_events_mixin.on_journal_event(event)
+
+    assert wake_scheduled.call_args_list == [
+        mock.call(buffered_events_mixin.buffer_flush_callback, plugins_helpers.FLUSH_INTERVAL),
+        mock.call(buffered_events_mixin.buffer_flush_callback),
+    ]
+
+
+def test_buffer_flush_callback_retry_later(buffered_events_mixin):
+    events = [TestEvent().example() for _ in range(3)]
+
+    def process_buffered_events(processed):
+        raise plugins_helpers.RetryLater(processed[1:])
+
+    buffered_events_mixin.process_buffered_events.side_effect = process_buffered_events
+    for event in events[:2]:
+        buffered_events_mixin.on_journal_event(event)
+
+    with pytest.raises(plugins_helpers.RetryLater):
+        buffered_events_mixin.buffer_flush_callback()
+    buffered_events_mixin.on_journal_event(events[2])
+    assert buffered_events_mixin._events_buffer == events[1:]
+
+    buffered_events_mixin.exit_callback()  # failed exit flush is logged
+
+
+def test_on_journal_event_no_wake_while_flush_fails(buffered_events_mixin, event):
+    buffered_events_mixin.buffer_flush_size = 2
+    with mock.patch('edp.plugins.wake_scheduled') as wake_scheduled, \
+            mock.patch('edp.plugins.get_scheduled_job', return_value=mock.MagicMock(failures=1)):
+        for _ in range(2):
+            buffered_events_mixin.on_journal_event(event)
+
+    wake_scheduled.assert_called_once_with(buffered_events_mixin.buffer_flush_callback, plugins_helpers.FLUSH_INTERVAL)
+
+
+def test_buffer_max_size_drops_oldest(buffered_events_mixin):
+    events = [TestEvent().example() for _ in range(5)]
+    buffered_events_mixin.buffer_max_size = 3
+
+    def process_buffered_events(processed):
+        raise plugins_helpers.RetryLater(processed)
+
+    buffered_events_mixin.process_buffered_events.side_effect = process_buffered_events
+    for event in events[:2]:
+        buffered_events_mixin.on_journal_event(event)
+    with pytest.raises(plugins_helpers.RetryLater):
+        buffered_events_mixin.buffer_flush_callback()
+
+    with mock.patch.object(plugins_helpers.logger, 'warning') as warning_mock:
+        for event in events[2:]:
+            buffered_events_mixin.on_journal_event(event)
+    assert buffered_events_mixin._events_buffer == events[2:]
+    warning_mock.assert_called_once()
+
+    buffered_events_mixin.process_buffered_events.side_effect = None
+    buffered_events_mixin.buffer_flush_callback()
+    buffered_events_mixin.process_buffered_events.assert_called_with(events[2:])
+    assert buffered_events_mixin._events_dropped == 0
@@ -1,3 +1,4 @@
+import copy
 import dataclasses
 import pytest
 from dpcontracts import PreconditionError
@@ -141,3 +142,23 @@ def test_material_storage_shortcut_access(category):
     storage = entities.MaterialStorage()
     storage[category]['test'] = 5
     assert getattr(storage, category)['test'] == 5
+
+
+def test_entity_frozen_copy():
+    location = entities.Location(system='Sol')
+    location.station.services.append('dock')
+
+    frozen = location.frozen_copy()
+
+    assert frozen.is_frozen and not location.is_frozen
+    assert frozen == location
+    assert copy.deepcopy(frozen) is frozen
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.system = 'Achenar'
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.station.name = 'Abraham Lincoln'
+    with pytest.raises(TypeError):
+        frozen.station.services.append('repair')
+
+    location.system = 'Achenar'
+    assert frozen.system == 'Sol'
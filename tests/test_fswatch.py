@@ -0,0 +1,56 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from edp.utils import fswatch
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is linux only')
+
+
+@linux_only
+def test_get_directory_watcher(tempdir):
+    with fswatch.get_directory_watcher(tempdir) as watcher:
+        assert isinstance(watcher, fswatch.InotifyDirectoryWatcher)
+
+
+def test_get_directory_watcher_not_exists(tempdir):
+    assert fswatch.get_directory_watcher(tempdir / 'foo') is None
+
+
+@linux_only
+def test_inotify_watcher_timeout(tempdir):
+    with fswatch.InotifyDirectoryWatcher(tempdir) as watcher:
+        start = time.monotonic()
+        assert watcher.wait(0.2) == set()
+        assert time.monotonic() - start >= 0.2
+
+
+@linux_only
+def test_inotify_watcher_file_created(tempdir):
+    with fswatch.InotifyDirectoryWatcher(tempdir) as watcher:
+        (tempdir / 'Status.json').write_text('{}')
+        assert 'Status.json' in watcher.wait(1)
+
+
+@linux_only
+def test_inotify_watcher_wakes_up(tempdir):
+    path = tempdir / 'Journal.test.log'
+    path.write_text('')
+
+    with fswatch.InotifyDirectoryWatcher(tempdir) as watcher:
+        timer = threading.Timer(0.2, lambda: path.write_text('foo'))
+        timer.start()
+        start = time.monotonic()
+        assert watcher.wait(5) == {'Journal.test.log'}
+        assert time.monotonic() - start < 2
+
+
+@linux_only
+def test_inotify_watcher_closed(tempdir):
+    watcher = fswatch.InotifyDirectoryWatcher(tempdir)
+    watcher.close()
+
+    with pytest.raises(ValueError):
+        watcher.wait(0.1)
@@ -86,3 +86,16 @@ def test_on_journal_event_state_not_changed(plugin):
         plugin.on_journal_event(event)
 
     signal_mock.emit.assert_not_called()
+
+
+def test_state_snapshot_shared_until_changed(plugin):
+    state = plugin.state
+
+    assert state.is_frozen
+    assert plugin.state is state
+
+    event = journal.Event(datetime.datetime.now(), 'Commander', {'Name': 'test', 'FID': '1'}, '{}')
+    plugin.update_state(event)
+
+    assert plugin.state is not state
+    assert plugin.state.commander.name == 'test'
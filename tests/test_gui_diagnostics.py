@@ -0,0 +1,54 @@
+import time
+from unittest import mock
+
+from edp import signalslib, thread
+from edp.gui.components.diagnostics import SignalDiagnosticsComponent, ThreadDiagnosticsComponent
+
+
+def test_signal_diagnostics_update_view():
+    manager = signalslib.SignalManager()
+    signal = signalslib.Signal('test')
+
+    @signal.bind
+    def callback():
+        time.sleep(0.01)
+
+    with mock.patch('edp.signalslib.signal_manager', manager):
+        signal.emit_eager()
+
+    component = SignalDiagnosticsComponent()
+    component.update_view(manager)
+
+    assert 'test: 1 emits, 1 calls' in component.signals_label.text()
+    assert component.callbacks_table.rowCount() == 1
+    assert component.callbacks_table.item(0, 0).text() == callback.__qualname__
+    assert component.slowest_list.count() == 1
+
+
+def test_thread_diagnostics_update_view():
+    thread_manager = thread.ThreadManager()
+    interval_thread = thread.IntervalRunnerThread(lambda: None, interval=10, name='interval')
+    thread_manager.add_thread(interval_thread)
+    scheduler = thread.Scheduler()
+    job = scheduler.add_job(lambda: None, interval=10, name='job')
+    job.runs, job.last_duration = 1, 0.002
+
+    component = ThreadDiagnosticsComponent()
+    with thread_manager:
+        time.sleep(0.1)
+        component.update_view(thread_manager, scheduler)
+        component.update_view(thread_manager, scheduler)
+
+    assert component.threads_table.rowCount() == 1
+    assert [component.threads_table.item(0, column).text() for column in range(4)] == ['interval', 'idle', '', '1']
+    assert component.jobs_table.rowCount() == 1
+    assert [component.jobs_table.item(0, column).text() for column in range(4)] == ['job', '1', '0', '2.0']
+
+
+def test_thread_diagnostics_cpu_columns_hidden():
+    with mock.patch('edp.thread.has_thread_cpu_time', return_value=False):
+        component = ThreadDiagnosticsComponent()
+
+    assert [column for column in range(component.threads_table.columnCount())
+            if component.threads_table.isColumnHidden(column)] == [5, 6]
+    assert component.jobs_table.isColumnHidden(4)
@@ -0,0 +1,68 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from edp.utils.immutable import FrozenDict, FrozenList, OverlayDict, freeze
+
+
+def test_freeze_recursive():
+    data = freeze({'foo': [{'bar': 1}], 'baz': ({'qux': []},)})
+
+    assert isinstance(data, FrozenDict)
+    assert isinstance(data['foo'], FrozenList)
+    assert isinstance(data['foo'][0], FrozenDict)
+    assert isinstance(data['baz'][0]['qux'], FrozenList)
+    assert data == {'foo': [{'bar': 1}], 'baz': ({'qux': []},)}
+    assert freeze(data) is data
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda d: d.__setitem__('foo', 1),
+    lambda d: d.__delitem__('foo'),
+    lambda d: d.update(foo=1),
+    lambda d: d.pop('foo'),
+    lambda d: d.setdefault('bar', 1),
+    lambda d: d.clear(),
+    lambda d: d['foo'].append(1),
+    lambda d: d['foo'].__setitem__(0, 1),
+    lambda d: d['foo'].extend([1]),
+    lambda d: d['foo'].sort(),
+])
+def test_frozen_mutation(mutate):
+    data = freeze({'foo': [3, 2]})
+
+    with pytest.raises(TypeError):
+        mutate(data)
+    assert data == {'foo': [3, 2]}
+
+
+def test_frozen_copy_and_serialize():
+    data = freeze({'foo': [{'bar': 1}]})
+
+    assert copy.copy(data) is data
+    assert copy.deepcopy(data) is data
+    assert json.loads(json.dumps(data)) == data
+    assert pickle.loads(pickle.dumps(data)) == data
+    assert isinstance(pickle.loads(pickle.dumps(data))['foo'], FrozenList)
+
+
+def test_overlay_dict():
+    base = freeze({'foo': 1, 'bar': 2, 'baz': 3})
+    overlay = OverlayDict(base, {'qux': 4})
+
+    overlay['foo'] = 10
+    del overlay['bar']
+    overlay.drop('baz', 'missing')
+
+    assert overlay == {'foo': 10, 'qux': 4}
+    assert list(overlay) == ['foo', 'qux']
+    assert 'bar' not in overlay and len(overlay) == 2
+    assert base == {'foo': 1, 'bar': 2, 'baz': 3}
+
+    overlay['bar'] = 20
+    assert overlay.to_dict() == {'foo': 10, 'bar': 20, 'qux': 4}
+
+    with pytest.raises(KeyError):
+        del overlay['missing']
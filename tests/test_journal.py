@@ -1,6 +1,8 @@
+import copy
 import datetime
 import json
 import pathlib
+import pickle
 import time
 from typing import List, Union, Dict
 from unittest import mock
@@ -10,7 +12,7 @@ from hypothesis import strategies, given
 
 from edp import journal
 from edp.journal import Event
-from edp.utils import hypothesis_strategies
+from edp.utils import hypothesis_strategies, to_ed_timestamp
 
 TEST_EVENT_1 = ('{"timestamp": "2018-06-07T08:09:10Z", "event": "test 1", "foo": "bar"}',
                 Event(datetime.datetime(2018, 6, 7, 8, 9, 10), 'test 1',
@@ -223,12 +225,14 @@ def test_journal_live_event_thread_no_files(journal_live_event_thread, journal_e
 def test_journal_live_event_thread_file_appeared(journal_live_event_thread, tempdir, journal_event_signal_mock):
     event_line, event = TEST_EVENT_1
 
-    with journal_live_event_thread:
+    with journal_live_event_thread, \
+            mock.patch('edp.journal.journal_file_opened_signal') as journal_file_opened_signal_mock:
         time.sleep(0.5)
         (tempdir / 'Journal.test.log').write_text(event_line)
         time.sleep(0.5)
 
     journal_event_signal_mock.emit.assert_called_once_with(event=event)
+    journal_file_opened_signal_mock.emit.assert_called_once_with(path=tempdir / 'Journal.test.log')
 
 
 def test_journal_live_event_skip_existing_file_content(journal_live_event_thread, tempdir, journal_event_signal_mock):
@@ -243,24 +247,24 @@ def test_journal_live_event_skip_existing_file_content(journal_live_event_thread
 
 
 def test_get_file_event_path_not_exists(tempdir, journal_reader):
-    assert journal_reader._get_file_event(tempdir / 'foo.json') is None
+    assert journal_reader._get_file_event_filtered(tempdir / 'foo.json') is None
 
 
 def test_get_file_event_bad_content(tempdir, journal_reader):
     path = tempdir / 'test.json'
     path.write_text('{foo: bar}')
 
-    assert journal_reader._get_file_event(path) is None
+    assert journal_reader._get_file_event_filtered(path) is None
+    assert journal_reader._file_event_timestamp == {}
 
 
 def test_get_file_event_parsed(tempdir, journal_reader):
     path = tempdir / 'test.json'
-    path.write_text(
-        '{"event": "test", "timestamp": "%s"}' % (datetime.datetime.now().isoformat(timespec='seconds') + 'Z'))
+    path.write_text('{"event": "test", "timestamp": "2018-06-07T08:09:10Z"}')
 
-    event = journal_reader._get_file_event(path)
-    assert event is not None
-    assert event.name == 'test'
+    # first event of file is only remembered, later events are returned if they are newer
+    assert journal_reader._get_file_event_filtered(path) is None
+    assert journal_reader._file_event_timestamp == {'test': datetime.datetime(2018, 6, 7, 8, 9, 10)}
 
 
 def test_filter_file_event_first_time(journal_reader):
@@ -300,3 +304,433 @@ def test_get_game_version_info(journal_reader, fields):
     assert game_version is not None
     assert game_version.version is not None
     assert game_version.build is not None
+
+
+def test_journal_live_event_thread_polling(journal_reader, tempdir, journal_event_signal_mock):
+    event_line, event = TEST_EVENT_1
+    thread = journal.JournalLiveEventThread(journal_reader, use_watcher=False)
+    thread.interval = 0.1
+
+    with thread:
+        time.sleep(0.5)
+        (tempdir / 'Journal.test.log').write_text(event_line)
+        time.sleep(0.5)
+
+    journal_event_signal_mock.emit.assert_called_once_with(event=event)
+
+
+def test_journal_live_event_thread_poll_interval(journal_live_event_thread):
+    thread = journal_live_event_thread
+    thread.idle_interval = 10
+
+    assert thread.get_poll_interval() == thread.interval
+
+    thread.register_activity(Event(datetime.datetime.now(), 'Shutdown', {}, '{}'))
+    assert thread.get_poll_interval() == thread.idle_interval
+
+    thread.register_activity(Event(datetime.datetime.now(), 'Fileheader', {}, '{}'))
+    assert thread.get_poll_interval() == thread.interval
+
+
+def test_journal_live_event_thread_poll_interval_idle(journal_live_event_thread):
+    thread = journal_live_event_thread
+    thread.idle_timeout = 60
+
+    with mock.patch('edp.journal.time.monotonic', return_value=time.monotonic() + 61):
+        assert thread.get_poll_interval() == thread.idle_interval
+
+
+@pytest.fixture()
+def journal_file_tailer():
+    tailer = journal.JournalFileTailer()
+    yield tailer
+    tailer.close()
+
+
+def test_journal_file_tailer_not_opened(journal_file_tailer):
+    assert journal_file_tailer.read_lines() == []
+
+
+def test_journal_file_tailer_read_appended(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    path.write_text(TEST_EVENT_1[0] + '\r\n')
+
+    journal_file_tailer.open(path)
+    assert journal_file_tailer.read_lines() == [TEST_EVENT_1[0]]
+    assert journal_file_tailer.read_lines() == []
+
+    append_line(path, TEST_EVENT_2[0] + '\r\n' + TEST_EVENT_3[0] + '\r\n')
+    assert journal_file_tailer.read_lines() == [TEST_EVENT_2[0], TEST_EVENT_3[0]]
+    assert journal_file_tailer.position == path.stat().st_size
+
+
+def test_journal_file_tailer_from_position(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    path.write_text(TEST_EVENT_1[0] + '\n')
+
+    journal_file_tailer.open(path, journal.get_file_end_pos(path))
+    append_line(path, TEST_EVENT_2[0] + '\n')
+
+    assert journal_file_tailer.read_lines() == [TEST_EVENT_2[0]]
+
+
+def test_journal_file_tailer_partial_line(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    line = TEST_EVENT_1[0]
+    path.write_text(line[:20])
+
+    journal_file_tailer.open(path)
+    assert journal_file_tailer.read_lines() == []
+    assert journal_file_tailer.position == 0
+
+    append_line(path, line[20:] + '\r\n' + TEST_EVENT_2[0][:10])
+    assert journal_file_tailer.read_lines() == [line]
+
+    append_line(path, TEST_EVENT_2[0][10:] + '\r\n')
+    assert journal_file_tailer.read_lines() == [TEST_EVENT_2[0]]
+
+
+def test_journal_file_tailer_unterminated_line_not_decoded(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    line = '{"timestamp": "2018-06-07T08:09:10Z", "event": "test", "foo": {"bar": "}"}}'
+    path.write_text(line[:-1])
+
+    journal_file_tailer.open(path)
+    with mock.patch('edp.utils.json_backend.loads') as loads_mock:
+        assert journal_file_tailer.read_lines() == []
+        append_line(path, line[-1:])
+        assert journal_file_tailer.read_lines() == [line]
+    loads_mock.assert_not_called()
+
+
+def test_journal_file_tailer_split_multibyte(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    line = '{"timestamp": "2018-06-07T08:09:10Z", "event": "test", "foo": "Привет"}'
+    data = (line + '\n').encode('utf-8')
+    split = data.index('"Привет"'.encode('utf-8')) + 2
+
+    path.write_bytes(data[:split])
+    journal_file_tailer.open(path)
+    assert journal_file_tailer.read_lines() == []
+
+    with path.open('ab') as f:
+        f.write(data[split:])
+    assert journal_file_tailer.read_lines() == [line]
+
+
+def test_journal_file_tailer_truncated(tempdir, journal_file_tailer):
+    path = tempdir / 'Journal.test.log'
+    path.write_text(TEST_EVENT_1[0] + '\n' + TEST_EVENT_2[0] + '\n')
+
+    journal_file_tailer.open(path)
+    assert len(journal_file_tailer.read_lines()) == 2
+
+    path.write_text(TEST_EVENT_3[0] + '\n')
+    assert journal_file_tailer.read_lines() == [TEST_EVENT_3[0]]
+
+
+def test_journal_live_event_thread_partial_line(journal_live_event_thread, tempdir, journal_event_signal_mock):
+    path = tempdir / 'Journal.test.log'
+    path.write_text('')
+    event_line, event = TEST_EVENT_1
+
+    with journal_live_event_thread:
+        time.sleep(0.3)
+        append_line(path, event_line[:20])
+        time.sleep(0.3)
+        journal_event_signal_mock.emit.assert_not_called()
+        append_line(path, event_line[20:] + '\r\n')
+        time.sleep(0.3)
+
+    journal_event_signal_mock.emit.assert_called_once_with(event=event)
+
+
+@pytest.mark.parametrize(('name', 'key'), [
+    ('Journal.190106175956.01.log', (datetime.datetime(2019, 1, 6, 17, 59, 56), 1)),
+    ('Journal.2022-11-27T123456.02.log', (datetime.datetime(2022, 11, 27, 12, 34, 56), 2)),
+])
+def test_get_journal_file_sort_key(name, key):
+    assert journal.get_journal_file_sort_key(pathlib.Path(name)) == key
+
+
+def test_journal_directory_index_order(tempdir):
+    names = ['Journal.190106175956.02.log', 'Journal.190106175956.01.log',
+             'Journal.2022-11-27T123456.01.log', 'Journal.181231235959.01.log']
+    for name in names:
+        (tempdir / name).write_text('')
+    (tempdir / 'Status.json').write_text('')
+
+    index = journal.JournalDirectoryIndex(tempdir)
+
+    assert [p.name for p in index.get_files()] == [
+        'Journal.181231235959.01.log', 'Journal.190106175956.01.log',
+        'Journal.190106175956.02.log', 'Journal.2022-11-27T123456.01.log',
+    ]
+    assert index.get_latest_file().name == 'Journal.2022-11-27T123456.01.log'
+
+
+def test_journal_directory_index_cached(tempdir):
+    (tempdir / 'Journal.190106175956.01.log').write_text('')
+    index = journal.JournalDirectoryIndex(tempdir)
+    index.racy_interval = 0
+
+    with mock.patch.object(index, '_scan', wraps=index._scan) as scan_mock:
+        index.get_files()
+        index.get_files()
+        assert scan_mock.call_count == 1
+
+        index.invalidate()
+        index.get_files()
+        assert scan_mock.call_count == 2
+
+
+def test_journal_directory_index_new_file(tempdir):
+    (tempdir / 'Journal.190106175956.01.log').write_text('')
+    index = journal.JournalDirectoryIndex(tempdir)
+
+    assert index.get_latest_file().name == 'Journal.190106175956.01.log'
+    assert index.is_known('Journal.190106175956.01.log')
+
+    (tempdir / 'Journal.190107175956.01.log').write_text('')
+
+    assert index.get_latest_file().name == 'Journal.190107175956.01.log'
+
+
+def test_journal_live_event_thread_on_files_changed(journal_live_event_thread, journal_reader, tempdir):
+    (tempdir / 'Journal.190106175956.01.log').write_text('')
+    journal_reader.get_latest_file()
+
+    with mock.patch.object(journal_reader.file_index, 'invalidate') as invalidate_mock:
+        journal_live_event_thread.on_files_changed({'Journal.190106175956.01.log', 'Status.json'})
+        invalidate_mock.assert_not_called()
+
+        journal_live_event_thread.on_files_changed({'Journal.190106175956.02.log'})
+        invalidate_mock.assert_called_once_with()
+
+
+def write_status_event(path: pathlib.Path, dt: datetime.datetime, **fields):
+    path.write_text(json.dumps({'timestamp': to_ed_timestamp(dt), 'event': 'Status', **fields}))
+
+
+def test_peek_event_header():
+    assert journal.peek_event_header(TEST_EVENT_1[0]) == ('test 1', '2018-06-07T08:09:10Z')
+    assert journal.peek_event_header('{ "timestamp":"2018-06-07T08:09:10Z", "event":"Status" }') == \
+        ('Status', '2018-06-07T08:09:10Z')
+    assert journal.peek_event_header('{"event": "test", "timestamp": "2018-06-07T08:09:10Z"}') is None
+    assert journal.peek_event_header('') is None
+
+
+def test_has_event_subscribers():
+    signal = journal.journal_event_signal
+
+    with mock.patch.object(signal, 'callbacks', []):
+        assert not journal.has_event_subscribers('Market')
+
+        signal.bind_nonstrict(journal.handles_events({'Status'})(lambda event: None))
+        assert journal.has_event_subscribers('Status')
+        assert not journal.has_event_subscribers('Market')
+
+        signal.bind_nonstrict(lambda event: None)
+        assert journal.has_event_subscribers('Market')
+
+
+def test_has_event_subscribers_journal_file_events():
+    signal = journal.journal_event_signal
+
+    with mock.patch.object(signal, 'callbacks', []):
+        signal.bind_nonstrict(journal.handles_events(journal.JOURNAL_FILE_EVENTS)(lambda event: None))
+        assert journal.has_event_subscribers('Market')
+        assert not journal.has_event_subscribers('Status')
+
+
+def test_journal_event_signal_routed_by_event_name():
+    signal = journal.journal_event_signal
+    status = journal.Event(datetime.datetime.now(), 'Status', {}, '{}')
+    music = journal.Event(datetime.datetime.now(), 'Music', {}, '{}')
+
+    with mock.patch.object(signal, 'callbacks', []):
+        callback = signal.bind_nonstrict(journal.handles_events({'Status'})(lambda event: None))
+
+        assert signal.get_callbacks({'event': status}) == [callback]
+        assert signal.get_callbacks({'event': music}) == []
+
+
+def test_companion_file_event_unchanged_not_read(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 10))
+
+    assert journal_reader.get_status_file_event() is None
+
+    with mock.patch('edp.journal.process_event') as process_event_mock:
+        assert journal_reader.get_status_file_event() is None
+    process_event_mock.assert_not_called()
+
+
+def test_companion_file_event_same_timestamp_not_decoded(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    dt = datetime.datetime(2018, 6, 7, 8, 9, 10)
+    write_status_event(path, dt)
+    assert journal_reader.get_status_file_event() is None
+
+    write_status_event(path, dt, Flags=1)
+    with mock.patch('edp.journal.json_backend') as json_backend_mock:
+        assert journal_reader.get_status_file_event() is None
+    assert not json_backend_mock.mock_calls
+
+
+def test_companion_file_event_newer(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 10))
+    assert journal_reader.get_status_file_event() is None
+
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 11), Flags=1)
+    event = journal_reader.get_status_file_event()
+
+    assert event is not None
+    assert event.name == 'Status'
+    assert not event.is_decoded
+    assert event.data['Flags'] == 1
+
+
+def test_companion_file_event_partially_written(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 10))
+    assert journal_reader.get_status_file_event() is None
+
+    line = json.dumps({'timestamp': to_ed_timestamp(datetime.datetime(2018, 6, 7, 8, 9, 11)), 'event': 'Status'})
+    path.write_text(line[:-5])
+    assert journal_reader.get_status_file_event() is None
+
+    path.write_text(line)
+    assert journal_reader.get_status_file_event() is not None
+
+
+def test_companion_file_event_truncated_after_header(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 10))
+    assert journal_reader.get_status_file_event() is None
+
+    dt = datetime.datetime(2018, 6, 7, 8, 9, 11)
+    line = json.dumps({'timestamp': to_ed_timestamp(dt), 'event': 'Status', 'Flags': 1, 'Pips': [4, 4, 4]})
+    path.write_text(line[:line.index('"Pips"')])
+    assert journal.peek_event_header(path.read_text()) is not None
+    assert journal_reader.get_status_file_event() is None
+
+    path.write_text(line)
+    event = journal_reader.get_status_file_event()
+    assert event is not None
+    assert event.data['Flags'] == 1
+    assert event.data['Pips'] == [4, 4, 4]
+
+
+def test_companion_file_event_read_error_retried(tempdir, journal_reader):
+    path = tempdir / 'Status.json'
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 10))
+    assert journal_reader.get_status_file_event() is None
+
+    write_status_event(path, datetime.datetime(2018, 6, 7, 8, 9, 11), Flags=1)
+    with mock.patch.object(pathlib.Path, 'open', side_effect=PermissionError):
+        assert journal_reader.get_status_file_event() is None
+
+    event = journal_reader.get_status_file_event()
+    assert event is not None
+    assert event.data['Flags'] == 1
+
+
+def test_read_status_files_no_subscribers(journal_live_event_thread, journal_reader, journal_event_signal_mock):
+    with mock.patch('edp.journal.has_event_subscribers', return_value=False), \
+            mock.patch.object(journal_reader, 'get_companion_file_event') as get_event_mock:
+        journal_live_event_thread.read_status_files()
+
+    get_event_mock.assert_not_called()
+
+
+def test_read_status_files(journal_live_event_thread, journal_reader, journal_event_signal_mock):
+    event = Event(datetime.datetime.now(), 'Status', {}, '{}')
+
+    with mock.patch('edp.journal.has_event_subscribers', side_effect=lambda name: name == 'Status'), \
+            mock.patch.object(journal_reader, 'get_companion_file_event', return_value=event) as get_event_mock:
+        journal_live_event_thread.read_status_files()
+
+    get_event_mock.assert_called_once_with('Status')
+    journal_event_signal_mock.emit.assert_called_once_with(event=event)
+
+
+def test_process_event_lazy():
+    event_line, expected = TEST_EVENT_1
+    event = journal.process_event(event_line)
+
+    assert event.name == 'test 1'
+    assert event.timestamp == expected.timestamp
+    assert not event.is_decoded
+
+    assert event.data == expected.data
+    assert event.is_decoded
+    assert event == expected
+
+
+def test_event_copy_is_shared():
+    event = journal.process_event(TEST_EVENT_1[0])
+
+    assert copy.deepcopy(event) is event
+    assert copy.copy(event) is event
+    assert not event.is_decoded
+
+
+def test_event_data_immutable():
+    event = journal.Event(datetime.datetime.now(), 'test', {'foo': {'bar': [1]}}, '{}')
+
+    with pytest.raises(TypeError):
+        event.data['foo'] = 1
+    with pytest.raises(TypeError):
+        event.data['foo']['bar'].append(2)
+    assert event.data == {'foo': {'bar': [1]}}
+
+
+def test_event_attributes_immutable():
+    event = journal.process_event(TEST_EVENT_1[0])
+
+    with pytest.raises(AttributeError):
+        event.name = 'other'
+    with pytest.raises(AttributeError):
+        event.timestamp = datetime.datetime.now()
+    with pytest.raises(AttributeError):
+        del event.raw
+    with pytest.raises(AttributeError):
+        event.foo = 1
+
+    assert event.name == 'test 1'
+    assert event.data == TEST_EVENT_1[1].data
+    assert event.is_decoded
+
+
+def test_event_pickle():
+    event = journal.process_event(TEST_EVENT_1[0])
+
+    assert pickle.loads(pickle.dumps(event)) == event
+
+
+def test_event_namedtuple_interface():
+    event = journal.process_event(TEST_EVENT_1[0])
+
+    timestamp, name, data, raw = event
+    assert (timestamp, name, data, raw) == (event.timestamp, event.name, event.data, event.raw)
+
+    replaced = event._replace(name='test 2')
+    assert replaced.name == 'test 2'
+    assert replaced.raw == event.raw
+
+
+def test_event_bad_data():
+    event = journal.process_event('{"timestamp": "2018-06-07T08:09:10Z", "event": "test", "foo": }')
+
+    assert event.data == {'timestamp': '2018-06-07T08:09:10Z', 'event': 'test'}
+
+
+def test_process_events():
+    lines = [TEST_EVENT_1[0], 'invalid event here', '{"event": "test"}', '', TEST_EVENT_2[0], '[1, 2]']
+
+    events = list(journal.process_events(lines))
+
+    assert events == [TEST_EVENT_1[1], TEST_EVENT_2[1]]
+    assert all(event.is_decoded for event in events)
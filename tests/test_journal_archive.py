@@ -0,0 +1,241 @@
+import concurrent.futures
+import datetime
+import json
+import shutil
+from unittest import mock
+
+import pytest
+
+from edp import journal_archive
+from edp.utils import to_ed_timestamp
+
+
+def make_line(dt: datetime.datetime, name: str, **fields) -> str:
+    return json.dumps({'timestamp': to_ed_timestamp(dt), 'event': name, **fields}) + '\r\n'
+
+
+DT = datetime.datetime(2019, 1, 6, 18, 0, 0)
+
+
+@pytest.fixture()
+def journal_dir(tempdir):
+    path = tempdir / 'journal'
+    path.mkdir()
+    return path
+
+
+@pytest.fixture()
+def archive(tempdir, journal_dir):
+    with journal_archive.JournalArchive(tempdir / 'archive.sqlite3', journal_dir) as archive:
+        yield archive
+
+
+def test_parse_record():
+    line = make_line(DT, 'Docked', MarketID=128666762, SystemAddress=5031721931482).encode()
+    record = journal_archive.parse_record(line, 10)
+
+    assert record == journal_archive.EventRecord(10, len(line), '2019-01-06T18:00:00Z', 'Docked',
+                                                 5031721931482, 128666762)
+
+
+def test_parse_record_not_ordered_fields():
+    line = b'{"event": "Docked", "timestamp": "2019-01-06T18:00:00Z", "MarketID": 1}\n'
+    record = journal_archive.parse_record(line, 0)
+
+    assert record.name == 'Docked'
+    assert record.market_id == 1
+    assert record.system_address is None
+
+
+@pytest.mark.parametrize('line', [b'\r\n', b'foo\n', b'{"event": "test"}\n', b'\xff\xfe\n'])
+def test_parse_record_invalid(line):
+    assert journal_archive.parse_record(line, 0) is None
+
+
+def test_parse_records_partial_line():
+    data = (make_line(DT, 'Test1') + make_line(DT, 'Test2') + '{"timestamp": ').encode()
+
+    records, consumed = journal_archive.parse_records(data, 100)
+
+    assert [r.name for r in records] == ['Test1', 'Test2']
+    assert records[1].offset == 100 + records[0].length
+    assert consumed == data.rfind(b'\n') + 1
+
+
+def test_archive_query(archive, journal_dir):
+    (journal_dir / 'Journal.190106175956.01.log').write_text(
+        make_line(DT, 'Fileheader') +
+        make_line(DT + datetime.timedelta(minutes=1), 'FSDJump', SystemAddress=1, StarSystem='Sol') +
+        make_line(DT + datetime.timedelta(minutes=2), 'Loadout', Ship='sidewinder') +
+        make_line(DT + datetime.timedelta(minutes=3), 'FSDJump', SystemAddress=2, StarSystem='Achenar')
+    )
+    (journal_dir / 'Journal.190107175956.01.log').write_text(
+        make_line(DT + datetime.timedelta(days=1), 'Loadout', Ship='anaconda') +
+        make_line(DT + datetime.timedelta(days=1, minutes=1), 'Docked', MarketID=10, SystemAddress=2)
+    )
+
+    assert archive.update() == 6
+    assert archive.update() == 0
+
+    jumps = list(archive.get_events('FSDJump'))
+    assert [e.data['StarSystem'] for e in jumps] == ['Sol', 'Achenar']
+
+    jumps = list(archive.get_events('FSDJump', start=DT + datetime.timedelta(minutes=2)))
+    assert [e.data['StarSystem'] for e in jumps] == ['Achenar']
+
+    assert archive.get_last_event('Loadout').data['Ship'] == 'anaconda'
+    assert archive.get_last_event('Loadout', before=DT + datetime.timedelta(days=1)).data['Ship'] == 'sidewinder'
+    assert archive.get_last_event('Shutdown') is None
+
+    assert [e.name for e in archive.get_events(system_address=2)] == ['FSDJump', 'Docked']
+    assert [e.name for e in archive.get_events(market_id=10)] == ['Docked']
+    assert len(archive.find()) == 6
+    assert len(archive.find('FSDJump', 'Loadout', limit=3)) == 3
+
+
+def test_archive_incremental(archive, journal_dir):
+    path = journal_dir / 'Journal.190106175956.01.log'
+    path.write_text(make_line(DT, 'Fileheader'))
+    assert archive.update() == 1
+
+    with path.open('a') as f:
+        f.write(make_line(DT, 'Music') + '{"timestamp": "2019-01-06T18:00:00Z", ')
+    assert archive.update() == 1
+
+    with path.open('a') as f:
+        f.write('"event": "Shutdown"}\r\n')
+    assert archive.update() == 1
+
+    assert archive.get_last_event('Shutdown') is not None
+    assert archive.get_indexed_size(path.name) == path.stat().st_size
+
+
+def test_archive_live_file(archive, journal_dir):
+    path1 = journal_dir / 'Journal.190106175956.01.log'
+    path1.write_text(make_line(DT, 'Fileheader'))
+    archive.on_journal_file_opened(path1)
+    assert archive.get_indexed_size(path1.name) == path1.stat().st_size
+
+    with path1.open('a') as f:
+        f.write(make_line(DT, 'Music'))
+    assert [e.name for e in archive.get_events()] == ['Fileheader', 'Music']
+
+    with path1.open('a') as f:
+        f.write(make_line(DT, 'Shutdown'))
+    path2 = journal_dir / 'Journal.190107175956.01.log'
+    path2.write_text(make_line(DT + datetime.timedelta(days=1), 'Fileheader'))
+    archive.on_journal_file_opened(path2)
+
+    with mock.patch.object(archive, 'update_file', wraps=archive.update_file) as update_file_mock:
+        assert [e.name for e in archive.get_events()] == ['Fileheader', 'Music', 'Shutdown', 'Fileheader']
+    update_file_mock.assert_called_once_with(path2)
+
+
+def test_archive_reindex_shrunk_file(archive, journal_dir):
+    path = journal_dir / 'Journal.190106175956.01.log'
+    path.write_text(make_line(DT, 'Fileheader') + make_line(DT, 'Music'))
+    assert archive.update() == 2
+
+    path.write_text(make_line(DT, 'Shutdown'))
+    assert archive.update() == 1
+
+    assert [e.name for e in archive.get_events()] == ['Shutdown']
+
+
+def test_archive_persistent(tempdir, journal_dir):
+    path = journal_dir / 'Journal.190106175956.01.log'
+    path.write_text(make_line(DT, 'Fileheader'))
+
+    with journal_archive.JournalArchive(tempdir / 'archive.sqlite3', journal_dir) as archive:
+        assert archive.update() == 1
+
+    with journal_archive.JournalArchive(tempdir / 'archive.sqlite3', journal_dir) as archive:
+        assert archive.update() == 0
+        assert len(archive.find()) == 1
+
+
+def test_archive_random_journal(archive, journal_dir, random_journal_dir):
+    for path in random_journal_dir.iterdir():
+        shutil.copy(str(path), str(journal_dir))
+
+    assert archive.update() > 0
+
+    events = list(archive.get_events())
+    assert len(events) == len(archive.find())
+    assert all(event.data['event'] == event.name for event in events)
+
+
+def write_journal_files(journal_dir, count: int = 5):
+    for i in range(count):
+        dt = DT + datetime.timedelta(days=i)
+        (journal_dir / f'Journal.{dt:%y%m%d%H%M%S}.01.log').write_text(
+            make_line(dt, 'Fileheader', part=1) +
+            make_line(dt + datetime.timedelta(minutes=1), 'FSDJump', SystemAddress=i) +
+            make_line(dt + datetime.timedelta(minutes=2), 'Shutdown')
+        )
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_bulk_import(archive, journal_dir, workers):
+    write_journal_files(journal_dir)
+    progress = []
+
+    importer = journal_archive.JournalBulkImporter(archive, workers=workers, progress=progress.append)
+    assert importer.run() == 15
+
+    assert [p.files_done for p in progress] == [1, 2, 3, 4, 5]
+    assert progress[-1].bytes_done == progress[-1].bytes_total
+    assert progress[-1].events == 15
+    assert [e.data['SystemAddress'] for e in archive.get_events('FSDJump')] == [0, 1, 2, 3, 4]
+    # events are stored in timestamp order
+    assert [loc.timestamp for loc in archive.find()] == sorted(loc.timestamp for loc in archive.find())
+
+    assert importer.run() == 0
+    assert archive.update() == 0
+
+
+def test_bulk_import_resume(archive, journal_dir):
+    write_journal_files(journal_dir)
+
+    def progress(p: journal_archive.ImportProgress):
+        if p.files_done == 2:
+            importer.cancel()
+
+    importer = journal_archive.JournalBulkImporter(archive, workers=2, progress=progress)
+    assert importer.run() == 6
+
+    importer = journal_archive.JournalBulkImporter(archive, workers=2, progress=None)
+    assert len(importer.get_jobs()) == 3
+    assert importer.run() == 9
+    assert len(archive.find()) == 15
+
+
+def test_bulk_import_read_ahead_bounded(archive, journal_dir):
+    write_journal_files(journal_dir)
+    submitted = []
+
+    class Executor(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            submitted.append(args)
+            return super().submit(*args, **kwargs)
+
+    importer = journal_archive.JournalBulkImporter(archive, workers=2, progress=None)
+    importer.read_ahead = 1
+    jobs = importer.get_jobs()
+
+    with mock.patch('concurrent.futures.ProcessPoolExecutor', Executor):
+        file_records = importer.iter_file_records(jobs)
+        assert next(file_records).name == jobs[0][0].name
+        assert len(submitted) == 2
+        assert [records.name for records in file_records] == [path.name for path, _ in jobs[1:]]
+    assert len(submitted) == 5
+
+
+def test_stale_file_records_skipped(archive, journal_dir):
+    path = journal_dir / 'Journal.190106175956.01.log'
+    path.write_text(make_line(DT, 'Fileheader'))
+
+    file_records = journal_archive.read_file_records(path)
+    assert archive.update() == 1
+    assert not archive.add_file_records(file_records)
+    assert len(archive.find()) == 1
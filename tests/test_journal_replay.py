@@ -0,0 +1,89 @@
+import datetime
+import json
+from unittest import mock
+
+import pytest
+
+from edp import journal, journal_replay, signalslib, signal_queues
+from edp.utils import to_ed_timestamp
+
+
+@pytest.fixture()
+def signal_manager():
+    manager = signalslib.SignalManager()
+    with mock.patch('edp.signalslib.signal_manager', manager), \
+         mock.patch.object(journal.journal_event_signal, 'callbacks', []), \
+         manager.get_signal_executor_thread():
+        yield manager
+
+
+def write_journal(path, *events):
+    path.write_text(''.join(json.dumps({'timestamp': to_ed_timestamp(dt), 'event': name}) + '\r\n'
+                            for dt, name in events))
+    return path
+
+
+def run_replay(files, **kwargs) -> journal_replay.ReplayReport:
+    thread = journal_replay.JournalReplayThread(files, **kwargs)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    return thread.report
+
+
+def test_replay_max_speed(signal_manager, random_journal_dir):
+    received = []
+
+    @journal.journal_event_signal.bind
+    def callback(event: journal.Event):
+        received.append(event.name)
+
+    files = journal_replay.get_replay_files(random_journal_dir)
+    expected = [event.name for event in journal_replay.iter_replay_events(files)]
+
+    report = run_replay(files)
+
+    assert received == expected
+    assert report.events == len(expected)
+    assert report.subscriber_calls == {callback.__qualname__: len(expected)}
+    assert report.latency_max >= report.latency_p95 >= 0
+    assert journal.journal_event_signal.callbacks == [callback]
+    assert str(len(expected)) in report.format()
+
+
+def test_replay_speed(signal_manager, tempdir):
+    dt = datetime.datetime(2019, 1, 6, 18, 0, 0)
+    path = write_journal(tempdir / 'Journal.190106175956.01.log',
+                         (dt, 'Fileheader'),
+                         (dt + datetime.timedelta(seconds=2), 'Music'),
+                         (dt + datetime.timedelta(hours=2), 'Shutdown'))
+
+    report = run_replay([path], speed=10, max_delay=5)
+
+    assert report.events == 3
+    # 2 seconds gap and 2 hours gap limited to 5 seconds, ten times faster
+    assert 0.7 <= report.duration < 1.5
+
+
+def test_replay_no_subscribers(signal_manager, random_journal_dir):
+    report = run_replay(journal_replay.get_replay_files(random_journal_dir))
+
+    assert report.events > 0
+    assert report.subscriber_time == {}
+
+
+def test_recorder_keeps_binding_options(signal_manager):
+    class Subscriber:
+        def on_event(self, event: journal.Event):
+            pass
+
+    subscriber = Subscriber()
+    journal.journal_event_signal.bind(subscriber.on_event, keys={'Docked'},
+                                      priority=signal_queues.Priority.INTERACTIVE, timeout=1.5)
+
+    with journal_replay.DispatchRecorder():
+        wrapper, = journal.journal_event_signal.callbacks
+        assert signal_queues.get_binding_priority(wrapper) == signal_queues.Priority.INTERACTIVE
+        assert signal_queues.get_binding_timeout(wrapper) == 1.5
+        assert signalslib.get_route(wrapper).keys == {'Docked'}
+        assert signalslib.get_callback_name(wrapper).endswith('Subscriber.on_event')
@@ -0,0 +1,58 @@
+import pytest
+
+from edp.utils import json_backend
+
+
+@pytest.fixture(params=json_backend.BACKENDS, autouse=True)
+def backend(request):
+    pytest.importorskip(request.param)
+    previous = json_backend.get_backend()
+    json_backend.set_backend(request.param)
+    yield request.param
+    json_backend._backend = previous
+
+
+def test_get_backend(backend):
+    assert json_backend.get_backend().name == backend
+
+
+def test_set_backend_unknown():
+    with pytest.raises(ValueError):
+        json_backend.set_backend('foo')
+
+
+def test_loads():
+    assert json_backend.loads('{"event": "test", "foo": [1, 2.5, "bar"]}') == \
+        {'event': 'test', 'foo': [1, 2.5, 'bar']}
+
+
+def test_loads_invalid():
+    with pytest.raises(ValueError):
+        json_backend.loads('{"event": ')
+
+
+def test_loads_many():
+    lines = ['{"event": "test %s"}' % i for i in range(25)]
+
+    assert json_backend.loads_many(lines, chunk_size=10) == [{'event': 'test %s' % i} for i in range(25)]
+
+
+def test_loads_many_empty():
+    assert json_backend.loads_many([]) == []
+
+
+@pytest.mark.parametrize('bad_line', [
+    '{"event": ',
+    '',
+    '{"event": "a"}, {"event": "b"}',
+    '"event": "c"}',
+])
+def test_loads_many_bad_line_isolated(bad_line):
+    lines = ['{"event": "test 1"}', bad_line, '{"event": "test 2"}']
+
+    result = json_backend.loads_many(lines)
+
+    assert len(result) == 3
+    assert result[0] == {'event': 'test 1'}
+    assert isinstance(result[1], ValueError)
+    assert result[2] == {'event': 'test 2'}
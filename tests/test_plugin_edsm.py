@@ -7,7 +7,7 @@ import requests
 
 from edp import plugins, journal, utils
 from edp.contrib import edsm, gamestate
-from edp.utils import hypothesis_strategies
+from edp.utils import hypothesis_strategies, plugins_helpers
 
 
 def test_edsm_settings_fields_defaults():
@@ -146,7 +146,8 @@ def test_patch_event(plugin, event_str):
     state.ship.id = 1
 
     existed_event_data = json.loads(event_str)
-    patched_event_data = plugin.patch_event(event_str, state)
+    event = journal.Event(datetime.datetime.now(), 'test', existed_event_data, event_str)
+    patched_event_data = plugin.patch_event(event, state)
 
     assert utils.is_dict_subset(patched_event_data, existed_event_data)
     assert {'_systemAddress', '_systemName', '_systemCoordinates', '_marketId', '_stationName', '_shipId'} \
@@ -196,9 +197,25 @@ def test_process_buffered_events_retry_on_connection_error(mock_api, plugin, sta
     plugin.gamestate.state = state
     mock_api.journal_event.side_effect = requests.exceptions.ConnectionError
 
-    plugin.process_buffered_events(events)
+    with pytest.raises(plugins_helpers.RetryLater) as exc_info:
+        plugin.process_buffered_events(events)
 
     assert mock_api.journal_event.call_count == 2
+    assert exc_info.value.events == events
+
+
+def test_process_buffered_events_retry_later_on_server_error(mock_api, plugin, state):
+    event_strategy = hypothesis_strategies.TestEvent()
+    events = list(event_strategy.example() for i in range(25))
+    plugin.gamestate = mock.Mock()
+    plugin.gamestate.state = state
+    response = mock.Mock(status_code=503)
+    mock_api.journal_event.side_effect = [None, requests.exceptions.HTTPError(response=response)]
+
+    with pytest.raises(plugins_helpers.RetryLater) as exc_info:
+        plugin.process_buffered_events(events)
+
+    assert exc_info.value.events == events[10:]  # first chunk is sent
 
 
 def test_process_buffered_events_chunked(mock_api, plugin, state):
@@ -1,8 +1,9 @@
+import operator
 from unittest import mock
 
 import pytest
 
-from edp import plugins, signalslib
+from edp import plugins, signalslib, thread
 
 SIMPLE_TEST_PLUGIN_MODULE = """
 from edp.plugins import BasePlugin
@@ -62,6 +63,38 @@ def test_get_marked_methods():
     assert method_marks[0][1].name == 'test'
 
 
+def test_get_class_marks():
+    class Mixin:
+        @plugins.mark_function('test', source='mixin')
+        def overridden(self): pass
+
+        @plugins.mark_function('test')
+        def inherited(self): pass
+
+    class SomePlugin(Mixin, plugins.BasePlugin):
+        @plugins.mark_function('test', source='plugin')
+        @plugins.mark_function('other')
+        def overridden(self): pass
+
+        @staticmethod
+        @plugins.mark_function('test')
+        def static(): pass
+
+    class OtherPlugin(SomePlugin):
+        def inherited(self): pass
+
+    assert '__edp_plugin_marks__' in SomePlugin.__dict__  # built on class definition
+    marks = plugins.get_class_marks(SomePlugin)
+    assert [(name, mark.options) for name, mark in marks['test']] == \
+        [('inherited', {}), ('overridden', {'source': 'plugin'})]
+    assert [name for name, _ in marks['other']] == ['overridden']
+    assert [name for name, _ in plugins.get_class_marks(OtherPlugin)['test']] == ['overridden']
+
+    assert '__edp_plugin_marks__' not in Mixin.__dict__
+    assert [name for name, _ in plugins.get_class_marks(Mixin)['test']] == ['inherited', 'overridden']
+    assert plugins.get_class_marks(Mixin) is plugins.get_class_marks(Mixin)
+
+
 def test_get_module_from_path(tempdir):
     module_path = tempdir / 'test_module.py'
     module_path.write_text('test = "hello!"')
@@ -199,17 +232,50 @@ def test_plugin_manager_get_marked_methods():
     assert marked_methods[0].mark.name == 'test'
 
 
-def test_get_scheduled_methods_threads():
+def test_schedule_methods():
     class SomePlugin(plugins.BasePlugin):
-        @plugins.scheduled(0.4)
+        @plugins.scheduled(0.4, jitter=0.1, misfire_grace=1)
         def test_method(self): pass
 
     plugin = SomePlugin()
     plugin_manager = plugins.PluginManager([plugin])
+    scheduler = thread.Scheduler()
+
+    jobs = plugin_manager.schedule_methods(scheduler)
+    assert scheduler.get_jobs() == jobs
+    assert len(jobs) == 1
+    assert (jobs[0].name, jobs[0].interval, jobs[0].jitter, jobs[0].misfire_grace) == \
+        ('SomePlugin.test_method', 0.4, 0.1, 1)
+
+
+def test_schedule_methods_wake():
+    wake_signal = signalslib.Signal('test schedule methods wake')
 
-    interval_threads = list(plugin_manager.get_scheduled_methods_threads())
-    assert len(interval_threads) == 1
-    assert interval_threads[0]._interval == 0.4
+    class SomePlugin(plugins.BasePlugin):
+        @plugins.scheduled(10, skipfirst=True, max_interval=60, wake_signals=[wake_signal])
+        def test_method(self): pass
+
+        def not_scheduled(self): pass
+
+    plugin = SomePlugin()
+    scheduler = mock.MagicMock()
+    plugins.PluginManager([plugin]).schedule_methods(scheduler)
+    job = scheduler.add_job.return_value
+    assert scheduler.add_job.call_args[1]['max_interval'] == 60
+
+    assert plugins.wake_scheduled(plugin.test_method, 5)
+    scheduler.wake.assert_called_once_with(job, 5)
+    assert not plugins.wake_scheduled(plugin.not_scheduled)
+    assert not plugins.wake_scheduled(SomePlugin().test_method)
+
+    wake_signal.callbacks[-1]()
+    scheduler.wake.assert_called_with(job)
+
+
+def test_scheduled_decorator_bad_max_interval():
+    with pytest.raises(ValueError):
+        @plugins.scheduled(10, max_interval=5)
+        def foo(): pass
 
 
 def test_set_plugin_annotation_references():
@@ -285,3 +351,23 @@ def test_callback_wrapper_plugin_enabled():
     plugin_manager._callback_wrapper(mock_func, mock_plugin, plugin_enabled=True)(foo='bar')
 
     mock_func.assert_called_once_with(foo='bar')
+
+
+def test_register_plugin_signals_routed():
+    signal = signalslib.Signal('test', kind=str).set_route_key(lambda data: data['kind'])
+
+    class Plugin1(plugins.BasePlugin):
+        events = {'bar', 'baz'}
+
+        @plugins.bind_signal(signal, keys={'foo'})
+        def method1(self, kind: str): pass
+
+        @plugins.bind_signal(signal, keys=operator.attrgetter('events'), predicate=lambda kind: kind != 'baz')
+        def method2(self, kind: str): pass
+
+    plugin_manager = plugins.PluginManager([Plugin1()])
+    plugin_manager.register_plugin_signals()
+
+    assert [c.__name__ for c in signal.get_callbacks({'kind': 'foo'})] == ['method1']
+    assert [c.__name__ for c in signal.get_callbacks({'kind': 'bar'})] == ['method2']
+    assert signal.get_callbacks({'kind': 'baz'}) == []
@@ -46,3 +46,10 @@ def test_registry_register_several_callbacks(registry):
     registry.register('test', callbacks=[callback1, callback2])
     assert callback1 in registry._callbacks['test']
     assert callback2 in registry._callbacks['test']
+
+
+def test_registry_contains(registry):
+    registry.register('test')(mock.MagicMock())
+
+    assert 'test' in registry
+    assert 'foo' not in registry
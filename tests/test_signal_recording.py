@@ -0,0 +1,140 @@
+import pickle
+import threading
+from unittest import mock
+
+import pytest
+
+from edp import signalslib, signal_recording
+
+
+@pytest.fixture()
+def signal_manager():
+    manager = signalslib.SignalManager(workers=1)
+    with mock.patch('edp.signalslib.signal_manager', manager), manager.get_signal_executor_thread():
+        yield manager
+
+
+def record_signals(path, manager, signal, *values):
+    with signal_recording.SignalRecorder(path, manager):
+        for value in values:
+            signal.emit(value=value)
+        signal.emit_eager(value=-1)
+        assert manager.wait_idle(5)
+
+
+def test_signal_recorder(signal_manager, tmp_path):
+    path = tmp_path / 'signals.rec'
+    signal = signalslib.Signal('recorder test', value=int)
+    signal.bind_nonstrict(lambda value: None)
+
+    record_signals(path, signal_manager, signal, 1, 1, 2)
+
+    assert signal_manager.recorder is None
+    records = list(signal_recording.read_recording(path))
+    emits = [record for record in records if isinstance(record, signal_recording.EmitRecord)]
+    calls = [record for record in records if isinstance(record, signal_recording.CallRecord)]
+    assert [(emit.sequence, emit.name, emit.data, emit.eager) for emit in emits] == [
+        (1, 'recorder test', {'value': 1}, False),
+        (2, 'recorder test', {'value': 1}, False),
+        (3, 'recorder test', {'value': 2}, False),
+        (4, 'recorder test', {'value': -1}, True),
+    ]
+    assert emits[0].data is not emits[1].data
+    assert sorted(call.sequence for call in calls) == [1, 2, 3, 4]
+    assert all(call.queue_wait >= 0 and call.duration >= 0 for call in calls)
+
+    with path.open('rb') as f:
+        record_types = []
+        while True:
+            try:
+                record_types.append(pickle.load(f)[0])
+            except EOFError:
+                break
+    assert record_types.count(signal_recording.RECORD_PAYLOAD) == 3  # equal payloads are stored once
+
+
+def test_signal_recorder_appends_sessions(signal_manager, tmp_path):
+    path = tmp_path / 'signals.rec'
+    signal = signalslib.Signal('recorder test', value=int)
+    signal.bind_nonstrict(lambda value: None)
+
+    record_signals(path, signal_manager, signal, 1)
+    record_signals(path, signal_manager, signal, 2)
+
+    emits = [(record.sequence, record.data) for record in signal_recording.read_recording(path)
+             if isinstance(record, signal_recording.EmitRecord)]
+    assert emits == [(1, {'value': 1}), (2, {'value': -1}), (1, {'value': 2}), (2, {'value': -1})]
+
+
+def test_signal_recorder_unpicklable_data(signal_manager, tmp_path):
+    path = tmp_path / 'signals.rec'
+    signal = signalslib.Signal('recorder test', value=object)
+    signal.bind_nonstrict(lambda value: None)
+
+    with signal_recording.SignalRecorder(path, signal_manager):
+        signal.emit_eager(value=threading.Lock())
+
+    emit, call = signal_recording.read_recording(path)
+    assert emit.name == 'recorder test'
+    assert emit.data is None
+    assert call.sequence == emit.sequence
+
+
+def test_read_truncated_recording(signal_manager, tmp_path):
+    path = tmp_path / 'signals.rec'
+    signal = signalslib.Signal('recorder test', value=int)
+    signal.bind_nonstrict(lambda value: None)
+
+    record_signals(path, signal_manager, signal, 1, 2)
+    path.write_bytes(path.read_bytes()[:-3])
+
+    emits = [record.data for record in signal_recording.read_recording(path)
+             if isinstance(record, signal_recording.EmitRecord)]
+    assert emits[:2] == [{'value': 1}, {'value': 2}]
+
+
+def test_signal_playback(signal_manager, tmp_path):
+    path = tmp_path / 'signals.rec'
+    recorded_signal = signalslib.Signal('playback test', value=int)
+    recorded_signal.bind_nonstrict(lambda value: None)
+    record_signals(path, signal_manager, recorded_signal, 1, 2, 3)
+
+    signal_manager.instrumentation.reset()
+    played_signal = signalslib.Signal('playback test', value=int)  # signal of fresh process
+    assert signalslib.get_signal('playback test') is played_signal
+    received = []
+
+    def callback(value: int):
+        received.append(value)
+
+    played_signal.bind(callback)
+
+    thread = signal_recording.SignalPlaybackThread(path, speed=100, signal_manager=signal_manager)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert sorted(received) == [-1, 1, 2, 3]
+    assert thread.report.emitted == 4
+    assert thread.report.playback[signalslib.get_callback_name(callback)].calls == 4
+    assert sum(summary.calls for summary in thread.report.recorded.values()) == 4
+    assert 'playback 4 calls' in thread.report.format()
+
+
+def test_signal_playback_skip(signal_manager):
+    signal = signalslib.Signal('playback test', value=int)
+    received = []
+    signal.bind_nonstrict(lambda value: received.append(value))
+    records = [
+        signal_recording.EmitRecord(1, 'playback test', 0, 0, {'value': 1}, True),
+        signal_recording.EmitRecord(2, 'playback test', 0, 0, None, True),
+        signal_recording.EmitRecord(3, 'playback missing', 0, 0, {'value': 3}, True),
+        signal_recording.EmitRecord(4, 'playback skipped', 0, 0, {'value': 4}, True),
+    ]
+    signalslib.Signal('playback skipped', value=int).bind_nonstrict(lambda value: received.append(value))
+
+    thread = signal_recording.SignalPlaybackThread(None, skip={'playback skipped'}, signal_manager=signal_manager)
+    thread.play(records)
+
+    assert received == [1]
+    assert thread.get_report(0).skipped == 3
@@ -1,9 +1,12 @@
+import queue
+import threading
 import time
+import typing
 from unittest import mock
 
 import pytest
 
-from edp import signalslib
+from edp import signalslib, signal_instrumentation
 
 
 @pytest.mark.parametrize(('signature', 'result'), [
@@ -187,3 +190,476 @@ def test_signal_emit_eager():
     signal.emit_eager(test='test')
 
     m.assert_called_once_with(test='test')
+
+
+def test_slow_subscriber_does_not_block_others():
+    manager = signalslib.SignalManager(workers=2)
+    release = threading.Event()
+    slow_calls = []
+    fast_calls = []
+
+    def slow(value: int):
+        release.wait(5)
+        slow_calls.append(value)
+
+    def fast(value: int):
+        fast_calls.append(value)
+
+    signal = signalslib.Signal('test', value=int)
+    signal.bind(slow)
+    signal.bind(fast)
+
+    with mock.patch('edp.signalslib.signal_manager', manager), manager.get_signal_executor_thread():
+        for i in range(50):
+            signal.emit(value=i)
+
+        for _ in range(50):
+            if len(fast_calls) == 50:
+                break
+            time.sleep(0.1)
+
+        assert fast_calls == list(range(50))
+        assert slow_calls == []
+        assert manager.get_queue_depths()[slow.__qualname__] == 49
+        assert manager.get_queue_depths()[fast.__qualname__] == 0
+
+        release.set()
+        for _ in range(50):
+            if len(slow_calls) == 50:
+                break
+            time.sleep(0.1)
+
+    assert slow_calls == list(range(50))
+
+
+def test_signal_manager_no_workers():
+    manager = signalslib.SignalManager(workers=0)
+    calls = []
+    signal = signalslib.Signal('test', value=int)
+    signal.bind_nonstrict(lambda value: calls.append(value))
+
+    with mock.patch('edp.signalslib.signal_manager', manager), manager.get_signal_executor_thread():
+        for i in range(10):
+            signal.emit(value=i)
+        time.sleep(0.5)
+
+    assert calls == list(range(10))
+    assert manager.get_queue_depths() == {}
+
+
+def test_signal_data_copied_once():
+    received = []
+    signal = signalslib.Signal('test', data=dict)
+    signal.bind_nonstrict(lambda data: received.append(data))
+    signal.bind_nonstrict(lambda data: received.append(data))
+
+    data = {'foo': ['bar']}
+    signal.emit_eager(data=data)
+
+    assert received[0] is received[1]
+    assert received[0] == data and received[0] is not data
+
+
+@pytest.mark.parametrize(('type_', 'value', 'result'), [
+    (str, 'foo', True),
+    (str, 1, False),
+    (dict, signalslib.SignalExecutionItem('test', [], {}), False),
+    (typing.Optional[int], None, True),
+    (typing.Optional[int], 1, True),
+    (typing.Optional[int], '1', False),
+    (typing.Union[int, typing.List[str]], ['foo'], True),
+    (typing.Union[int, typing.List[str]], 'foo', False),
+    (typing.List[int], [1], True),
+    (typing.List[int], (1,), False),
+    (typing.Dict[str, int], {}, True),
+    (typing.Any, object(), True),
+    (None, None, True),
+    (None, 1, False),
+])
+def test_compile_type_check(type_, value, result):
+    assert signalslib.compile_type_check(type_)(value) == result
+
+
+def test_signal_emit_typing_signature():
+    signal = signalslib.Signal('test', foo=typing.Optional[int])
+    signal.bind_nonstrict(mock.MagicMock())
+
+    with mock.patch('edp.signalslib.signal_manager'):
+        signal.emit(foo=None)
+        signal.emit(foo=1)
+        with pytest.raises(TypeError):
+            signal.emit(foo='1')
+
+
+def test_signal_check_generic_signature():
+    signal = signalslib.Signal('test', foo=typing.List[int])
+
+    signal.check_signature({'foo': [1]})
+    with pytest.raises(TypeError, match='Signature mismatch'):
+        signal.check_signature({'foo': (1,)})
+
+
+def test_signal_emit_no_callbacks_not_validated():
+    signal = signalslib.Signal('test', foo=int)
+
+    with mock.patch('edp.signalslib.signal_manager') as signal_manager_mock:
+        signal.emit(foo='1')
+
+    signal_manager_mock.emit.assert_not_called()
+
+
+def test_signal_emit_validated():
+    signal = signalslib.Signal('test', foo=int)
+    signal.bind_nonstrict(mock.MagicMock())
+
+    with mock.patch.object(signalslib.signal_manager, 'emit') as emit_mock:
+        signal.emit(foo=1)
+        with pytest.raises(TypeError, match='Signature mismatch'):
+            signal.emit(foo='1')
+
+    emit_mock.assert_called_once_with(signal, foo=1)
+
+
+@pytest.fixture()
+def blocked_manager():
+    """Signal manager with single blocked subscriber, that records received values"""
+    manager = signalslib.SignalManager(workers=1)
+    release = threading.Event()
+    received = []
+
+    def callback(value: int):
+        release.wait(5)
+        received.append(value)
+
+    with mock.patch('edp.signalslib.signal_manager', manager), manager.get_signal_executor_thread():
+        yield manager, callback, release, received
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+@pytest.mark.parametrize(('policy', 'expected', 'counters'), [
+    ((signalslib.Backpressure.DROP_OLDEST, 3, None), [0, 7, 8, 9], signalslib.SignalCounters(dropped=6)),
+    ((signalslib.Backpressure.COALESCE, 100, None), [0, 9], signalslib.SignalCounters(coalesced=8)),
+    ((signalslib.Backpressure.COALESCE, 100, lambda data: data['value'] % 2 or None),
+     [0, 2, 4, 6, 8, 9], signalslib.SignalCounters(coalesced=4)),
+])
+def test_signal_queue_policy(blocked_manager, policy, expected, counters):
+    manager, callback, release, received = blocked_manager
+    signal = signalslib.Signal('test', value=int).set_queue_policy(*policy)
+    signal.bind(callback)
+
+    signal.emit(value=0)
+    wait_for(lambda: manager.get_queue_depths().get(callback.__qualname__) == 0)  # first item is being executed
+    for i in range(1, 10):
+        signal.emit(value=i)
+    wait_for(lambda: manager.signal_queue.empty())
+    time.sleep(0.1)
+
+    release.set()
+    wait_for(lambda: len(received) == len(expected))
+    assert received == expected
+    assert manager.get_signal_counters().get('test', signalslib.SignalCounters()) == counters
+
+
+def test_signal_queue_block(blocked_manager):
+    manager, callback, release, received = blocked_manager
+    signal = signalslib.Signal('test', value=int).set_queue_policy(signalslib.Backpressure.BLOCK, maxsize=2)
+    signal.bind(callback)
+
+    def emit():
+        for i in range(5):
+            signal.emit(value=i)
+
+    emitter = threading.Thread(target=emit)
+    emitter.start()
+    emitter.join(0.5)
+    assert emitter.is_alive()
+
+    release.set()
+    emitter.join(5)
+    assert not emitter.is_alive()
+    wait_for(lambda: len(received) == 5)
+    assert received == list(range(5))
+    assert manager.get_signal_counters()['test'].blocked >= 1
+
+
+def test_signal_backlog_counted_per_signal():
+    manager = signalslib.SignalManager()
+    busy = signalslib.Signal('busy', value=int)
+    quiet = signalslib.Signal('quiet', value=int)
+    busy.bind_nonstrict(mock.MagicMock())
+    quiet.bind_nonstrict(mock.MagicMock())
+
+    with mock.patch('edp.signalslib.signal_manager', manager):
+        for i in range(5):
+            busy.emit(value=i)
+
+    assert manager._get_backlog(busy, busy.callbacks) == 5
+    assert manager._get_backlog(quiet, quiet.callbacks) == 0
+
+    manager.signal_item_done(manager.signal_queue.get_nowait())
+    assert manager._get_backlog(busy, busy.callbacks) == 4
+
+
+def test_signal_routing():
+    signal = signalslib.Signal('test', kind=str, value=int).set_route_key(lambda data: data['kind'])
+    all_mock, keys_mock, predicate_mock = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+    signal.bind_nonstrict(all_mock)
+    signal.bind_nonstrict(keys_mock, keys={'foo'})
+    signal.bind_nonstrict(predicate_mock, keys={'foo', 'bar'}, predicate=lambda kind, value: value > 0)
+
+    assert signal.get_callbacks({'kind': 'foo', 'value': 1}) == [all_mock, keys_mock, predicate_mock]
+    assert signal.get_callbacks({'kind': 'foo', 'value': 0}) == [all_mock, keys_mock]
+    assert signal.get_callbacks({'kind': 'bar', 'value': 1}) == [all_mock, predicate_mock]
+    assert signal.get_callbacks({'kind': 'baz', 'value': 1}) == [all_mock]
+    assert signal.has_callbacks('bar')
+
+    signal.callbacks.remove(all_mock)
+    assert signal.get_callbacks({'kind': 'baz', 'value': 1}) == []
+    assert not signal.has_callbacks('baz')
+
+
+def test_signal_routing_none_key():
+    signal = signalslib.Signal('test', kind=str).set_route_key(lambda data: data['kind'] or None)
+    all_mock, keys_mock = mock.MagicMock(), mock.MagicMock()
+    signal.bind_nonstrict(all_mock)
+    signal.bind_nonstrict(keys_mock, keys={'foo'})
+
+    assert signal.get_callbacks({'kind': ''}) == [all_mock]
+
+
+def test_signal_routing_not_matched_not_queued():
+    signal = signalslib.Signal('test', kind=str).set_route_key(lambda data: data['kind'])
+
+    @signal.bind
+    @signalslib.route(keys={'foo'})
+    def callback(kind: str): pass
+
+    with mock.patch('edp.signalslib.signal_manager', signalslib.SignalManager()) as manager, \
+            mock.patch('edp.signalslib.copy_signal_data') as copy_mock:
+        signal.emit(kind='bar')
+        assert manager.signal_queue.empty()
+        copy_mock.assert_not_called()
+
+        signal.emit(kind='foo')
+        assert manager.signal_queue.get_nowait().callbacks == [callback]
+
+
+def test_signal_routing_bound_method():
+    class Subscriber:
+        def callback(self, kind: str): pass
+
+    subscriber = Subscriber()
+    signal = signalslib.Signal('test', kind=str).set_route_key(lambda data: data['kind'])
+    signal.bind(subscriber.callback, keys={'foo'})
+
+    assert signalslib.get_route(signal.callbacks[0]) == signalslib.SignalRoute(keys={'foo'})
+    assert signalslib.get_route(Subscriber.callback) is None
+    assert len(signal.get_callbacks({'kind': 'foo'})) == 1
+    assert signal.get_callbacks({'kind': 'bar'}) == []
+
+
+def test_signal_routing_predicate_error():
+    signal = signalslib.Signal('test', value=int)
+    callback = mock.MagicMock()
+    signal.bind_nonstrict(callback, predicate=lambda value: 1 / value)
+
+    assert signal.get_callbacks({'value': 0}) == []
+    assert signal.get_callbacks({'value': 1}) == [callback]
+
+
+def test_signal_instrumentation():
+    manager = signalslib.SignalManager(workers=1)
+    signal = signalslib.Signal('test', value=int)
+
+    def slow(value: int):
+        time.sleep(0.02)
+
+    def failing(value: int):
+        raise ValueError(value)
+
+    signal.bind(slow)
+    signal.bind(failing)
+
+    with mock.patch('edp.signalslib.signal_manager', manager), manager.get_signal_executor_thread():
+        for i in range(3):
+            signal.emit(value=i)
+        wait_for(lambda: manager.instrumentation.get_signal_stats().get('test', signal_instrumentation.SignalStats(
+            0, signal_instrumentation.ExecutionStats())).execution.calls == 6)
+
+    instrumentation = manager.instrumentation
+    signal_stats = instrumentation.get_signal_stats()['test']
+    assert signal_stats.emits == 3
+    assert signal_stats.execution.errors == 3
+    assert signal_stats.execution.queue_wait_max > 0
+
+    callback_stats = instrumentation.get_callback_stats()
+    assert callback_stats[slow.__qualname__].calls == 3
+    assert callback_stats[slow.__qualname__].errors == 0
+    assert callback_stats[slow.__qualname__].mean_time >= 0.02
+    assert sum(callback_stats[slow.__qualname__].histogram) == 3
+    assert callback_stats[failing.__qualname__].errors == 3
+
+    slowest = instrumentation.get_slowest_invocations(2)
+    assert [invocation.callback for invocation in slowest] == [slow.__qualname__] * 2
+    assert slowest[0].duration >= slowest[1].duration
+
+    instrumentation.reset()
+    assert instrumentation.get_callback_stats() == {}
+
+
+def test_signal_instrumentation_emit_eager():
+    manager = signalslib.SignalManager()
+    signal = signalslib.Signal('test')
+    signal.bind(lambda: None)
+
+    with mock.patch('edp.signalslib.signal_manager', manager):
+        signal.emit_eager()
+
+    assert manager.instrumentation.get_signal_stats()['test'].execution.calls == 1
+
+
+def test_ready_queue_priority_lanes():
+    ready_queue = signalslib.ReadyQueue(starvation_limit=2)
+    queues = {name: signalslib.SubscriberQueue(mock.MagicMock(__qualname__=name))
+              for name in ('bulk', 'normal', 'interactive1', 'interactive2', 'interactive3', 'interactive4')}
+    ready_queue.put(queues['bulk'], signalslib.Priority.BULK)
+    ready_queue.put(queues['normal'], signalslib.Priority.NORMAL)
+    for name in ('interactive1', 'interactive2', 'interactive3', 'interactive4'):
+        ready_queue.put(queues[name], signalslib.Priority.INTERACTIVE)
+
+    order = [ready_queue.get(timeout=0).name for _ in range(6)]
+
+    # lower lanes are served after being passed over twice
+    assert order == ['interactive1', 'interactive2', 'bulk', 'normal', 'interactive3', 'interactive4']
+    with pytest.raises(queue.Empty):
+        ready_queue.get(timeout=0)
+
+
+def test_ready_queue_promote():
+    ready_queue = signalslib.ReadyQueue()
+    first, second = signalslib.SubscriberQueue(lambda: None), signalslib.SubscriberQueue(lambda: None)
+    ready_queue.put(first, signalslib.Priority.NORMAL)
+    ready_queue.put(second, signalslib.Priority.BULK)
+
+    ready_queue.promote(second, signalslib.Priority.INTERACTIVE)
+    ready_queue.promote(first, signalslib.Priority.BULK)
+
+    assert ready_queue.get(timeout=0) is second
+    assert ready_queue.get(timeout=0) is first
+    assert second.ready_priority is None
+
+
+def test_signal_priority_executed_first(blocked_manager):
+    manager, blocking_callback, release, received = blocked_manager
+    bulk_signal = signalslib.Signal('bulk', value=int).set_priority(signalslib.Priority.BULK)
+    interactive_signal = signalslib.Signal('interactive', value=int)
+    order = []
+
+    bulk_signal.bind(blocking_callback)
+    for i in range(5):
+        bulk_signal.bind_nonstrict(lambda value, i=i: order.append(f'bulk {i}'))
+    interactive_signal.bind_nonstrict(lambda value: order.append('interactive'), priority=signalslib.Priority.INTERACTIVE)
+
+    bulk_signal.emit(value=0)
+    wait_for(lambda: manager.get_queue_depths().get(blocking_callback.__qualname__) == 0)  # single worker is busy
+    bulk_signal.emit(value=1)
+    interactive_signal.emit(value=1)
+    wait_for(lambda: manager.signal_queue.empty())
+    time.sleep(0.1)
+
+    release.set()
+    wait_for(lambda: len(order) == 11)
+    assert order[0] == 'interactive'
+
+
+def test_signal_watchdog_quarantines_stuck_callback():
+    manager = signalslib.SignalManager(workers=1)
+    manager.watchdog_interval = 0.05
+    signal = signalslib.Signal('test', value=int)
+    release = threading.Event()
+    stuck_calls, other_calls = [], []
+
+    def stuck(value: int):
+        stuck_calls.append(value)
+        release.wait(10)
+
+    def other(value: int):
+        other_calls.append(value)
+
+    signal.bind(stuck, timeout=0.2)
+    signal.bind(other)
+
+    with mock.patch('edp.signalslib.signal_manager', manager), \
+            mock.patch.object(signalslib.logger, 'error') as error_mock, \
+            mock.patch.object(signalslib.logger, 'warning') as warning_mock, \
+            manager.get_signal_executor_thread():
+        signal.emit(value=0)
+        signal.emit(value=1)
+        wait_for(lambda: error_mock.called)
+        signal.emit(value=2)
+
+        # fresh worker keeps other subscriber going while only worker is stuck
+        wait_for(lambda: other_calls == [0, 1, 2])
+        assert 'release.wait' in error_mock.call_args[0][0]
+        assert manager.get_signal_counters()['test'].quarantined == 2
+
+        release.set()
+        wait_for(lambda: any('quarantine lifted' in call[0][0] for call in warning_mock.call_args_list))
+        signal.emit(value=3)
+        wait_for(lambda: stuck_calls == [0, 3])
+
+
+def test_signal_executor_stops_promptly():
+    manager = signalslib.SignalManager(workers=2)
+    executor = manager.get_signal_executor_thread()
+    executor.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    executor.stop()
+    executor.join(5)
+
+    assert time.monotonic() - start < 0.5
+    assert not executor.is_alive()
+
+
+def test_signal_manager_wait_idle():
+    manager = signalslib.SignalManager(workers=1)
+    signal = signalslib.Signal('test', value=int)
+    received = []
+    signal.bind_nonstrict(lambda value: (time.sleep(0.01), received.append(value)))
+
+    with mock.patch('edp.signalslib.signal_manager', manager):
+        for i in range(10):
+            signal.emit(value=i)
+        assert not manager.wait_idle(1)  # executor is not running
+        with manager.get_signal_executor_thread():
+            assert manager.wait_idle(5)
+            assert received == list(range(10))
+
+
+def test_signal_worker_health():
+    manager = signalslib.SignalManager(workers=1)
+    signal = signalslib.Signal('test', value=int)
+    release = threading.Event()
+
+    def callback(value: int):
+        release.wait(5)
+
+    signal.bind(callback)
+    executor = manager.get_signal_executor_thread()
+    with mock.patch('edp.signalslib.signal_manager', manager), executor:
+        signal.emit(value=1)
+        time.sleep(0.2)
+        worker, = executor.get_child_threads()
+        assert worker.get_health().target == signalslib.get_callback_name(callback)
+        release.set()
+        assert manager.wait_idle(5)
+        time.sleep(0.1)
+        assert worker.get_health().target is None
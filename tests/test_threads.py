@@ -1,9 +1,12 @@
+import os
+import threading
 import time
 from unittest import mock
 
 import pytest
 
-from edp.thread import IntervalRunnerThread, ThreadManager, StoppableThread
+from edp.thread import IntervalRunnerThread, ThreadManager, StoppableThread, Scheduler, ScheduledJob, ShutdownStage, \
+    ScheduledJobFailure, _get_proc_thread_cpu_time
 
 
 class ThreadTest(StoppableThread):
@@ -203,3 +206,273 @@ def test_thread_manager_add_interval_thread():
 
     assert len(manager._threads) == 1
     assert manager._threads[0]._target is target
+
+
+@pytest.fixture()
+def scheduler():
+    with Scheduler(workers=2) as scheduler:
+        yield scheduler
+    scheduler.join(5)
+    assert not scheduler.is_alive()
+
+
+def test_scheduler_runs_jobs(scheduler):
+    first = mock.MagicMock()
+    skipped = mock.MagicMock()
+    scheduler.add_job(first, interval=0.2)
+    scheduler.add_job(skipped, interval=0.2, skipfirst=True)
+
+    time.sleep(0.5)
+
+    assert first.call_count == 3
+    assert skipped.call_count == 2
+
+
+def test_scheduler_thread_count_is_flat():
+    threads_before = threading.active_count()
+    with Scheduler(workers=2) as scheduler:
+        jobs = [scheduler.add_job(mock.MagicMock(), interval=0.05) for _ in range(50)]
+        time.sleep(0.3)
+        assert threading.active_count() <= threads_before + 3
+    assert all(job.runs >= 2 for job in jobs)
+
+
+def test_scheduler_job_error(scheduler):
+    func = mock.MagicMock(side_effect=ValueError)
+    scheduler.add_job(func, interval=0.1)
+
+    time.sleep(0.25)
+
+    assert func.call_count == 3
+
+
+def test_scheduled_job_jitter():
+    job = ScheduledJob(mock.MagicMock(), interval=1, jitter=0.5)
+    assert all(1 <= job.get_delay() <= 1.5 for _ in range(100))
+    assert ScheduledJob(mock.MagicMock(), interval=1).get_delay() == 1
+
+
+def test_scheduler_misfire():
+    release = threading.Event()
+    late = mock.MagicMock()
+    with Scheduler(workers=1) as scheduler:
+        scheduler.add_job(lambda: release.wait(5), interval=10)
+        job = scheduler.add_job(late, interval=10, misfire_grace=0.1)
+        time.sleep(0.3)
+        release.set()
+        time.sleep(0.1)
+
+    late.assert_not_called()
+    assert job.misfires == 1
+
+
+def test_scheduler_reschedule(scheduler):
+    func = mock.MagicMock()
+    job = scheduler.add_job(func, interval=10, skipfirst=True)
+
+    scheduler.reschedule(job, delay=0)
+    time.sleep(0.1)
+    assert func.call_count == 1
+
+    scheduler.reschedule(job, interval=0.1)
+    time.sleep(0.25)
+    assert func.call_count == 3
+
+    scheduler.remove_job(job)
+    time.sleep(0.25)
+    assert func.call_count == 3
+    assert scheduler.get_jobs() == []
+
+
+def test_scheduled_job_next_delay():
+    job = ScheduledJob(mock.MagicMock(), interval=1, min_interval=0.5, max_interval=10)
+    assert job.get_next_delay(None) == 1
+    assert job.get_next_delay(True) == 1
+    assert job.get_next_delay(3) == 3
+    assert job.get_next_delay(0) == 0.5
+    assert job.get_next_delay(100) == 10
+
+    job.failures = 2
+    assert job.get_next_delay(3) == 4
+    job.failures = 5
+    assert job.get_next_delay(3) == 10
+
+
+def test_scheduler_next_run_hint(scheduler):
+    func = mock.MagicMock(return_value=10)
+    scheduler.add_job(func, interval=0.05)
+    time.sleep(0.2)
+    assert func.call_count == 1
+
+
+def test_scheduler_failure_backoff(scheduler):
+    func = mock.MagicMock(side_effect=ValueError)
+    job = scheduler.add_job(func, interval=0.05, max_interval=10)
+    time.sleep(0.4)  # runs at 0, 0.1, 0.3, next at 0.7
+    assert func.call_count == 3
+    assert job.failures == 3
+
+    func.side_effect = None
+    scheduler.wake(job)
+    time.sleep(0.1)
+    assert job.failures == 0
+    assert job.get_next_delay() == 0.05  # job may be running again, so next_run is not checked
+
+
+def test_scheduler_expected_failure_not_logged(scheduler):
+    func = mock.MagicMock(side_effect=ScheduledJobFailure('service is down'))
+    with mock.patch('edp.thread.logger') as logger_mock:
+        job = scheduler.add_job(func, interval=10, max_interval=10)
+        time.sleep(0.1)
+
+    assert job.failures == 1
+    logger_mock.exception.assert_not_called()
+
+
+def test_scheduler_wake(scheduler):
+    func = mock.MagicMock()
+    job = scheduler.add_job(func, interval=10, skipfirst=True)
+
+    scheduler.wake(job, delay=0.1)
+    scheduler.wake(job, delay=5)  # does not delay earlier run
+    time.sleep(0.2)
+    assert func.call_count == 1
+
+
+def test_scheduler_wake_running_job(scheduler):
+    release = threading.Event()
+    func = mock.MagicMock(side_effect=lambda: release.wait(5))
+    job = scheduler.add_job(func, interval=10)
+    time.sleep(0.05)
+    assert job.running
+
+    scheduler.wake(job)
+    release.set()
+    time.sleep(0.1)
+    assert func.call_count == 2
+
+
+def test_stoppable_thread_sleep_interrupted_by_stop():
+    thread = StoppableThread()
+    thread.run = lambda: thread.sleep(10)
+    thread.start()
+
+    start = time.monotonic()
+    thread.stop()
+    thread.join(5)
+
+    assert time.monotonic() - start < 0.5
+    assert not thread.is_alive()
+
+
+def test_thread_manager_shutdown_order():
+    calls = []
+
+    class OrderedThread(StoppableThread):
+        def __init__(self, name):
+            super(OrderedThread, self).__init__(name=name)
+
+        def run(self):
+            self.sleep(10)
+            calls.append(f'{self.name} stopped')
+
+    manager = ThreadManager()
+    manager.add_thread(OrderedThread('worker'))
+    manager.add_threads(OrderedThread('reader'), stage=ShutdownStage.INGESTION)
+    manager.add_shutdown_callback(lambda timeout: calls.append('flush'), ShutdownStage.FLUSH)
+    manager.add_shutdown_callback(lambda timeout: calls.append('drain'), ShutdownStage.DRAIN)
+
+    with manager:
+        time.sleep(0.1)
+
+    assert calls == ['reader stopped', 'drain', 'flush', 'worker stopped']
+
+
+def test_thread_manager_shutdown_timeout(caplog):
+    release = threading.Event()
+    thread = StoppableThread(target=lambda: release.wait(5))
+    manager = ThreadManager()
+    manager.add_thread(thread)
+    manager.start()
+
+    duration = manager.stop(timeout=0.2)
+
+    assert 0.2 <= duration < 1
+    assert thread.is_alive()
+    assert 'did not stop before shutdown timeout' in caplog.text
+    release.set()
+    thread.join(5)
+
+
+def test_thread_health():
+    release = threading.Event()
+
+    class BusyThread(StoppableThread):
+        stuck_timeout = 0.2
+
+        def run(self):
+            self.heartbeat('spin')
+            start = time.monotonic()
+            while time.monotonic() - start < 0.1:
+                pass
+            self.idle()
+            self.heartbeat('wait')
+            release.wait(5)
+
+    thread = BusyThread(name='busy')
+    assert thread.get_health() == ('busy', False, False, 0, None, None, 0.0, False)
+
+    manager = ThreadManager()
+    manager.add_thread(thread)
+    with manager:
+        time.sleep(0.05)
+        assert thread.get_health().target == 'spin'
+        time.sleep(0.4)
+        health, = manager.get_health()
+        assert health.alive
+        assert health.iterations == 2
+        assert health.target == 'wait'
+        assert health.since_heartbeat > 0.2
+        assert health.cpu_time >= 0.05
+        assert health.stuck
+        release.set()
+        thread.join(5)
+
+    assert not thread.get_health().stuck
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/thread-self/stat'), reason='procfs is not available')
+def test_proc_thread_cpu_time():
+    cpu_start = _get_proc_thread_cpu_time()
+    start = time.monotonic()
+    while time.monotonic() - start < 0.1:
+        pass
+
+    assert 0.05 <= _get_proc_thread_cpu_time() - cpu_start <= 0.2
+
+
+def test_interval_runner_thread_health():
+    def target():
+        pass
+
+    with IntervalRunnerThread(target, interval=0.1) as thread:
+        time.sleep(0.25)
+        health = thread.get_health()
+
+    assert health.iterations == 3
+    assert health.target is None
+    assert not health.stuck
+
+
+def test_scheduler_job_cpu_time(scheduler):
+    def spin():
+        start = time.monotonic()
+        while time.monotonic() - start < 0.1:
+            pass
+
+    job = scheduler.add_job(spin, interval=10)
+    time.sleep(0.3)
+
+    assert job.runs == 1
+    assert job.last_duration >= 0.1
+    assert job.cpu_time >= 0.05
@@ -1,6 +1,8 @@
+import datetime
 from unittest import mock
 
 import pytest
+from hypothesis import given, strategies
 
 from edp import utils
 
@@ -153,3 +155,29 @@ def test_drop_keys(d, keys, result):
 ])
 def test_infer_category(material_category, category):
     assert utils.infer_category(material_category) == category
+
+
+@pytest.mark.parametrize(('timestamp', 'result'), [
+    ('2018-06-07T08:09:10Z', datetime.datetime(2018, 6, 7, 8, 9, 10)),
+    ('3307-12-31T23:59:59Z', datetime.datetime(3307, 12, 31, 23, 59, 59)),
+])
+def test_from_ed_timestamp(timestamp, result):
+    assert utils.from_ed_timestamp(timestamp) == result
+
+
+@pytest.mark.parametrize('timestamp', [
+    '2018-06-07T25:09',
+    '2018-06-07T25:09:10Z',
+    '2018-06-07 08:09:10Z',
+    '2018-06-07T08:09:10',
+    '',
+])
+def test_from_ed_timestamp_invalid(timestamp):
+    with pytest.raises(ValueError):
+        utils.from_ed_timestamp(timestamp)
+
+
+@given(dt=strategies.datetimes(min_value=datetime.datetime(1000, 1, 1)))
+def test_from_ed_timestamp_matches_strptime(dt):
+    timestamp = utils.to_ed_timestamp(dt.replace(microsecond=0))
+    assert utils.from_ed_timestamp(timestamp) == datetime.datetime.strptime(timestamp, utils.ED_TIMESTAMP_FORMAT)